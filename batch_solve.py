@@ -0,0 +1,263 @@
+"""Solves many cube states offline and streams one JSON line per state.
+
+Input (a file, or stdin with `-`) holds states either as 24-character
+strings, one per line, or in the 6-line format of the app's file loader
+(blocks may be separated by blank lines), or is a binary state file (see
+convert_states.py). Each output line is
+
+    {"index": 0, "state": "...", "moves": ["R", "U'"], "length": 2}
+
+or {"index": ..., "error": "..."} for a state that cannot be solved. The
+index is the state's position in the input, so unordered output and resumed
+runs can be matched back to it.
+
+With --all-solutions, "moves" is replaced by "solutions": every solution of
+at most optimal + --extra moves, shortest first, up to --max-solutions of
+them ("truncated": true if there were more). "length" stays the optimal one.
+
+Work is spread over a process pool (one process per core by default) in
+chunks, with a bounded number of chunks in flight, so memory stays flat
+however long the input is.
+
+Usage:
+    python3 batch_solve.py states.txt -o solutions.jsonl
+    python3 batch_solve.py - --unordered < states.txt
+    python3 batch_solve.py states.txt -o solutions.jsonl --resume
+    python3 batch_solve.py states.txt --all-solutions --extra 1
+"""
+import argparse
+import collections
+import concurrent.futures
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time
+
+from src.cube_core import (
+    Cube, SolverProcess, StateFile, get_distance_table, get_solver_library, is_state_file, iter_solutions,
+    read_states, validate_cube,
+)
+from src.cube_core.batch import _solve_cube_table
+from src.cube_core.solvers import _parse_serve_response, _solve_cube_frontier, _solver_binary_path
+
+# Chunks in flight per worker process; bounds memory for unordered output and
+# keeps every worker busy while the next chunk is being read.
+CHUNKS_IN_FLIGHT = 4
+
+# Seconds the resident C solver may take over one state before it is
+# restarted and the state reported as an error
+SOLVE_TIMEOUT = 30.0
+
+# Raised by a resident solver that hangs, crashes or cannot be started
+_SOLVER_PROCESS_ERRORS = (OSError, EOFError, subprocess.TimeoutExpired)
+
+_table = None
+_library = None
+_solver = None
+
+
+def _load_backend():
+    """Loads the distance table (shared page cache), or the C solver library,
+    or sets up a resident C solver for this process (started on first use)."""
+    global _table, _library, _solver
+    if _table is not None or _library is not None or _solver is not None:
+        return
+    try:
+        _table = get_distance_table()
+    except RuntimeError as e:
+        print(f"[BATCH] {e}", file=sys.stderr)
+    if _table is None:
+        _library = get_solver_library()
+    if _table is None and _library is None and os.path.exists(_solver_binary_path()):
+        _solver = SolverProcess(_solver_binary_path())
+
+
+def _init_worker():
+    # Keep stray prints off the JSONL stream
+    sys.stdout = sys.stderr
+    _load_backend()
+
+
+def solve_state(state_str):
+    """Solves one state with the fastest backend this process has."""
+    cube = validate_cube(Cube(state_str))
+    if _table is not None:
+        return _solve_cube_table(cube, _table)
+    if _library is not None:
+        return _library.solve(str(cube))
+    if _solver is not None:
+        try:
+            if not _solver.is_alive():
+                _solver.restart()
+            return _parse_serve_response(_solver.request(str(cube), timeout=SOLVE_TIMEOUT))
+        except _SOLVER_PROCESS_ERRORS:
+            # Stop the process; the next state starts a fresh one
+            _solver.close()
+            raise
+    moves = _solve_cube_frontier(cube)
+    if moves is None:
+        raise RuntimeError("No solution found.")
+    return moves
+
+
+def enumerate_state(state_str, extra, max_solutions):
+    """Lists up to `max_solutions` solutions of at most optimal + `extra`
+    moves. Returns (solutions, truncated)."""
+    solutions = iter_solutions(Cube(state_str), extra, table=_table)
+    listed = list(itertools.islice(solutions, max_solutions + 1))
+    return listed[:max_solutions], len(listed) > max_solutions
+
+
+def solve_chunk(records, enumerate_options=None):
+    """Solves a list of (index, state, error) records; returns their JSON lines.
+    With `enumerate_options` (extra, max_solutions), lists every solution
+    instead of one."""
+    lines = []
+    for index, state, error in records:
+        result = {"index": index}
+        if state is not None:
+            result["state"] = state
+            try:
+                if enumerate_options is None:
+                    moves = solve_state(state)
+                    result["moves"] = moves
+                    result["length"] = len(moves)
+                else:
+                    solutions, truncated = enumerate_state(state, *enumerate_options)
+                    result["solutions"] = solutions
+                    result["length"] = len(solutions[0])
+                    result["truncated"] = truncated
+            except (ValueError, RuntimeError) as e:
+                error = str(e)
+            except _SOLVER_PROCESS_ERRORS as e:
+                error = f"C solver failed: {e}"
+        if error is not None:
+            result["error"] = error
+        lines.append(json.dumps(result) + "\n")
+    return lines
+
+
+def _chunks(records, size):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def run(records, out, jobs, ordered=True, chunk_size=256, progress=False, enumerate_options=None):
+    """Solves `records` on `jobs` processes, writing JSON lines to `out`.
+    Returns the number of states written."""
+    written = 0
+    start = time.time()
+
+    def emit(lines):
+        nonlocal written
+        out.writelines(lines)
+        before = written
+        written += len(lines)
+        if progress and written // 10000 != before // 10000:
+            rate = written / max(time.time() - start, 1e-9)
+            print(f"[BATCH] {written} states ({rate:.0f}/s)", file=sys.stderr, flush=True)
+
+    if jobs == 1:
+        _load_backend()
+        for chunk in _chunks(records, chunk_size):
+            emit(solve_chunk(chunk, enumerate_options))
+        return written
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker) as pool:
+        pending = collections.deque() if ordered else set()
+        for chunk in _chunks(records, chunk_size):
+            if len(pending) >= jobs * CHUNKS_IN_FLIGHT:
+                if ordered:
+                    emit(pending.popleft().result())
+                else:
+                    done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        emit(future.result())
+            future = pool.submit(solve_chunk, chunk, enumerate_options)
+            if ordered:
+                pending.append(future)
+            else:
+                pending.add(future)
+        iterator = pending if ordered else concurrent.futures.as_completed(pending)
+        for future in iterator:
+            emit(future.result())
+    return written
+
+
+def completed_indices(path):
+    """Reads a previous output file: returns a bytearray with 1 at every index
+    already written, after cutting off a partially written last line."""
+    done = bytearray()
+    if not os.path.exists(path):
+        return done
+    with open(path, "rb+") as f:
+        end = 0
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            end += len(line)
+            index = json.loads(line)["index"]
+            if index >= len(done):
+                done.extend(bytes(index + 1 - len(done)))
+            done[index] = 1
+        f.truncate(end)
+    return done
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve many cube states and stream JSONL results.")
+    parser.add_argument("input", help="state file, or - for stdin")
+    parser.add_argument("-o", "--output", help="JSONL output file (default: stdout)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="worker processes (default: cores)")
+    parser.add_argument("--unordered", action="store_true", help="write results as they finish, not in input order")
+    parser.add_argument("--chunk-size", type=int, default=256, help="states per task sent to a worker")
+    parser.add_argument("--start", type=int, default=0, help="skip the first N states of the input")
+    parser.add_argument("--resume", action="store_true", help="skip states already in --output and append to it")
+    parser.add_argument("--progress", action="store_true", help="report progress on stderr")
+    parser.add_argument("--all-solutions", action="store_true", help="list every solution, not just one")
+    parser.add_argument("--extra", type=int, default=0,
+                        help="with --all-solutions, also list solutions up to N moves longer than optimal")
+    parser.add_argument("--max-solutions", type=int, default=1000,
+                        help="with --all-solutions, at most N solutions per state (default 1000)")
+    args = parser.parse_args()
+    if args.resume and not args.output:
+        parser.error("--resume needs --output")
+    if args.extra < 0 or args.max_solutions < 1:
+        parser.error("--extra must be >= 0 and --max-solutions >= 1")
+    enumerate_options = (args.extra, args.max_solutions) if args.all_solutions else None
+
+    done = completed_indices(args.output) if args.resume else bytearray()
+    if args.input != "-" and is_state_file(args.input):
+        state_file = StateFile(args.input)
+        source = None
+        states = ((str(cube), None) for cube, _ in state_file)
+    else:
+        source = sys.stdin if args.input == "-" else open(args.input)
+        states = read_states(source)
+    out = open(args.output, "a" if args.resume else "w") if args.output else sys.stdout
+    # Anything else printed (e.g. debug lines) must not end up in the JSONL stream
+    sys.stdout = sys.stderr
+    records = ((index, state, error) for index, (state, error) in enumerate(states)
+               if index >= args.start and not (index < len(done) and done[index]))
+    try:
+        written = run(records, out, max(1, args.jobs), ordered=not args.unordered,
+                      chunk_size=args.chunk_size, progress=args.progress, enumerate_options=enumerate_options)
+    finally:
+        out.flush()
+        if source is None:
+            state_file.close()
+        elif source is not sys.stdin:
+            source.close()
+    print(f"[BATCH] Solved {written} states", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Benchmarks the pure-Python bidirectional BFS (_solve_cube_python): wall time
+and peak traced memory (tracemalloc, in a second untimed run) per solve, on a fixed set of scrambles.
+
+Usage: python3 benchmarks/bench_python_search.py [--count N] [--seed S]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.cube_core import MOVES, Cube  # noqa: E402
+from src.cube_core.solvers import _solve_cube_python  # noqa: E402
+
+
+def _scrambles(count, seed):
+    rng = random.Random(seed)
+    cubes = []
+    for _ in range(count):
+        cube = Cube()
+        for _ in range(30):
+            cube = cube.apply_move(rng.choice(MOVES))
+        cubes.append(cube)
+    return cubes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=20, help="number of random scrambles")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for the scrambles")
+    args = parser.parse_args()
+
+    times, peaks, lengths = [], [], []
+    for cube in _scrambles(args.count, args.seed):
+        # Timed without tracing, which would slow every allocation down
+        start = time.perf_counter()
+        solution = _solve_cube_python(cube)
+        times.append(time.perf_counter() - start)
+        lengths.append(len(solution))
+
+        tracemalloc.start()
+        _solve_cube_python(cube)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    print(f"solves:          {len(times)} (mean length {statistics.mean(lengths):.2f})")
+    print(f"time mean/max:   {statistics.mean(times) * 1000:.1f} / {max(times) * 1000:.1f} ms")
+    print(f"peak mem mean/max: {statistics.mean(peaks) / 1e6:.2f} / {max(peaks) / 1e6:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Benchmarks every solver backend on seeded scrambles at each optimal distance
+(0-11): latency p50/p95/p99, throughput, nodes visited and peak RSS, written
+as JSON so two commits can be compared.
+
+Each backend runs in its own Python process, so its peak RSS is not mixed
+with the others'. The scrambles are sampled uniformly from the states at
+each distance (found by a BFS over all 3,674,160 states), so the same seed
+gives the same set on every machine.
+
+Usage:
+    python3 benchmarks/bench_solvers.py -o bench.json [--count N] [--seed S] [--backends a,b]
+    python3 benchmarks/bench_solvers.py --compare old.json new.json
+"""
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.cube_core import (  # noqa: E402
+    MAX_DISTANCE, N_ORI, Cube, coords_to_stickers_batch, get_distance_table, optimal_distances, solvers,
+    stickers_to_states,
+)
+from src.cube_core.batch import _coord_batch_tables, _solve_cube_table, _symmetry_tables  # noqa: E402
+
+
+def scrambles(count, seed):
+    """Returns {distance: [state strings]}, up to `count` distinct states per distance."""
+    rng = np.random.default_rng(seed)
+    depth = optimal_distances()
+    result = {}
+    for d in range(MAX_DISTANCE + 1):
+        indices = np.flatnonzero(depth == d)
+        picked = np.sort(rng.choice(indices, size=min(count, indices.size), replace=False))
+        stickers = coords_to_stickers_batch(picked // N_ORI, picked % N_ORI)
+        result[d] = [str(Cube(packed_state=p)) for p in stickers_to_states(stickers)]
+    return result
+
+
+def _peak_rss_kib(pid="self"):
+    """High-water RSS of a live process (VmHWM), in KiB. Unlike ru_maxrss it is
+    not inherited across fork/exec, so it measures the process alone."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if pid == "self" else None
+
+
+# --- Backends ---
+# Each factory sets up a backend and returns solve(cube, stats) -> moves, or
+# raises RuntimeError if the backend is not available in this tree. A solver
+# that can count its work stores it in stats["nodes"].
+
+def _python_backend():
+    return lambda cube, stats: solvers._solve_cube_python(cube, stats=stats)
+
+
+def _frontier_backend():
+    _coord_batch_tables()
+    _symmetry_tables()
+    return lambda cube, stats: solvers._solve_cube_frontier(cube, stats=stats)
+
+
+def _ida_backend():
+    solvers._pruning_tables()
+    return lambda cube, stats: solvers._solve_cube_ida(cube, stats=stats)
+
+
+def _table_backend():
+    table = get_distance_table()
+    if table is None:
+        raise RuntimeError("bin/distance_table.bin not generated (make table)")
+    return lambda cube, stats: _solve_cube_table(cube, table)
+
+
+def _library_backend():
+    if not os.path.exists(solvers._solver_library_path()):
+        raise RuntimeError("bin/libcubesolver.so not built (make build)")
+    library = solvers.SolverLibrary()
+    return lambda cube, stats: library.solve(str(cube))
+
+
+def _c_ida_backend():
+    if not os.path.exists(solvers._solver_library_path()):
+        raise RuntimeError("bin/libcubesolver.so not built (make build)")
+    library = solvers.SolverLibrary()
+    return lambda cube, stats: library.solve_ida(str(cube))
+
+
+def _serve_backend():
+    if not os.path.exists(solvers._solver_binary_path()):
+        raise RuntimeError("bin/solver not built (make build)")
+    worker = solvers.SolverProcess(solvers._solver_binary_path())
+    worker.start()
+    _resident_pids.append(worker.proc.pid)
+    return lambda cube, stats: solvers._parse_serve_response(worker.request(str(cube), timeout=30.0))
+
+
+def _oneshot_backend():
+    if not os.path.exists(solvers._solver_binary_path()):
+        raise RuntimeError("bin/solver not built (make build)")
+    return lambda cube, stats: solvers._try_c_solver_oneshot(cube)
+
+
+# Resident solver processes started by a backend, measured before exit
+_resident_pids = []
+
+BACKENDS = {
+    "python": _python_backend,
+    "frontier": _frontier_backend,
+    "ida": _ida_backend,
+    "table": _table_backend,
+    "library": _library_backend,
+    "c-ida": _c_ida_backend,
+    "serve": _serve_backend,
+    "oneshot": _oneshot_backend,
+}
+
+
+def _summary(latencies_ns, nodes, lengths, elapsed):
+    ms = np.asarray(latencies_ns, dtype=np.float64) / 1e6
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99]) if ms.size else (None, None, None)
+    return {
+        "solves": int(ms.size),
+        "p50_ms": p50, "p95_ms": p95, "p99_ms": p99,
+        "mean_ms": float(ms.mean()) if ms.size else None,
+        "throughput_per_s": ms.size / elapsed if elapsed > 0 else None,
+        "mean_nodes": float(np.mean(nodes)) if nodes else None,
+        "mean_length": float(np.mean(lengths)) if lengths else None,
+    }
+
+
+def run_backend(name, states):
+    """Solves `states` ({distance: [state strings]}) with one backend in this
+    process and returns its result record."""
+    baseline_rss = _peak_rss_kib()
+    try:
+        solve = BACKENDS[name]()
+    except RuntimeError as e:
+        return {"backend": name, "skipped": str(e)}
+    # Untimed warm-up: lazy tables, first mmap faults, library init
+    warm_up = Cube().apply_move("R")
+    solve(warm_up, {})
+    record = {"backend": name, "distances": {}, "errors": 0, "suboptimal": 0}
+    all_latencies, all_nodes, all_lengths, total_time = [], [], [], 0.0
+    for d, batch in sorted(states.items(), key=lambda item: int(item[0])):
+        latencies, nodes, lengths = [], [], []
+        for state in batch:
+            cube = Cube(state)
+            stats = {}
+            start = time.perf_counter_ns()
+            try:
+                moves = solve(cube, stats)
+            except (RuntimeError, ValueError):
+                moves = None
+            latencies.append(time.perf_counter_ns() - start)
+            if moves is None:
+                record["errors"] += 1
+            else:
+                lengths.append(len(moves))
+                record["suboptimal"] += len(moves) > int(d)
+            if "nodes" in stats:
+                nodes.append(stats["nodes"])
+        elapsed = sum(latencies) / 1e9
+        record["distances"][str(d)] = _summary(latencies, nodes, lengths, elapsed)
+        all_latencies += latencies
+        all_nodes += nodes
+        all_lengths += lengths
+        total_time += elapsed
+    record["overall"] = _summary(all_latencies, all_nodes, all_lengths, total_time)
+    record["baseline_rss_kib"] = baseline_rss
+    record["peak_rss_kib"] = _peak_rss_kib()
+    # Resident C processes; one-shot processes have exited and are not measured
+    child_peaks = [_peak_rss_kib(pid) for pid in _resident_pids]
+    record["peak_child_rss_kib"] = max([p for p in child_peaks if p is not None], default=None)
+    return record
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def _scramble_worker(count, seed):
+    """Prints the scrambles as JSON. Run in its own process, so the 3.7M-state
+    BFS does not raise the peak RSS the backend processes inherit."""
+    json.dump(scrambles(count, seed), sys.stdout)
+
+
+def _worker(name):
+    """Reads the scrambles as JSON from stdin and prints one result record."""
+    states = json.load(sys.stdin)
+    out = sys.stdout
+    # Solver debug prints must not mix with the JSON record
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        record = run_backend(name, states)
+    json.dump(record, out)
+
+
+def compare(old_path, new_path):
+    """Prints the overall p50/p95 latency of each backend in two result files."""
+    with open(old_path) as f:
+        old = {r["backend"]: r for r in json.load(f)["results"]}
+    with open(new_path) as f:
+        new = {r["backend"]: r for r in json.load(f)["results"]}
+    print(f"{'backend':<10} {'p50 old':>10} {'p50 new':>10} {'ratio':>7} {'p95 old':>10} {'p95 new':>10}")
+    for name in new:
+        if name not in old or "overall" not in old[name] or "overall" not in new[name]:
+            continue
+        a, b = old[name]["overall"], new[name]["overall"]
+        ratio = b["p50_ms"] / a["p50_ms"] if a["p50_ms"] else float("nan")
+        print(f"{name:<10} {a['p50_ms']:>10.3f} {b['p50_ms']:>10.3f} {ratio:>7.2f} "
+              f"{a['p95_ms']:>10.3f} {b['p95_ms']:>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-o", "--output", help="JSON result file (default: print a table only)")
+    parser.add_argument("--count", type=int, default=20, help="scrambles per distance")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for the scrambles")
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="comma-separated backends to run")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--scrambles-only", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        return _worker(args.worker)
+    if args.scrambles_only:
+        return _scramble_worker(args.count, args.seed)
+    if args.compare:
+        return compare(*args.compare)
+
+    names = [n for n in args.backends.split(",") if n]
+    unknown = [n for n in names if n not in BACKENDS]
+    if unknown:
+        parser.error(f"unknown backend(s): {', '.join(unknown)}")
+    payload = subprocess.run([sys.executable, os.path.abspath(__file__), "--scrambles-only",
+                              "--count", str(args.count), "--seed", str(args.seed)],
+                             capture_output=True, text=True, check=True).stdout
+    results = []
+    for name in names:
+        print(f"[BENCH] {name}...", file=sys.stderr, flush=True)
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", name],
+                              input=payload, capture_output=True, text=True)
+        if proc.returncode != 0:
+            results.append({"backend": name, "skipped": f"worker failed: {proc.stderr.strip()[-500:]}"})
+        else:
+            results.append(json.loads(proc.stdout))
+
+    print(f"{'backend':<10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'solves/s':>10} {'nodes':>10} {'peak RSS':>10}")
+    for r in results:
+        if "skipped" in r:
+            print(f"{r['backend']:<10} skipped: {r['skipped']}")
+            continue
+        o = r["overall"]
+        nodes = f"{o['mean_nodes']:.0f}" if o["mean_nodes"] is not None else "-"
+        rss_mib = (r["peak_rss_kib"] + (r["peak_child_rss_kib"] or 0)) / 1024
+        print(f"{r['backend']:<10} {o['p50_ms']:>9.3f} {o['p95_ms']:>9.3f} {o['p99_ms']:>9.3f} "
+              f"{o['throughput_per_s']:>10.0f} {nodes:>10} {rss_mib:>8.0f} MiB")
+
+    if args.output:
+        document = {
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": args.seed,
+            "count_per_distance": args.count,
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+        print(f"[BENCH] Results written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Converts cube states between the text formats and binary state files.
+
+Text input holds 24-character strings, one per line, or 6-line blocks in the
+format of the app's file loader (see read_states in src/cube_core/cube.py). A
+binary state file (see StateFileWriter in src/cube_core/batch.py) holds
+fixed-width records after a 64-byte header: 4 bytes per state with
+--encoding coord, 9 with packed, plus an optional solution per state with
+--solutions. The direction is picked from the input: a state file is written
+back out as text, anything else is read as text.
+
+States are validated and normalized on the way in; invalid ones are reported
+on stderr and skipped. Both directions stream, so files of any size convert
+in flat memory.
+
+Usage:
+    python3 convert_states.py states.txt -o states.cube [--encoding packed] [--solutions]
+    python3 convert_states.py states.cube -o states.txt [--blocks]
+"""
+import argparse
+import itertools
+import sys
+
+from src.cube_core import (
+    MAX_DISTANCE, MOVES, STATE_ENCODINGS, InvalidCubeError, StateFile, StateFileWriter, is_state_file, read_states,
+    solve_batch, states_to_stickers, validate_state,
+)
+from src.cube_core.cube import _generate_file_content_from_state
+
+BATCH_SIZE = 65536
+
+
+def text_to_state_file(source, path, encoding="coord", solutions=False):
+    """Writes the states read from the text stream `source` to a state file.
+    Returns (states written, states skipped)."""
+    skipped = 0
+
+    def valid_states():
+        nonlocal skipped
+        for index, (state, error) in enumerate(read_states(source)):
+            if error is None:
+                try:
+                    yield validate_state(state)
+                    continue
+                except InvalidCubeError as e:
+                    error = str(e)
+            print(f"[CONVERT] State {index} skipped: {error}", file=sys.stderr)
+            skipped += 1
+
+    states = valid_states()
+    with StateFileWriter(path, encoding, MAX_DISTANCE if solutions else 0) as writer:
+        while batch := list(itertools.islice(states, BATCH_SIZE)):
+            stickers = states_to_stickers(batch)
+            moves = None
+            if solutions:
+                solved, lengths = solve_batch(stickers)
+                moves = [[MOVES[m] for m in row[:n]] for row, n in zip(solved, lengths)]
+            writer.write_batch(stickers, moves)
+    return writer.count, skipped
+
+
+def state_file_to_text(path, out, blocks=False):
+    """Writes every state of a state file to the text stream `out`, as
+    24-character lines or, with `blocks`, 6-line blocks separated by blank
+    lines. Returns the number of states written."""
+    with StateFile(path) as states:
+        for i, (cube, _) in enumerate(states):
+            if blocks:
+                out.write(("\n" if i else "") + _generate_file_content_from_state(list(str(cube))) + "\n")
+            else:
+                out.write(str(cube) + "\n")
+        return len(states)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert cube states between text and binary state files.")
+    parser.add_argument("input", help="text states or a binary state file (- for text on stdin)")
+    parser.add_argument("-o", "--output", help="output file (default: stdout, text only)")
+    parser.add_argument("--encoding", choices=list(STATE_ENCODINGS), default="coord",
+                        help="state encoding of a binary output file (default: coord)")
+    parser.add_argument("--solutions", action="store_true", help="store an optimal solution with each state")
+    parser.add_argument("--blocks", action="store_true", help="write text as 6-line blocks instead of one line per state")
+    args = parser.parse_args()
+
+    if args.input != "-" and is_state_file(args.input):
+        out = open(args.output, "w") if args.output else sys.stdout
+        try:
+            written = state_file_to_text(args.input, out, args.blocks)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        print(f"[CONVERT] Wrote {written} states as text", file=sys.stderr)
+        return
+    if not args.output:
+        parser.error("writing a binary state file needs --output")
+    source = sys.stdin if args.input == "-" else open(args.input)
+    try:
+        written, skipped = text_to_state_file(source, args.output, args.encoding, args.solutions)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    print(f"[CONVERT] Wrote {written} states to {args.output} ({skipped} skipped)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,204 +1,183 @@
+"""Generates uniformly random cube states: 6-line fixture files, or large
+solved corpora for benchmarks and datasets.
+
+States are sampled by drawing uniform coordinate indices (every index is
+exactly one reachable state), so unlike random move scrambles they follow
+the true distribution over all 3,674,160 states. --per-distance instead
+draws the same number of states at each optimal distance 0-11.
+
+A corpus is an .npz file with one row per state:
+
+    index     uint32[N]      coordinate index (perm_rank * 729 + ori_rank)
+    states    uint8[N, 9]    packed stickers (see pack_states_batch)
+    distance  uint8[N]       optimal number of moves
+    moves     uint8[N, 11]   an optimal solution as indices into MOVES, 255-padded
+
+Chunks are sampled and solved on a process pool and written straight to
+disk-backed columns, so memory stays flat for millions of states. A given
+--seed gives the same corpus whatever the number of jobs.
+
+Usage:
+    python3 generate_states.py -n 1000000 -o corpus.npz [--seed S] [--jobs J]
+    python3 generate_states.py --per-distance 1000 -o strata.npz
+    python3 generate_states.py -n 5 --fixtures tests/fixtures/random
+"""
+import argparse
 import collections
+import concurrent.futures
 import os
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
 
-# --- Extracted from app.py ---
-# Define color mappings
-COLOR_MAP = {
-    'W': 'white',
-    'Y': 'yellow',
-    'R': 'red',
-    'O': 'orange',
-    'B': 'blue',
-    'G': 'green'
-}
+import numpy as np
 
-# Color to integer mapping for packing
-CHAR_TO_INT_COLOR = {
-    'W': 0, 'Y': 1, 'R': 2, 'O': 3, 'B': 4, 'G': 5
-}
-INT_TO_CHAR_COLOR = {v: k for k, v in CHAR_TO_INT_COLOR.items()}
-
-# Helper for packing/unpacking cube state into a single integer
-def _pack_state(state_char_list):
-    packed_int = 0
-    for i, char_color in enumerate(state_char_list):
-        int_color = CHAR_TO_INT_COLOR[char_color]
-        packed_int |= (int_color << (i * 3))
-    return packed_int
-
-def _unpack_state(packed_int):
-    state_char_list = [''] * 24
-    for i in range(24):
-        int_color = (packed_int >> (i * 3)) & 0b111
-        state_char_list[i] = INT_TO_CHAR_COLOR[int_color]
-    return "".join(state_char_list)
-
-SOLVED_STATE_STR = (
-    'WWWW' +  # U-face (White)
-    'GGGG' +  # F-face (Green)
-    'RRRR' +  # R-face (Red)
-    'BBBB' +  # B-face (Blue)
-    'OOOO' +  # L-face (Orange)
-    'YYYY'     # D-face (Yellow)
+from src.cube_core import (
+    MAX_DISTANCE, N_ORI, Cube, coords_to_stickers_batch, pack_states_batch, sample_coord_indices, solve_batch,
+    stickers_to_states,
 )
+from src.cube_core.cube import _generate_file_content_from_state
+
+CHUNK_SIZE = 65536
+# Chunks in flight per worker process (as in batch_solve.py)
+CHUNKS_IN_FLIGHT = 2
+COLUMNS = {
+    "index": (np.uint32, ()),
+    "states": (np.uint8, (9,)),
+    "distance": (np.uint8, ()),
+    "moves": (np.uint8, (MAX_DISTANCE,)),
+}
+
+
+def generate_chunk(seed, count, distance):
+    """Samples and solves one chunk. Returns its columns as a dict of arrays."""
+    indices = sample_coord_indices(count, np.random.default_rng(seed), distance)
+    stickers = coords_to_stickers_batch(indices // N_ORI, indices % N_ORI)
+    moves, lengths = solve_batch(stickers)
+    return {"index": indices.astype(np.uint32), "states": pack_states_batch(stickers),
+            "distance": lengths, "moves": moves}
+
+
+def plan_chunks(seed, count=None, per_distance=None, chunk_size=CHUNK_SIZE):
+    """The (seed, count, distance) of every chunk, in output order. Chunk
+    seeds are spawned from `seed`, so the output does not depend on how the
+    chunks are spread over processes."""
+    if per_distance is not None:
+        strata = [(d, per_distance) for d in range(MAX_DISTANCE + 1)]
+    else:
+        strata = [(None, count)]
+    sizes = [(d, min(chunk_size, n - start)) for d, n in strata for start in range(0, n, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    return [(s, size, d) for s, (d, size) in zip(seeds, sizes)]
+
+
+def _fill_columns(workdir, chunks, jobs, progress):
+    """Generates `chunks` on `jobs` processes into one memory-mapped .npy
+    file per column in `workdir`. The maps are flushed and released on
+    return. Returns the number of states written."""
+    total = sum(size for _, size, _ in chunks)
+    columns = {name: np.lib.format.open_memmap(os.path.join(workdir, name + ".npy"), mode="w+",
+                                               dtype=dtype, shape=(total, *shape))
+               for name, (dtype, shape) in COLUMNS.items()}
+    written = 0
+    start = time.time()
+
+    def store(result):
+        nonlocal written
+        n = len(result["index"])
+        for name, column in columns.items():
+            column[written:written + n] = result[name]
+        written += n
+        if progress:
+            rate = written / max(time.time() - start, 1e-9)
+            print(f"[GENERATE] {written}/{total} states ({rate:.0f}/s)", file=sys.stderr, flush=True)
+
+    if jobs == 1:
+        for chunk in chunks:
+            store(generate_chunk(*chunk))
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+            pending = collections.deque()
+            for chunk in chunks:
+                if len(pending) >= jobs * CHUNKS_IN_FLIGHT:
+                    store(pending.popleft().result())
+                pending.append(pool.submit(generate_chunk, *chunk))
+            for future in pending:
+                store(future.result())
+    for column in columns.values():
+        column.flush()
+    return written
+
+
+def write_corpus(path, chunks, jobs, compress=False, progress=False):
+    """Generates `chunks` on `jobs` processes into the .npz file at `path`.
+    Columns are filled through memory-mapped .npy files and then copied into
+    the archive, so neither step holds more than a few chunks in memory.
+    Returns the number of states written."""
+    workdir = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(path)), prefix=".generate_states.")
+    try:
+        written = _fill_columns(workdir, chunks, jobs, progress)
+        tmp_path = path + ".tmp"
+        with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED,
+                             allowZip64=True) as archive:
+            for name in COLUMNS:
+                archive.write(os.path.join(workdir, name + ".npy"), name + ".npy")
+        os.replace(tmp_path, path)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return written
+
+
+def write_fixtures(directory, count, seed, distance=None):
+    """Writes `count` uniformly random states as 6-line files state_<i>.txt,
+    the format of the app's file loader. Returns their paths."""
+    os.makedirs(directory, exist_ok=True)
+    indices = sample_coord_indices(count, seed, distance)
+    stickers = coords_to_stickers_batch(indices // N_ORI, indices % N_ORI)
+    paths = []
+    for i, state in enumerate(stickers_to_states(stickers)):
+        path = os.path.join(directory, f"state_{i}.txt")
+        with open(path, "w") as f:
+            f.write(_generate_file_content_from_state(list(str(Cube(packed_state=state)))))
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate uniformly random cube states.")
+    size = parser.add_mutually_exclusive_group(required=True)
+    size.add_argument("-n", "--count", type=int, help="number of states, uniform over all states")
+    size.add_argument("--per-distance", type=int, help="number of states at each optimal distance 0-11")
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument("-o", "--output", help=".npz corpus with solutions and distances")
+    output.add_argument("--fixtures", metavar="DIR", help="write 6-line state files to DIR instead")
+    parser.add_argument("--distance", type=int, help="with -n, only states at this optimal distance")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default 0)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="worker processes (default: cores)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="states per task sent to a worker")
+    parser.add_argument("--compress", action="store_true", help="deflate the .npz columns")
+    parser.add_argument("--progress", action="store_true", help="report progress on stderr")
+    args = parser.parse_args()
+    if args.distance is not None and args.per_distance is not None:
+        parser.error("--distance and --per-distance cannot be combined")
+
+    if args.fixtures:
+        if args.per_distance is not None:
+            parser.error("--fixtures takes -n")
+        paths = write_fixtures(args.fixtures, args.count, args.seed, args.distance)
+        print(f"[GENERATE] Wrote {len(paths)} state files to {args.fixtures}", file=sys.stderr)
+        return
+
+    if args.distance is not None:
+        chunks = [(s, n, args.distance) for s, n, _ in plan_chunks(args.seed, args.count, chunk_size=args.chunk_size)]
+    else:
+        chunks = plan_chunks(args.seed, args.count, args.per_distance, args.chunk_size)
+    start = time.time()
+    written = write_corpus(args.output, chunks, max(1, args.jobs), args.compress, args.progress)
+    print(f"[GENERATE] Wrote {written} states to {args.output} in {time.time() - start:.1f}s", file=sys.stderr)
+
 
-SOLVED_STATE_INT = _pack_state(list(SOLVED_STATE_STR))
-
-class Cube:
-    def __init__(self, state_str=None, packed_state=None):
-        if state_str is not None:
-            if len(state_str) != 24:
-                raise ValueError("Cube state string must be 24 characters long.")
-            if not all(c in CHAR_TO_INT_COLOR for c in state_str):
-                raise ValueError("Cube state string contains invalid colors.")
-            self.state = _pack_state(list(state_str))
-        elif packed_state is not None:
-            self.state = packed_state
-        else:
-            self.state = SOLVED_STATE_INT
-
-    def __eq__(self, other):
-        return isinstance(other, Cube) and self.state == other.state
-
-    def __hash__(self):
-        return hash(self.state)
-
-    def __str__(self):
-        return _unpack_state(self.state)
-
-    def is_solved(self):
-        return self.state == SOLVED_STATE_INT
-
-    def _get_color(self, packed_state, index):
-        return (packed_state >> (index * 3)) & 0b111
-
-    def _set_color(self, packed_state, index, color_int):
-        packed_state &= ~ (0b111 << (index * 3))
-        packed_state |= (color_int << (index * 3))
-        return packed_state
-
-    def _rotate_face(self, packed_state, face_start_index):
-        s = packed_state
-        start = face_start_index
-        c0 = self._get_color(s, start)
-        c1 = self._get_color(s, start + 1)
-        c2 = self._get_color(s, start + 2)
-        c3 = self._get_color(s, start + 3)
-        s = self._set_color(s, start, c2)
-        s = self._set_color(s, start + 2, c3)
-        s = self._set_color(s, start + 3, c1)
-        s = self._set_color(s, start + 1, c0)
-        return s
-
-    def apply_move(self, move):
-        new_packed_state = self.state
-        def _apply_single_move_packed(packed_state, m):
-            temp_packed_state = packed_state
-            if m == 'R':
-                temp_packed_state = self._rotate_face(temp_packed_state, 8)
-                val_U1 = self._get_color(packed_state, 1)
-                val_U3 = self._get_color(packed_state, 3)
-                val_F1 = self._get_color(packed_state, 5)
-                val_F3 = self._get_color(packed_state, 7)
-                val_D1 = self._get_color(packed_state, 21)
-                val_D3 = self._get_color(packed_state, 23)
-                val_B3 = self._get_color(packed_state, 15)
-                val_B1 = self._get_color(packed_state, 13)
-                temp_packed_state = self._set_color(temp_packed_state, 1, val_B3)
-                temp_packed_state = self._set_color(temp_packed_state, 3, val_B1)
-                temp_packed_state = self._set_color(temp_packed_state, 5, val_U1)
-                temp_packed_state = self._set_color(temp_packed_state, 7, val_U3)
-                temp_packed_state = self._set_color(temp_packed_state, 21, val_F1)
-                temp_packed_state = self._set_color(temp_packed_state, 23, val_F3)
-                temp_packed_state = self._set_color(temp_packed_state, 15, val_D1)
-                temp_packed_state = self._set_color(temp_packed_state, 13, val_D3)
-            elif m == 'U':
-                temp_packed_state = self._rotate_face(temp_packed_state, 0)
-                val_F0 = self._get_color(packed_state, 4)
-                val_F1 = self._get_color(packed_state, 5)
-                val_R0 = self._get_color(packed_state, 8)
-                val_R1 = self._get_color(packed_state, 9)
-                val_B0 = self._get_color(packed_state, 12)
-                val_B1 = self._get_color(packed_state, 13)
-                val_L0 = self._get_color(packed_state, 16)
-                val_L1 = self._get_color(packed_state, 17)
-                set_color_func = self._set_color # Alias for brevity
-                temp_packed_state = set_color_func(temp_packed_state, 4, val_R0)
-                temp_packed_state = set_color_func(temp_packed_state, 5, val_R1)
-                temp_packed_state = set_color_func(temp_packed_state, 8, val_B0)
-                temp_packed_state = set_color_func(temp_packed_state, 9, val_B1)
-                temp_packed_state = set_color_func(temp_packed_state, 12, val_L0)
-                temp_packed_state = set_color_func(temp_packed_state, 13, val_L1)
-                temp_packed_state = set_color_func(temp_packed_state, 16, val_F0)
-                temp_packed_state = set_color_func(temp_packed_state, 17, val_F1)
-            elif m == 'F':
-                temp_packed_state = self._rotate_face(temp_packed_state, 4)
-                val_U2 = self._get_color(packed_state, 2)
-                val_U3 = self._get_color(packed_state, 3)
-                val_R0 = self._get_color(packed_state, 8)
-                val_R2 = self._get_color(packed_state, 10)
-                val_D0 = self._get_color(packed_state, 20)
-                val_D1 = self._get_color(packed_state, 21)
-                val_L1 = self._get_color(packed_state, 17)
-                val_L3 = self._get_color(packed_state, 19)
-                set_color_func = self._set_color
-                temp_packed_state = set_color_func(temp_packed_state, 2, val_L1)
-                temp_packed_state = set_color_func(temp_packed_state, 3, val_L3)
-                temp_packed_state = set_color_func(temp_packed_state, 8, val_U2)
-                temp_packed_state = set_color_func(temp_packed_state, 10, val_U3)
-                temp_packed_state = set_color_func(temp_packed_state, 20, val_R0)
-                temp_packed_state = set_color_func(temp_packed_state, 21, val_R2)
-                temp_packed_state = set_color_func(temp_packed_state, 17, val_D0)
-                temp_packed_state = set_color_func(temp_packed_state, 19, val_D1)
-            else:
-                raise ValueError(f"Invalid move: {m}")
-            return temp_packed_state
-
-        if move.endswith("'"):
-            m = move[:-1]
-            new_packed_state = _apply_single_move_packed(new_packed_state, m)
-            new_packed_state = _apply_single_move_packed(new_packed_state, m)
-            new_packed_state = _apply_single_move_packed(new_packed_state, m)
-        elif move.endswith("2"):
-            m = move[:-1]
-            new_packed_state = _apply_single_move_packed(new_packed_state, m)
-            new_packed_state = _apply_single_move_packed(new_packed_state, m)
-        else:
-            new_packed_state = _apply_single_move_packed(new_packed_state, move)
-        return Cube(packed_state=new_packed_state)
-
-# Helper function to generate file content string from a 24-char state string
-def generate_file_content(state_24_char_str):
-    s = list(state_24_char_str)
-    lines = [
-        f"{s[0]}{s[1]}",
-        f"{s[2]}{s[3]}",
-        f"{s[16]}{s[17]}{s[4]}{s[5]}{s[8]}{s[9]}{s[12]}{s[13]}",
-        f"{s[18]}{s[19]}{s[6]}{s[7]}{s[10]}{s[11]}{s[14]}{s[15]}",
-        f"{s[20]}{s[21]}",
-        f"{s[22]}{s[23]}"
-    ]
-    return "
-".join(lines)
-
-# --- Main script to generate states ---
 if __name__ == "__main__":
-    solved_cube = Cube()
-
-    # Generate state1.txt (R move)
-    cube_state1 = solved_cube.apply_move("R")
-    with open("state1.txt", "w") as f:
-        f.write(generate_file_content(str(cube_state1)))
-    print("Generated state1.txt (R move)")
-
-    # Generate state2.txt (R then U moves)
-    cube_state2 = solved_cube.apply_move("R").apply_move("U")
-    with open("state2.txt", "w") as f:
-        f.write(generate_file_content(str(cube_state2)))
-    print("Generated state2.txt (R U moves)")
-
-    # Generate state3.txt (R then U then F moves)
-    cube_state3 = solved_cube.apply_move("R").apply_move("U").apply_move("F")
-    with open("state3.txt", "w") as f:
-        f.write(generate_file_content(str(cube_state3)))
-    print("Generated state3.txt (R U F moves)")
\ No newline at end of file
+    main()
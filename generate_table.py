@@ -0,0 +1,34 @@
+"""Builds bin/distance_table.bin, the optimal-distance table used by solve_cube
+and bin/solver (both map it read-only; see open_distance_table in src/cube_core/batch.py).
+
+Run once after checkout (or via `make table`). Uses the multi-threaded C
+builder in bin/libcubesolver.so when it has been built (under a second),
+otherwise the pure-Python BFS (a minute or so).
+
+Usage: python3 generate_table.py [--threads N] [--python]
+"""
+import argparse
+import os
+import sys
+import time
+
+from src.cube_core import SolverLibrary, build_distance_table, write_distance_table
+from src.cube_core.batch import _distance_table_path
+from src.cube_core.solvers import _solver_library_path
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build bin/distance_table.bin.")
+    parser.add_argument("--threads", type=int, default=0, help="C builder threads (default: one per core)")
+    parser.add_argument("--python", action="store_true", help="use the pure-Python BFS")
+    args = parser.parse_args()
+
+    path = _distance_table_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    start = time.time()
+    if not args.python and os.path.exists(_solver_library_path()):
+        SolverLibrary(load_table=False).build_table(path, threads=args.threads, verbose=True)
+        sys.stderr.flush()
+    else:
+        table = build_distance_table(updater_func=print)
+        write_distance_table(path, table)
+    print(f"Wrote {os.path.getsize(path)} bytes to {path} in {time.time() - start:.1f}s")
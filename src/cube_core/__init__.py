@@ -0,0 +1,69 @@
+"""Headless 2x2 cube core: the cube model, batched states, the distance
+table and the solvers, without the Streamlit UI.
+
+Names are loaded lazily, one submodule at a time, on first access:
+
+    metrics  instrumentation (standard library only)
+    cube     Cube, moves, coordinates, validation, 6-line text format
+             (standard library only)
+    batch    NumPy batches, sampling, symmetry, distance table, state files
+    solvers  solve_cube, SolveExecutor, the C solver bindings and the
+             Python searches (loads batch and NumPy)
+
+so `from src.cube_core import Cube` costs the cube module alone; see
+IMPORT_BUDGET_MS. Private helpers are imported from their submodule. The
+solvers' metrics are `solvers.METRICS`, not re-exported here, because the
+app replaces them.
+"""
+import importlib
+
+# Import-time budget, in milliseconds, of `from src.cube_core import Cube`
+# in a fresh interpreter (checked by tests/test_cube_core.py)
+IMPORT_BUDGET_MS = 100
+
+_EXPORTS = {
+    "metrics": (
+        "SPAN_BUCKETS", "HistogramSink", "LoggingSink", "Metrics", "PrometheusSink", "metrics_from_env",
+    ),
+    "cube": (
+        "BASE_MOVE_CYCLES", "CHAR_TO_INT_COLOR", "COLOR_MAP", "CORNER_COLORS", "CORNER_FACELETS", "CORNER_NAMES",
+        "INT_TO_CHAR_COLOR", "INVERSE_MOVE_INDEX", "MAX_DISTANCE", "MOVE_INDEX", "MOVE_SOURCES", "MOVES", "N_ORI",
+        "N_PERM", "N_STATES", "SOLVED_STATE_INT", "SOLVED_STATE_STR", "Cube", "InvalidCubeError",
+        "apply_move_packed", "coords_to_packed", "normalize_cube", "normalize_state", "packed_to_coords",
+        "read_states", "validate_cube", "validate_state",
+    ),
+    "batch": (
+        "DISTANCE_TABLE_ENCODING_MOD3", "DISTANCE_TABLE_HEADER", "DISTANCE_TABLE_MAGIC", "DISTANCE_TABLE_MOVE_SET",
+        "DISTANCE_TABLE_VERSION", "FACE_NAMES", "N_SYMMETRIES", "PACKED_STATE_BYTES", "SOLVED_STICKERS",
+        "STATE_ENCODINGS", "STATE_FILE_HEADER", "STATE_FILE_MAGIC", "STATE_FILE_MAX_MOVES", "STATE_FILE_VERSION",
+        "SYMMETRY_COLOR_MAPS", "SYMMETRY_INVERSES", "SYMMETRY_MOVE_MAPS", "SYMMETRY_STICKER_SOURCES",
+        "StateFile", "StateFileWriter", "apply_moves_batch", "apply_moves_coords_batch",
+        "build_distance_table", "canonical_state", "conjugate_stickers_batch",
+        "coords_to_stickers_batch", "get_distance_table", "is_solved_batch", "is_state_file",
+        "move_sequence_sources", "open_distance_table", "optimal_distances", "pack_states_batch",
+        "reduce_indices", "sample_coord_indices", "sample_cubes", "solution_from_canonical",
+        "solution_to_canonical", "states_to_stickers", "stickers_to_coords_batch", "stickers_to_states",
+        "unpack_states_batch", "write_distance_table",
+    ),
+    "solvers": (
+        "PREFETCH_QUEUE_SIZE", "SOLVER_BACKENDS", "SOLVER_MAX_MOVES", "SolutionCache", "SolveCancelled",
+        "SolveExecutor", "SolveTicket", "SolverLibrary", "SolverPool", "SolverProcess", "get_solution_cache",
+        "get_solver_library", "get_solver_pool", "iter_solutions", "solve_batch", "solve_cube",
+    ),
+}
+_MODULE_OF = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = sorted(_MODULE_OF)
+
+
+def __getattr__(name):
+    module = _MODULE_OF.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,812 @@
+"""NumPy batches of states: batched moves and coordinates, uniform sampling,
+symmetry reduction, the full distance table and binary state files."""
+import itertools
+import mmap
+import os
+import struct
+import zlib
+
+import numpy as np
+
+from .cube import (
+    CHAR_TO_INT_COLOR, CORNER_COLORS, CORNER_FACELETS, INVERSE_MOVE_INDEX, MAX_DISTANCE, MOVE_INDEX, MOVE_SOURCES,
+    MOVES, N_ORI, N_PERM, N_STATES, SOLVED_STATE_STR, Cube, _coord_index, _coord_move_tables, _ori_rank,
+    _ori_unrank, _perm_rank, _perm_unrank, packed_to_coords,
+)
+
+# The checkout holding bin/ (src/cube_core/ -> src/ -> root)
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# --- Batched states (NumPy) ---
+# Many states at once as a sticker matrix uint8[N, 24] (color codes as in
+# CHAR_TO_INT_COLOR) or as coordinate arrays (perm_ranks, ori_ranks). Moves
+# become fancy indexing over the whole batch instead of a Python loop.
+PACKED_STATE_BYTES = 9  # 24 stickers * 3 bits, little-endian like _pack_state
+
+SOLVED_STICKERS = np.array([CHAR_TO_INT_COLOR[c] for c in SOLVED_STATE_STR], dtype=np.uint8)
+_MOVE_SOURCE_ARRAY = np.array(MOVE_SOURCES, dtype=np.intp)
+_CORNER_FACELET_ARRAY = np.array(CORNER_FACELETS, dtype=np.intp)
+_CORNER_COLOR_CODES = np.array([[CHAR_TO_INT_COLOR[c] for c in colors] for colors in CORNER_COLORS],
+                               dtype=np.uint8)
+_STICKER_SHIFTS = np.arange(8, dtype=np.uint32) * 3
+_BYTE_SHIFTS = np.array([0, 8, 16], dtype=np.uint32)
+
+
+def _move_indices(moves):
+    """Normalizes a move name, a move index or a sequence of either to a list of indices."""
+    if isinstance(moves, (str, int, np.integer)):
+        moves = [moves]
+    indices = []
+    for move in moves:
+        if isinstance(move, str):
+            index = MOVE_INDEX.get(move)
+            if index is None:
+                raise ValueError(f"Invalid move: {move}")
+        else:
+            index = int(move)
+            if not 0 <= index < len(MOVES):
+                raise ValueError(f"Invalid move index: {move}")
+        indices.append(index)
+    return indices
+
+
+def move_sequence_sources(moves):
+    """Composes a move sequence into one source map (int array of 24):
+    after the sequence, sticker i holds what was at sources[i]."""
+    sources = np.arange(24, dtype=np.intp)
+    for m in _move_indices(moves):
+        sources = sources[_MOVE_SOURCE_ARRAY[m]]
+    return sources
+
+
+def apply_moves_batch(stickers, moves):
+    """
+    Applies one move or a move sequence to every state of a sticker matrix
+    uint8[N, 24] and returns the new matrix. The sequence is composed first,
+    so the batch is permuted once whatever its length.
+    """
+    stickers = np.asarray(stickers, dtype=np.uint8)
+    return stickers[..., move_sequence_sources(moves)]
+
+
+def is_solved_batch(stickers):
+    """Boolean array telling which rows of a sticker matrix are solved."""
+    return np.all(np.asarray(stickers) == SOLVED_STICKERS, axis=-1)
+
+
+def pack_states_batch(stickers):
+    """Packs a sticker matrix uint8[N, 24] into uint8[N, 9]: each row holds the
+    little-endian bytes of the integer _pack_state() returns for that state."""
+    stickers = np.asarray(stickers, dtype=np.uint32)
+    lead = stickers.shape[:-1]
+    # 8 stickers make a 24-bit word, i.e. exactly 3 bytes
+    words = (stickers.reshape(*lead, 3, 8) << _STICKER_SHIFTS).sum(axis=-1, dtype=np.uint32)
+    packed = (words[..., None] >> _BYTE_SHIFTS) & 0xFF
+    return packed.reshape(*lead, PACKED_STATE_BYTES).astype(np.uint8)
+
+
+def unpack_states_batch(packed):
+    """Inverse of pack_states_batch: uint8[N, 9] -> sticker matrix uint8[N, 24]."""
+    packed = np.asarray(packed, dtype=np.uint32)
+    lead = packed.shape[:-1]
+    words = (packed.reshape(*lead, 3, 3) << _BYTE_SHIFTS).sum(axis=-1, dtype=np.uint32)
+    stickers = (words[..., None] >> _STICKER_SHIFTS) & 0b111
+    return stickers.reshape(*lead, 24).astype(np.uint8)
+
+
+def states_to_stickers(states):
+    """Builds a sticker matrix from an iterable of Cubes, state strings or packed ints."""
+    packed = []
+    for state in states:
+        if isinstance(state, Cube):
+            state = state.state
+        elif isinstance(state, str):
+            state = Cube(state).state
+        packed.append(int(state).to_bytes(PACKED_STATE_BYTES, "little"))
+    raw = np.frombuffer(b"".join(packed), dtype=np.uint8).reshape(-1, PACKED_STATE_BYTES)
+    return unpack_states_batch(raw)
+
+
+def stickers_to_states(stickers):
+    """Converts a sticker matrix back to a list of packed ints (Cube(packed_state=...))."""
+    raw = pack_states_batch(stickers).tobytes()
+    return [int.from_bytes(raw[i:i + PACKED_STATE_BYTES], "little")
+            for i in range(0, len(raw), PACKED_STATE_BYTES)]
+
+
+_coord_arrays = None
+
+
+def _coord_batch_tables():
+    """NumPy views of the coordinate tables: perm_move (5040, 9), ori_move (729, 9),
+    and the unranked digits perm_digits (5040, 7), ori_digits (729, 7)."""
+    global _coord_arrays
+    if _coord_arrays is None:
+        perm_move, ori_move = _coord_move_tables()
+        _coord_arrays = (
+            np.array(perm_move, dtype=np.uint16).reshape(N_PERM, 9),
+            np.array(ori_move, dtype=np.uint16).reshape(N_ORI, 9),
+            np.array([_perm_unrank(r) for r in range(N_PERM)], dtype=np.uint8),
+            np.array([_ori_unrank(r) for r in range(N_ORI)], dtype=np.uint8),
+        )
+    return _coord_arrays
+
+
+def apply_moves_coords_batch(perm_ranks, ori_ranks, moves):
+    """Applies one move or a move sequence to arrays of cubie coordinates and
+    returns the new (perm_ranks, ori_ranks) arrays."""
+    perm_move, ori_move, _, _ = _coord_batch_tables()
+    perm_ranks = np.asarray(perm_ranks, dtype=np.intp)
+    ori_ranks = np.asarray(ori_ranks, dtype=np.intp)
+    for m in _move_indices(moves):
+        perm_ranks = perm_move[perm_ranks, m]
+        ori_ranks = ori_move[ori_ranks, m]
+    return perm_ranks.astype(np.intp), ori_ranks.astype(np.intp)
+
+
+def _expand_indices(indices, move_indices=None):
+    """All neighbors of an array of coordinate indices: an int64 array of shape
+    (len(indices), 9), column m holding the result of MOVES[m]."""
+    perm_move, ori_move, _, _ = _coord_batch_tables()
+    perm_ranks, ori_ranks = np.divmod(indices, N_ORI)
+    if move_indices is None:
+        return perm_move[perm_ranks].astype(np.int64) * N_ORI + ori_move[ori_ranks]
+    return perm_move[perm_ranks, move_indices].astype(np.int64) * N_ORI + ori_move[ori_ranks, move_indices]
+
+
+def _corner_code_tables():
+    """Lookup from a corner's three sticker colors (c0 * 36 + c1 * 6 + c2) to
+    its cubie and twist; -1 marks color triples that are not a real corner."""
+    cubies = np.full(216, -1, dtype=np.int8)
+    twists = np.full(216, -1, dtype=np.int8)
+    for cubie, colors in enumerate(_CORNER_COLOR_CODES.tolist()):
+        for twist in range(3):
+            seen = [colors[(k - twist) % 3] for k in range(3)]
+            code = seen[0] * 36 + seen[1] * 6 + seen[2]
+            cubies[code] = cubie
+            twists[code] = twist
+    return cubies, twists
+
+
+_CORNER_CODE_CUBIES, _CORNER_CODE_TWISTS = _corner_code_tables()
+
+
+def stickers_to_coords_batch(stickers):
+    """
+    Batched packed_to_coords: sticker matrix uint8[N, 24] -> (perm_ranks, ori_ranks).
+    Raises ValueError if any row is not reachable with U, R, F moves.
+    """
+    stickers = np.asarray(stickers, dtype=np.intp)
+    colors = stickers[:, _CORNER_FACELET_ARRAY]  # (N, 8, 3)
+    known = colors.max(axis=-1) < 6
+    codes = np.where(known, colors[..., 0] * 36 + colors[..., 1] * 6 + colors[..., 2], 0)
+    perm = _CORNER_CODE_CUBIES[codes].astype(np.intp)
+    ori = _CORNER_CODE_TWISTS[codes].astype(np.intp)
+    bad = (~known).any(axis=1) | (perm < 0).any(axis=1)
+    bad |= (np.sort(perm, axis=1) != np.arange(8)).any(axis=1)
+    bad |= (perm[:, 7] != 7) | (ori[:, 7] != 0) | (ori.sum(axis=1) % 3 != 0)
+    if bad.any():
+        raise ValueError(f"State {int(np.argmax(bad))} is not reachable with U, R, F moves.")
+    perm_ranks = np.zeros(len(stickers), dtype=np.intp)
+    for i in range(7):
+        smaller = (perm[:, i + 1:7] < perm[:, i:i + 1]).sum(axis=1)
+        perm_ranks = perm_ranks * (7 - i) + smaller
+    ori_ranks = np.zeros(len(stickers), dtype=np.intp)
+    for i in range(6):
+        ori_ranks = ori_ranks * 3 + ori[:, i]
+    return perm_ranks, ori_ranks
+
+
+def coords_to_stickers_batch(perm_ranks, ori_ranks):
+    """Batched coords_to_packed: coordinate arrays -> sticker matrix uint8[N, 24]."""
+    _, _, perm_digits, ori_digits = _coord_batch_tables()
+    perm_ranks = np.asarray(perm_ranks, dtype=np.intp)
+    ori_ranks = np.asarray(ori_ranks, dtype=np.intp)
+    if ((perm_ranks < 0) | (perm_ranks >= N_PERM) | (ori_ranks < 0) | (ori_ranks >= N_ORI)).any():
+        raise ValueError("Coordinates out of range.")
+    n = len(perm_ranks)
+    rows = np.arange(n)
+    stickers = np.empty((n, 24), dtype=np.uint8)
+    # DBL never moves
+    stickers[:, _CORNER_FACELET_ARRAY[7]] = _CORNER_COLOR_CODES[7]
+    perm = perm_digits[perm_ranks]
+    ori = ori_digits[ori_ranks]
+    for slot in range(7):
+        cubie, twist = perm[:, slot], ori[:, slot]
+        for k in range(3):
+            dest = _CORNER_FACELET_ARRAY[slot][(k + twist) % 3]
+            stickers[rows, dest] = _CORNER_COLOR_CODES[cubie, k]
+    return stickers
+
+
+# --- Uniform state sampling ---
+# Random move scrambles favor states near solved (and short scrambles never
+# reach the far ones); every coordinate index is exactly one reachable
+# state, so uniform indices are uniform states. Stratified samples draw
+# uniformly from the states at one optimal distance.
+_distance_strata = None
+
+
+def optimal_distances():
+    """
+    The optimal distance of every coordinate index, uint8[N_STATES], from a
+    level-by-level BFS over the coordinate move tables (about a second).
+    Built once and cached.
+    """
+    depth, _ = _strata()
+    return depth
+
+
+def _strata():
+    """(depth, (order, bounds)): the distance of every coordinate index, and
+    the indices sorted by distance, the states at distance d being
+    order[bounds[d]:bounds[d + 1]]."""
+    global _distance_strata
+    if _distance_strata is None:
+        depth = np.full(N_STATES, 255, dtype=np.uint8)
+        depth[0] = 0
+        frontier = np.array([0], dtype=np.int64)
+        d = 0
+        while frontier.size:
+            children = _expand_indices(frontier).ravel()
+            d += 1
+            # Duplicates in `children` just write the same depth twice
+            depth[children[depth[children] == 255]] = d
+            frontier = np.flatnonzero(depth == d)
+        order = np.argsort(depth, kind="stable").astype(np.int32)
+        bounds = np.searchsorted(depth[order], np.arange(d + 1))
+        _distance_strata = (depth, (order, bounds))
+    return _distance_strata
+
+
+def sample_coord_indices(count, rng=None, distance=None):
+    """
+    `count` coordinate indices drawn uniformly (with replacement) from all
+    3,674,160 states, or from the states at optimal `distance` (0-11).
+    `rng` is a numpy Generator or a seed. Returns an int64 array.
+    """
+    rng = np.random.default_rng(rng)
+    if distance is None:
+        return rng.integers(0, N_STATES, size=count, dtype=np.int64)
+    _, (order, bounds) = _strata()
+    if not 0 <= distance < len(bounds) - 1:
+        raise ValueError(f"No states at distance {distance} (the maximum is {len(bounds) - 2}).")
+    picks = rng.integers(bounds[distance], bounds[distance + 1], size=count)
+    return order[picks].astype(np.int64)
+
+
+def sample_cubes(count, rng=None, distance=None):
+    """`count` uniformly random Cubes (see sample_coord_indices)."""
+    indices = sample_coord_indices(count, rng, distance)
+    stickers = coords_to_stickers_batch(indices // N_ORI, indices % N_ORI)
+    return [Cube(packed_state=p) for p in stickers_to_states(stickers)]
+
+
+# --- Symmetry reduction ---
+# The whole-cube symmetries that keep the DBL corner in place are the 6
+# permutations of the x (R), y (U), z (F) axes: the identity, 2 rotations
+# about the UFR-DBL diagonal and 3 mirrors through planes containing it.
+# Each maps U, R, F turns to U, R, F turns (mirrors reverse the direction),
+# so it maps the <U, R, F> state space onto itself. Stickers move with the
+# cube and colors are relabeled so that the solved state stays solved.
+# Together with inversion (a state and the state its solution reaches from
+# solved have the same distance) a state has up to 12 equivalent forms.
+FACE_NAMES = "UFRBLD"
+_FACE_AXES = [(0, 1, 0), (0, 0, 1), (1, 0, 0), (0, 0, -1), (-1, 0, 0), (0, -1, 0)]
+
+
+def _build_symmetries():
+    """Returns (sticker_sources, color_maps, move_maps, inverses) for the 6 axis
+    permutations: after a symmetry, sticker i holds color_maps[s][color of
+    sticker sticker_sources[s][i]]; move_maps[s][m] is the image of MOVES[m]."""
+    sticker_keys = {}
+    for facelets in CORNER_FACELETS:
+        corner = tuple(sum(_FACE_AXES[f // 4][k] for f in facelets) for k in range(3))
+        for f in facelets:
+            sticker_keys[f] = (corner, _FACE_AXES[f // 4])
+    sticker_at = {key: f for f, key in sticker_keys.items()}
+
+    sources, color_maps, move_maps, axis_perms = [], [], [], []
+    for axis_perm in itertools.permutations(range(3)):
+        def turn(v, axis_perm=axis_perm):
+            return tuple(v[axis_perm[k]] for k in range(3))
+        dest = [sticker_at[(turn(corner), turn(axis))] for corner, axis in (sticker_keys[i] for i in range(24))]
+        src = [0] * 24
+        for i, d in enumerate(dest):
+            src[d] = i
+        face_dest = [_FACE_AXES.index(turn(axis)) for axis in _FACE_AXES]
+        color_map = [0] * 6
+        for face, to_face in enumerate(face_dest):
+            color_map[CHAR_TO_INT_COLOR[SOLVED_STATE_STR[face * 4]]] = CHAR_TO_INT_COLOR[SOLVED_STATE_STR[to_face * 4]]
+        mirror = sum(1 for a in range(3) for b in range(a + 1, 3) if axis_perm[a] > axis_perm[b]) % 2
+        move_map = []
+        for move in MOVES:
+            suffix = move[1:]
+            if mirror and suffix != "2":
+                suffix = "" if suffix == "'" else "'"
+            move_map.append(MOVE_INDEX[FACE_NAMES[face_dest[FACE_NAMES.index(move[0])]] + suffix])
+        sources.append(src)
+        color_maps.append(color_map)
+        move_maps.append(move_map)
+        axis_perms.append(axis_perm)
+    inverses = [axis_perms.index(tuple(p.index(k) for k in range(3))) for p in axis_perms]
+    return (np.array(sources, dtype=np.intp), np.array(color_maps, dtype=np.uint8),
+            move_maps, inverses)
+
+
+SYMMETRY_STICKER_SOURCES, SYMMETRY_COLOR_MAPS, SYMMETRY_MOVE_MAPS, SYMMETRY_INVERSES = _build_symmetries()
+N_SYMMETRIES = len(SYMMETRY_MOVE_MAPS)  # 6, or 12 counting inversion
+
+
+def conjugate_stickers_batch(stickers, sym):
+    """Applies symmetry `sym` (0..5) to every row of a sticker matrix."""
+    stickers = np.asarray(stickers, dtype=np.uint8)
+    return SYMMETRY_COLOR_MAPS[sym][stickers[..., SYMMETRY_STICKER_SOURCES[sym]]]
+
+
+def _invert_coords(perm_rank, ori_rank):
+    """Cubie coordinates of the inverse state (cubie at i -> position i, twists negated)."""
+    perm = _perm_unrank(perm_rank)
+    ori = _ori_unrank(ori_rank)
+    inv_perm, inv_ori = [0] * 7, [0] * 7
+    for i in range(7):
+        inv_perm[perm[i]] = i
+        inv_ori[perm[i]] = -ori[i] % 3
+    return _perm_rank(inv_perm), _ori_rank(inv_ori)
+
+
+def canonical_state(packed_state):
+    """
+    Maps a state to the representative of its class under the 12 transforms
+    (6 symmetries, each with or without inversion): the one with the lowest
+    coordinate index. Returns (representative packed state, (sym, inverted));
+    solution_from_canonical() maps the representative's solution back.
+    Raises ValueError if the state is not reachable with U, R, F moves.
+    """
+    perm_rank, ori_rank = packed_to_coords(packed_state)
+    inv_perm_rank, inv_ori_rank = _invert_coords(perm_rank, ori_rank)
+    forms = coords_to_stickers_batch([perm_rank, inv_perm_rank], [ori_rank, inv_ori_rank])
+    candidates = np.concatenate([conjugate_stickers_batch(forms, sym) for sym in range(N_SYMMETRIES)])
+    perm_ranks, ori_ranks = stickers_to_coords_batch(candidates)
+    best = int(np.argmin(perm_ranks * N_ORI + ori_ranks))
+    sym, inverted = divmod(best, 2)
+    return stickers_to_states(candidates[best:best + 1])[0], (sym, bool(inverted))
+
+
+def solution_to_canonical(moves, transform):
+    """Inverse of solution_from_canonical(): turns a solution of the original
+    state into one of canonical_state()'s representative."""
+    sym, inverted = transform
+    if inverted:
+        moves = [MOVES[INVERSE_MOVE_INDEX[MOVE_INDEX[m]]] for m in reversed(moves)]
+    move_map = SYMMETRY_MOVE_MAPS[sym]
+    return [MOVES[move_map[MOVE_INDEX[m]]] for m in moves]
+
+
+def solution_from_canonical(moves, transform):
+    """Turns a solution of canonical_state()'s representative into a solution
+    of the original state, given the transform canonical_state() returned."""
+    sym, inverted = transform
+    move_map = SYMMETRY_MOVE_MAPS[SYMMETRY_INVERSES[sym]]
+    moves = [MOVES[move_map[MOVE_INDEX[m]]] for m in moves]
+    if inverted:
+        moves = [MOVES[INVERSE_MOVE_INDEX[MOVE_INDEX[m]]] for m in reversed(moves)]
+    return moves
+
+
+_sym_tables = None
+
+
+def _symmetry_tables():
+    """
+    Tables of the symmetry-reduced coordinate (perm_class * 729 + ori): a
+    state is replaced by the smallest of its 6 conjugates. The conjugated
+    twist coordinate is ori_conj[sym][ori] (+) perm_offset[sym][perm], a
+    digit-wise sum mod 3, so no table needs the full state space. perm_sym
+    is a symmetry taking each permutation to its class representative, and
+    perm_ambiguous marks the few permutations that several symmetries take
+    there, whose twists must be compared across all of them.
+    Returns (perm_class, perm_sym, perm_ambiguous, class_reps, perm_conj, ori_conj, perm_offset).
+    """
+    global _sym_tables
+    if _sym_tables is None:
+        all_perms = np.arange(N_PERM)
+        perm_states = coords_to_stickers_batch(all_perms, np.zeros(N_PERM, dtype=np.intp))
+        ori_states = coords_to_stickers_batch(np.zeros(N_ORI, dtype=np.intp), np.arange(N_ORI))
+        perm_conj = np.empty((N_SYMMETRIES, N_PERM), dtype=np.int64)
+        perm_offset = np.empty((N_SYMMETRIES, N_PERM), dtype=np.int64)
+        ori_conj = np.empty((N_SYMMETRIES, N_ORI), dtype=np.int64)
+        for sym in range(N_SYMMETRIES):
+            perm_conj[sym], perm_offset[sym] = stickers_to_coords_batch(conjugate_stickers_batch(perm_states, sym))
+            ori_conj[sym] = stickers_to_coords_batch(conjugate_stickers_batch(ori_states, sym))[1]
+        reps = perm_conj.min(axis=0)
+        perm_sym = perm_conj.argmin(axis=0)
+        perm_ambiguous = (perm_conj == reps).sum(axis=0) > 1
+        class_reps = np.unique(reps)
+        perm_class = np.searchsorted(class_reps, reps)
+        _sym_tables = (perm_class, perm_sym, perm_ambiguous, class_reps, perm_conj, ori_conj, perm_offset)
+    return _sym_tables
+
+
+def _ternary_add_table():
+    digits = np.array([[i // 9, i // 3 % 3, i % 3] for i in range(27)])
+    sums = (digits[:, None, :] + digits[None, :, :]) % 3
+    return sums[..., 0] * 9 + sums[..., 1] * 3 + sums[..., 2]
+
+
+# Digit-wise sum mod 3 of two 3-digit base-3 numbers; an ori rank is two of them
+_TERNARY_ADD27 = _ternary_add_table()
+
+
+def _ternary_add(a, b):
+    a_hi, a_lo = np.divmod(a, 27)
+    b_hi, b_lo = np.divmod(b, 27)
+    return _TERNARY_ADD27[a_hi, b_hi] * 27 + _TERNARY_ADD27[a_lo, b_lo]
+
+
+def reduce_indices(indices):
+    """Maps an array of coordinate indices to symmetry-reduced indices
+    (perm_class * 729 + ori of the smallest conjugate). Symmetric states
+    share one reduced index."""
+    perm_class, perm_sym, perm_ambiguous, _, perm_conj, ori_conj, perm_offset = _symmetry_tables()
+    perm_ranks, ori_ranks = np.divmod(np.asarray(indices, dtype=np.int64), N_ORI)
+    sym = perm_sym[perm_ranks]
+    conj_ori = _ternary_add(ori_conj[sym, ori_ranks], perm_offset[sym, perm_ranks])
+    ambiguous = perm_ambiguous[perm_ranks]
+    if ambiguous.any():
+        p, o = perm_ranks[ambiguous], ori_ranks[ambiguous]
+        candidates = perm_conj[:, p] * N_ORI + _ternary_add(ori_conj[:, o], perm_offset[:, p])
+        conj_ori[ambiguous] = candidates.min(axis=0) % N_ORI
+    return perm_class[perm_ranks] * N_ORI + conj_ori
+
+
+def _reduced_rep_indices(reduced):
+    """A coordinate index of a state of each reduced index (its representative)."""
+    class_reps = _symmetry_tables()[3]
+    perm_class, ori_ranks = np.divmod(np.asarray(reduced, dtype=np.int64), N_ORI)
+    return class_reps[perm_class] * N_ORI + ori_ranks
+
+
+def build_distance_table(updater_func=None):
+    """
+    Breadth-first search over all 3,674,160 states from the solved state.
+    Returns a bytearray with 2 bits per state holding (distance mod 3),
+    four states per byte, indexed by _coord_index().
+    """
+    perm_move, ori_move = _coord_move_tables()
+    depth = bytearray(b'\xff') * N_STATES
+    depth[0] = 0
+    frontier = [0]
+    d = 0
+    while frontier:
+        if updater_func:
+            updater_func(f"Depth {d}: {len(frontier)} states")
+        next_frontier = []
+        nd = d + 1
+        for idx in frontier:
+            p9 = (idx // N_ORI) * 9
+            o9 = (idx % N_ORI) * 9
+            for m in range(9):
+                n = perm_move[p9 + m] * N_ORI + ori_move[o9 + m]
+                if depth[n] == 255:
+                    depth[n] = nd
+                    next_frontier.append(n)
+        frontier = next_frontier
+        d = nd
+
+    table = bytearray((N_STATES + 3) // 4)
+    for idx in range(N_STATES):
+        table[idx >> 2] |= (depth[idx] % 3) << ((idx & 3) * 2)
+    return table
+
+
+def _table_get(table, idx):
+    return (table[idx >> 2] >> ((idx & 3) * 2)) & 3
+
+
+def _distance_table_path():
+    """Returns the path of the distance table (bin/distance_table.bin at the repository root)."""
+    return os.path.join(_REPO_ROOT, "bin", "distance_table.bin")
+
+
+# Distance table file: a 128-byte little-endian header followed by the
+# 2-bit table. solver.c reads the same layout (see table_open there).
+DISTANCE_TABLE_MAGIC = b"CUBEDTBL"
+DISTANCE_TABLE_VERSION = 1
+DISTANCE_TABLE_HEADER = struct.Struct("<8sIIIIIBBH32s24s40x")
+DISTANCE_TABLE_ENCODING_MOD3 = 1
+DISTANCE_TABLE_MOVE_SET = " ".join(MOVES).encode()
+
+
+def write_distance_table(path, table):
+    """Writes `table` with its header, atomically replacing any existing file
+    so processes that have the old one mapped keep a consistent view."""
+    header = DISTANCE_TABLE_HEADER.pack(
+        DISTANCE_TABLE_MAGIC, DISTANCE_TABLE_VERSION, DISTANCE_TABLE_HEADER.size,
+        N_STATES, len(table), zlib.crc32(table), 2, DISTANCE_TABLE_ENCODING_MOD3, 0,
+        DISTANCE_TABLE_MOVE_SET, SOLVED_STATE_STR.encode(),
+    )
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(table)
+    os.replace(tmp_path, path)
+
+
+def open_distance_table(path):
+    """
+    Maps a distance table file read-only and returns a memoryview of its
+    data section. The pages live in the shared page cache, so every worker
+    process mapping the same file shares one copy.
+    Raises RuntimeError if the header does not match this build.
+    """
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(mapped) < DISTANCE_TABLE_HEADER.size:
+        raise RuntimeError(f"❌ Distance table at {path} is truncated.")
+    (magic, version, header_size, n_states, data_size, checksum, bits, encoding, _,
+     move_set, color_scheme) = DISTANCE_TABLE_HEADER.unpack_from(mapped)
+    move_set = move_set.rstrip(b"\0")
+    if magic != DISTANCE_TABLE_MAGIC:
+        problem = "not a distance table (bad magic)"
+    elif version != DISTANCE_TABLE_VERSION:
+        problem = f"unsupported version {version}"
+    elif (header_size != DISTANCE_TABLE_HEADER.size or n_states != N_STATES
+          or data_size != (N_STATES + 3) // 4 or bits != 2 or encoding != DISTANCE_TABLE_ENCODING_MOD3):
+        problem = "unexpected layout"
+    elif len(mapped) != header_size + data_size:
+        problem = "truncated"
+    elif move_set != DISTANCE_TABLE_MOVE_SET:
+        problem = f"built for move set {move_set.decode()!r}"
+    elif color_scheme.decode() != SOLVED_STATE_STR:
+        problem = f"built for color scheme {color_scheme.decode()!r}"
+    else:
+        data = memoryview(mapped)[header_size:]
+        if zlib.crc32(data) == checksum:
+            return data
+        data.release()
+        problem = "checksum mismatch"
+    mapped.close()
+    raise RuntimeError(f"❌ Distance table at {path} is invalid: {problem}. Regenerate it with `make table`.")
+
+
+_distance_table = None
+
+
+def get_distance_table():
+    """Maps the distance table on first use. Returns None if it has not been
+    generated (see generate_table.py). Raises RuntimeError if it is invalid."""
+    global _distance_table
+    if _distance_table is None:
+        path = _distance_table_path()
+        if not os.path.exists(path):
+            return None
+        _distance_table = open_distance_table(path)
+    return _distance_table
+
+
+def _solve_cube_table(initial_cube: Cube, table):
+    """
+    Solves optimally by walking downhill through the distance table: from
+    a state at distance d, exactly the neighbors at distance d - 1 have
+    value (d - 1) mod 3. Raises ValueError if the state is not reachable
+    with U, R, F moves from the solved state.
+    """
+    perm_move, ori_move = _coord_move_tables()
+    idx = _coord_index(initial_cube.state)
+    solution = []
+    while idx != 0:
+        if len(solution) > MAX_DISTANCE:
+            raise RuntimeError(f"❌ Distance table is corrupt (walk exceeded {MAX_DISTANCE} moves).")
+        want = (_table_get(table, idx) - 1) % 3
+        p9 = (idx // N_ORI) * 9
+        o9 = (idx % N_ORI) * 9
+        for m in range(9):
+            n = perm_move[p9 + m] * N_ORI + ori_move[o9 + m]
+            if _table_get(table, n) == want:
+                break
+        else:
+            raise RuntimeError("❌ Distance table is corrupt (no downhill move).")
+        solution.append(MOVES[m])
+        idx = n
+    return solution
+
+
+# --- Binary state files ---
+# Many states in one file of fixed-width records after a 64-byte
+# little-endian header. cube_solver.c reads the same layout
+# (cube_state_file_open there).
+#   0  char[8]  magic "CUBESTAT"       28 uint8 state encoding (see below)
+#   8  uint32   version                29 uint8 moves per record (0: no solutions)
+#   12 uint32   header size            30 uint16 reserved
+#   16 uint64   number of records      32 char[24] solved state (color scheme)
+#   24 uint32   record size in bytes
+# A record is the state, as a uint32 coordinate index (encoding 1, states in
+# the <U, R, F> frame only) or as the 9 bytes of pack_states_batch()
+# (encoding 2, any sticker state), then, if the file has solutions, a uint8
+# solution length (255: none stored) and that many MOVES indices, padded
+# with 255.
+STATE_FILE_MAGIC = b"CUBESTAT"
+STATE_FILE_VERSION = 1
+STATE_FILE_HEADER = struct.Struct("<8sIIQIBBH24s8x")
+STATE_ENCODINGS = {"coord": 1, "packed": 2}
+STATE_FILE_MAX_MOVES = 24  # CUBE_MAX_MOVES, the most the C reader accepts
+_NO_SOLUTION = 255
+
+
+def _state_record_dtype(encoding, max_moves):
+    fields = [("state", "<u4") if encoding == STATE_ENCODINGS["coord"] else ("state", "u1", (PACKED_STATE_BYTES,))]
+    if max_moves:
+        fields += [("length", "u1"), ("moves", "u1", (max_moves,))]
+    return np.dtype(fields)
+
+
+class StateFileWriter:
+    """Writes a binary state file record by record, so a file of any size is
+    written in constant memory. The file appears at `path` (replacing any
+    existing one) only when the writer is closed.
+
+    `encoding` is "coord" (4 bytes per state, states in the <U, R, F> frame)
+    or "packed" (9 bytes, any state). With `max_moves` > 0 every record also
+    holds a solution of up to that many moves.
+    """
+
+    def __init__(self, path, encoding="coord", max_moves=0):
+        if encoding not in STATE_ENCODINGS:
+            raise ValueError(f"Unknown state encoding {encoding!r} (choose from {', '.join(STATE_ENCODINGS)})")
+        if not 0 <= max_moves <= STATE_FILE_MAX_MOVES:
+            raise ValueError(f"max_moves must be between 0 and {STATE_FILE_MAX_MOVES}")
+        self.path = path
+        self.encoding = STATE_ENCODINGS[encoding]
+        self.max_moves = max_moves
+        self.dtype = _state_record_dtype(self.encoding, max_moves)
+        self.count = 0
+        self._file = open(path + ".tmp", "wb")
+        self._file.write(self._header())
+
+    def _header(self):
+        return STATE_FILE_HEADER.pack(
+            STATE_FILE_MAGIC, STATE_FILE_VERSION, STATE_FILE_HEADER.size, self.count, self.dtype.itemsize,
+            self.encoding, self.max_moves, 0, SOLVED_STATE_STR.encode())
+
+    def write(self, cube: Cube, solution=None):
+        """Appends one state and, if the file has solutions, its moves (None: not known)."""
+        self.write_batch(states_to_stickers([cube]), None if solution is None else [solution])
+
+    def write_batch(self, stickers, solutions=None):
+        """Appends a sticker matrix uint8[N, 24] and optionally N solutions
+        (move lists, or None for a state without one).
+        Raises ValueError for a state the encoding cannot hold."""
+        stickers = np.asarray(stickers, dtype=np.uint8)
+        records = np.zeros(len(stickers), dtype=self.dtype)
+        if self.encoding == STATE_ENCODINGS["coord"]:
+            perm_ranks, ori_ranks = stickers_to_coords_batch(stickers)
+            records["state"] = perm_ranks * N_ORI + ori_ranks
+        else:
+            records["state"] = pack_states_batch(stickers)
+        if self.max_moves:
+            records["length"] = _NO_SOLUTION
+            records["moves"] = _NO_SOLUTION
+            for i, solution in enumerate(solutions or ()):
+                if solution is None:
+                    continue
+                if len(solution) > self.max_moves:
+                    raise ValueError(f"Solution of {len(solution)} moves does not fit in {self.max_moves}.")
+                records["length"][i] = len(solution)
+                records["moves"][i, :len(solution)] = [MOVE_INDEX[m] for m in solution]
+        self._file.write(records.tobytes())
+        self.count += len(records)
+
+    def close(self):
+        """Writes the record count into the header and moves the file into place."""
+        if self._file.closed:
+            return
+        self._file.seek(0)
+        self._file.write(self._header())
+        self._file.close()
+        os.replace(self.path + ".tmp", self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+            os.unlink(self.path + ".tmp")
+
+
+class StateFile:
+    """A binary state file mapped read-only: random access to any record
+    without reading the others, and chunked iteration for streaming.
+    Raises RuntimeError if the header does not match this build.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        problem = None
+        if len(self._mapped) < STATE_FILE_HEADER.size:
+            problem = "truncated"
+        else:
+            (magic, version, header_size, count, record_size, encoding, max_moves, _,
+             color_scheme) = STATE_FILE_HEADER.unpack_from(self._mapped)
+            if magic != STATE_FILE_MAGIC:
+                problem = "not a state file (bad magic)"
+            elif version != STATE_FILE_VERSION:
+                problem = f"unsupported version {version}"
+            elif (header_size != STATE_FILE_HEADER.size or encoding not in STATE_ENCODINGS.values()
+                  or max_moves > STATE_FILE_MAX_MOVES or record_size != _state_record_dtype(encoding, max_moves).itemsize):
+                problem = "unexpected layout"
+            elif len(self._mapped) != header_size + count * record_size:
+                problem = "truncated"
+            elif color_scheme.decode() != SOLVED_STATE_STR:
+                problem = f"written for color scheme {color_scheme.decode()!r}"
+        if problem:
+            self._mapped.close()
+            raise RuntimeError(f"❌ State file at {path} is invalid: {problem}.")
+        self.encoding = encoding
+        self.max_moves = max_moves
+        self.records = np.frombuffer(self._mapped, dtype=_state_record_dtype(encoding, max_moves),
+                                     count=count, offset=header_size)
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def has_solutions(self):
+        return self.max_moves > 0
+
+    def stickers(self, start=0, stop=None):
+        """Sticker matrix uint8[N, 24] of records start..stop."""
+        states = self.records["state"][start:stop]
+        if self.encoding == STATE_ENCODINGS["coord"]:
+            return coords_to_stickers_batch(states // N_ORI, states % N_ORI)
+        return unpack_states_batch(states)
+
+    def __getitem__(self, i):
+        """The Cube of record i."""
+        if not -len(self) <= i < len(self):
+            raise IndexError(f"record {i} out of range")
+        i %= len(self)
+        return Cube(packed_state=stickers_to_states(self.stickers(i, i + 1))[0])
+
+    def solution(self, i):
+        """The moves stored with record i, or None."""
+        if not self.has_solutions or self.records["length"][i] == _NO_SOLUTION:
+            return None
+        return [MOVES[m] for m in self.records["moves"][i, :self.records["length"][i]]]
+
+    def iter_chunks(self, chunk_size=65536):
+        """Yields (start, sticker matrix) for consecutive chunks of records;
+        only the pages of the current chunk are touched."""
+        for start in range(0, len(self), chunk_size):
+            yield start, self.stickers(start, start + chunk_size)
+
+    def __iter__(self):
+        """Yields (Cube, stored solution or None) for every record, in order."""
+        for start, stickers in self.iter_chunks():
+            for offset, state in enumerate(stickers_to_states(stickers)):
+                yield Cube(packed_state=state), self.solution(start + offset)
+
+    def close(self):
+        self.records = None
+        self._mapped.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def is_state_file(path):
+    """True if `path` starts with the state file magic."""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(STATE_FILE_MAGIC)) == STATE_FILE_MAGIC
+    except OSError:
+        return False
@@ -0,0 +1,549 @@
+"""The cube model in pure Python: sticker states packed into integers, the
+move engine, corner coordinates, color normalization, the solvability check
+and the 6-line text format. Importing it loads nothing beyond the standard
+library."""
+import collections
+
+
+# Define color mappings
+COLOR_MAP = {
+    'W': 'white',
+    'Y': 'yellow',
+    'R': 'red',
+    'O': 'orange',
+    'B': 'blue',
+    'G': 'green'
+}
+
+# Color to integer mapping for packing
+CHAR_TO_INT_COLOR = {
+    'W': 0, 'Y': 1, 'R': 2, 'O': 3, 'B': 4, 'G': 5
+}
+INT_TO_CHAR_COLOR = {v: k for k, v in CHAR_TO_INT_COLOR.items()}
+
+# Helper for packing/unpacking cube state into a single integer
+def _pack_state(state_char_list):
+    packed_int = 0
+    for i, char_color in enumerate(state_char_list):
+        int_color = CHAR_TO_INT_COLOR[char_color]
+        # Each color takes 3 bits. Sticker 0 is least significant.
+        packed_int |= (int_color << (i * 3))
+    return packed_int
+
+def _unpack_state(packed_int):
+    state_char_list = [''] * 24
+    for i in range(24):
+        int_color = (packed_int >> (i * 3)) & 0b111 # Extract 3 bits
+        state_char_list[i] = INT_TO_CHAR_COLOR[int_color]
+    return "".join(state_char_list) # Return as string for now
+
+# The solved state of a 2x2 cube
+# Faces: U, F, R, B, L, D (Up, Front, Right, Back, Left, Down)
+# Each face has 4 stickers.
+# Example: U-face stickers are indices 0-3, F-face are 4-7, etc.
+# This solved state assumes a standard color scheme:
+# U: White, D: Yellow
+# F: Green, B: Blue
+# R: Red, L: Orange
+SOLVED_STATE_STR = (
+    'WWWW' +  # U-face (White)
+    'GGGG' +  # F-face (Green)
+    'RRRR' +  # R-face (Red)
+    'BBBB' +  # B-face (Blue)
+    'OOOO' +  # L-face (Orange)
+    'YYYY'     # D-face (Yellow)
+)
+
+SOLVED_STATE_INT = _pack_state(list(SOLVED_STATE_STR))
+
+# Sticker indices for each face (relative to their own face)
+# U: 0, 1, 2, 3
+# F: 4, 5, 6, 7
+# R: 8, 9, 10, 11
+# B: 12, 13, 14, 15
+# L: 16, 17, 18, 19
+# D: 20, 21, 22, 23
+
+
+# --- Move engine ---
+# Move order shared with solver.c and the distance table file.
+MOVES = ['U', "U'", 'U2', 'R', "R'", 'R2', 'F', "F'", 'F2']
+MOVE_INDEX = {m: i for i, m in enumerate(MOVES)}
+# Move index of the inverse of each move in MOVES (X <-> X', X2 <-> X2)
+INVERSE_MOVE_INDEX = [MOVE_INDEX[m[0] + ("" if m.endswith("'") else "'" if len(m) == 1 else "2")]
+                      for m in MOVES]
+
+# Sticker cycles of each clockwise quarter turn: in (a, b, c, d) the sticker
+# at a moves to b, b to c, c to d and d to a. The first cycle turns the face
+# itself; the other two carry the adjacent stickers around it.
+BASE_MOVE_CYCLES = {
+    'U': [(0, 1, 3, 2), (4, 16, 12, 8), (5, 17, 13, 9)],     # F -> L -> B -> R -> F
+    'R': [(8, 9, 11, 10), (5, 1, 14, 21), (7, 3, 12, 23)],   # F -> U -> B -> D -> F
+    'F': [(4, 5, 7, 6), (2, 8, 21, 19), (3, 10, 20, 17)],    # U -> R -> D -> L -> U
+}
+
+
+def _move_sources():
+    """For each of the 9 moves, the source sticker of every destination:
+    after the move, sticker i holds what was at sources[i]."""
+    all_sources = []
+    for move in MOVES:
+        sources = list(range(24))
+        for cycle in BASE_MOVE_CYCLES[move[0]]:
+            for k, dest in enumerate(cycle):
+                sources[dest] = cycle[k - 1]
+        turns = 3 if move.endswith("'") else 2 if move.endswith("2") else 1
+        # Compose the quarter turn with itself instead of applying it repeatedly
+        quarter = sources
+        for _ in range(turns - 1):
+            sources = [sources[quarter[i]] for i in range(24)]
+        all_sources.append(sources)
+    return all_sources
+
+
+MOVE_SOURCES = _move_sources()
+
+# Each packed state is split into 8 chunks of 3 stickers (9 bits). For every
+# move and chunk, a 512-entry table holds the chunk's stickers already
+# shifted to their destinations, so one move is 8 lookups OR-ed together.
+_CHUNK_STICKERS = 3
+_CHUNK_BITS = _CHUNK_STICKERS * 3
+
+
+def _build_move_chunk_tables():
+    tables = []
+    for sources in MOVE_SOURCES:
+        dest_of = [0] * 24
+        for dest, src in enumerate(sources):
+            dest_of[src] = dest
+        move_tables = []
+        for chunk in range(24 // _CHUNK_STICKERS):
+            table = [0] * (1 << _CHUNK_BITS)
+            for value in range(1 << _CHUNK_BITS):
+                out = 0
+                for k in range(_CHUNK_STICKERS):
+                    color = (value >> (k * 3)) & 0b111
+                    out |= color << (dest_of[chunk * _CHUNK_STICKERS + k] * 3)
+                table[value] = out
+            move_tables.append(table)
+        tables.append(move_tables)
+    return tables
+
+
+_MOVE_CHUNK_TABLES = _build_move_chunk_tables()
+
+
+def apply_move_packed(state: int, move_index: int) -> int:
+    """Applies MOVES[move_index] to a packed state and returns the new packed state."""
+    t0, t1, t2, t3, t4, t5, t6, t7 = _MOVE_CHUNK_TABLES[move_index]
+    return (t0[state & 511] | t1[(state >> 9) & 511] | t2[(state >> 18) & 511]
+            | t3[(state >> 27) & 511] | t4[(state >> 36) & 511] | t5[(state >> 45) & 511]
+            | t6[(state >> 54) & 511] | t7[state >> 63])
+
+
+class Cube:
+    def __init__(self, state_str=None, packed_state=None):
+        if state_str is not None:
+            if len(state_str) != 24:
+                raise ValueError("Cube state string must be 24 characters long.")
+            if not all(c in CHAR_TO_INT_COLOR for c in state_str):
+                raise ValueError("Cube state string contains invalid colors.")
+            self.state = _pack_state(list(state_str))
+        elif packed_state is not None:
+            self.state = packed_state
+        else:
+            self.state = SOLVED_STATE_INT
+
+    def __eq__(self, other):
+        return isinstance(other, Cube) and self.state == other.state
+
+    def __hash__(self,):
+        return hash(self.state)
+
+    def __str__(self):
+        return _unpack_state(self.state)
+
+    def is_solved(self):
+        return self.state == SOLVED_STATE_INT
+
+    def apply_move(self, move):
+        """Returns a new Cube with `move` (e.g. 'R', "R'", 'R2') applied."""
+        move_index = MOVE_INDEX.get(move)
+        if move_index is None:
+            raise ValueError(f"Invalid move: {move}")
+        return Cube(packed_state=apply_move_packed(self.state, move_index))
+
+    def get_possible_moves(self):
+        """Returns a list of all valid moves for a 2x2 cube."""
+        return ['R', "R'", 'R2', 'U', "U'", 'U2', 'F', "F'", 'F2']
+
+    def to_coords(self):
+        """Returns the cubie coordinates (perm_rank, ori_rank) of this state.
+        Raises ValueError if the state is not reachable with U, R, F moves."""
+        return packed_to_coords(self.state)
+
+    @classmethod
+    def from_coords(cls, perm_rank, ori_rank):
+        """Builds the cube with the given cubie coordinates."""
+        return cls(packed_state=coords_to_packed(perm_rank, ori_rank))
+
+    def coord_index(self):
+        """Dense index 0..3674159 (perm_rank * 729 + ori_rank) of this state."""
+        return _coord_index(self.state)
+
+# --- Corner coordinates and the full distance table ---
+# The 8 corners, each as (U/D sticker, then the other two stickers clockwise).
+# U, R and F never move the DBL corner (index 7), so a reachable state is
+# fully described by the permutation and twist of the other 7 corners.
+CORNER_FACELETS = [
+    (3, 8, 5),     # UFR
+    (2, 4, 17),    # UFL
+    (0, 16, 13),   # UBL
+    (1, 12, 9),    # UBR
+    (21, 7, 10),   # DFR
+    (20, 19, 6),   # DFL
+    (23, 11, 14),  # DBR
+    (22, 15, 18),  # DBL
+]
+CORNER_COLORS = [tuple(SOLVED_STATE_STR[f] for f in facelets) for facelets in CORNER_FACELETS]
+_CORNER_BY_COLORS = {colors: i for i, colors in enumerate(CORNER_COLORS)}
+_UD_COLORS = {SOLVED_STATE_STR[0], SOLVED_STATE_STR[20]}
+
+N_PERM = 5040  # 7!
+N_ORI = 729    # 3^6, the 7th twist is implied
+N_STATES = N_PERM * N_ORI  # 3,674,160
+MAX_DISTANCE = 11  # every state is solvable in at most 11 moves
+
+
+def _corner_cubies(packed_state):
+    """Decodes a packed state into (perm, ori) lists over the 8 corner positions.
+    Raises ValueError if a corner's stickers do not form a real corner."""
+    state_str = _unpack_state(packed_state)
+    perm, ori = [], []
+    for facelets in CORNER_FACELETS:
+        colors = [state_str[f] for f in facelets]
+        twist = next((k for k, c in enumerate(colors) if c in _UD_COLORS), None)
+        cubie = None if twist is None else _CORNER_BY_COLORS.get(tuple(colors[twist:] + colors[:twist]))
+        if cubie is None:
+            raise ValueError(f"Invalid corner colors: {''.join(colors)}")
+        if cubie in perm:
+            raise ValueError(f"Corner {''.join(colors)} appears twice.")
+        perm.append(cubie)
+        ori.append(twist)
+    return perm, ori
+
+
+def _perm_rank(perm):
+    """Lehmer rank of a permutation of 0..6 (0..5039)."""
+    rank = 0
+    for i in range(7):
+        smaller = sum(1 for j in range(i + 1, 7) if perm[j] < perm[i])
+        rank = rank * (7 - i) + smaller
+    return rank
+
+
+def _perm_unrank(rank):
+    digits = []
+    for base in range(1, 8):
+        rank, d = divmod(rank, base)
+        digits.append(d)
+    available = list(range(7))
+    return [available.pop(d) for d in reversed(digits)]
+
+
+def _ori_rank(ori):
+    """Base-3 rank of the first 6 corner twists (0..728)."""
+    rank = 0
+    for twist in ori[:6]:
+        rank = rank * 3 + twist
+    return rank
+
+
+def _ori_unrank(rank):
+    ori = [0] * 7
+    for i in range(5, -1, -1):
+        rank, ori[i] = divmod(rank, 3)
+    ori[6] = -sum(ori[:6]) % 3
+    return ori
+
+
+def packed_to_coords(packed_state):
+    """
+    Converts a packed sticker state into cubie coordinates
+    (perm_rank 0..5039, ori_rank 0..728) of the 7 corners other than DBL.
+    Raises ValueError if the state is not reachable with U, R, F moves.
+    """
+    perm, ori = _corner_cubies(packed_state)
+    if perm[7] != 7 or ori[7] != 0:
+        raise ValueError("The DBL corner is not in its solved position.")
+    if sum(ori) % 3 != 0:
+        raise ValueError("Corner twists do not sum to a multiple of 3.")
+    return _perm_rank(perm[:7]), _ori_rank(ori[:7])
+
+
+def coords_to_packed(perm_rank, ori_rank):
+    """Inverse of packed_to_coords: rebuilds the packed sticker state."""
+    if not (0 <= perm_rank < N_PERM and 0 <= ori_rank < N_ORI):
+        raise ValueError(f"Coordinates out of range: ({perm_rank}, {ori_rank})")
+    perm = _perm_unrank(perm_rank) + [7]
+    ori = _ori_unrank(ori_rank) + [0]
+    stickers = [''] * 24
+    for facelets, cubie, twist in zip(CORNER_FACELETS, perm, ori):
+        for k, color in enumerate(CORNER_COLORS[cubie]):
+            stickers[facelets[(k + twist) % 3]] = color
+    return _pack_state(stickers)
+
+
+def _coord_index(packed_state):
+    """Perfect-hash index (perm_rank * 729 + ori_rank) of a state.
+    Raises ValueError if the state is not reachable with U, R, F moves."""
+    perm_rank, ori_rank = packed_to_coords(packed_state)
+    return perm_rank * N_ORI + ori_rank
+
+
+_coord_tables = None
+
+
+def _coord_move_tables():
+    """Returns (perm_move, ori_move), flat transition tables indexed by
+    rank * 9 + move index. Built once from the sticker-level moves."""
+    global _coord_tables
+    if _coord_tables is None:
+        move_cubies = [_corner_cubies(Cube().apply_move(m).state) for m in MOVES]
+        perm_move = [0] * (N_PERM * 9)
+        for rank in range(N_PERM):
+            perm = _perm_unrank(rank)
+            for m, (cp, _) in enumerate(move_cubies):
+                perm_move[rank * 9 + m] = _perm_rank([perm[cp[i]] for i in range(7)])
+        ori_move = [0] * (N_ORI * 9)
+        for rank in range(N_ORI):
+            ori = _ori_unrank(rank)
+            for m, (cp, co) in enumerate(move_cubies):
+                ori_move[rank * 9 + m] = _ori_rank([(ori[cp[i]] + co[i]) % 3 for i in range(7)])
+        _coord_tables = (perm_move, ori_move)
+    return _coord_tables
+
+
+# --- Orientation and color normalization ---
+# U, R and F turns never move the DBL position, so every solver keeps the
+# cubie found there fixed and expects it to read as the standard DBL corner.
+# A cube held another way up, or with another color scheme, is brought into
+# that frame by relabeling colors: the three colors of the cubie at DBL
+# become the D, B and L colors, and the color opposite each of them (the one
+# it never shares a corner with) the U, F and R colors. This is the whole-cube
+# rotation that brings that cubie home, seen from inside the cube: positions
+# do not change, so moves found for the normalized state apply unchanged to
+# the cube as it was entered.
+_DBL_STICKER_FACES = ((22, 5), (15, 3), (18, 4))  # (sticker, face) of D, B, L at DBL
+_OPPOSITE_FACE = [5, 3, 4, 1, 2, 0]  # U F R B L D -> D B L F R U
+
+
+def _opposite_colors(state_str):
+    """Maps each color to the one it never shares a corner with.
+    Raises ValueError if that is not exactly one color."""
+    neighbors = {c: set() for c in state_str}
+    for facelets in CORNER_FACELETS:
+        colors = {state_str[f] for f in facelets}
+        for c in colors:
+            neighbors[c] |= colors
+    opposite = {}
+    for color, seen in neighbors.items():
+        candidates = set(neighbors) - seen
+        if not candidates:
+            raise ValueError(f"{color} shares a corner with every other color, so no color is opposite it.")
+        if len(candidates) > 1:
+            raise ValueError(f"{color} never shares a corner with {' or '.join(sorted(candidates))}; "
+                             "only one color can be opposite it.")
+        opposite[color] = candidates.pop()
+    return opposite
+
+
+def normalize_state(state_str):
+    """
+    Relabels the colors of a 24-character state so that the cubie at DBL is
+    the standard DBL corner. Returns (normalized state string, translation
+    table for str.translate). Runs in constant time.
+    Raises ValueError if the stickers do not form 6 colors of 4 with a
+    consistent opposite for each.
+    """
+    counts = collections.Counter(state_str)
+    if len(state_str) != 24 or len(counts) != 6 or any(n != 4 for n in counts.values()):
+        raise ValueError("A cube needs 6 colors of 4 stickers each.")
+    opposite = _opposite_colors(state_str)
+    color_map = {}
+    for sticker, face in _DBL_STICKER_FACES:
+        color = state_str[sticker]
+        color_map[color] = SOLVED_STATE_STR[face * 4]
+        color_map[opposite[color]] = SOLVED_STATE_STR[_OPPOSITE_FACE[face] * 4]
+    if len(color_map) != 6:
+        raise ValueError("The DBL corner does not show three different faces.")
+    table = str.maketrans(color_map)
+    return state_str.translate(table), table
+
+
+def normalize_cube(cube: Cube) -> Cube:
+    """Cube whose colors are relabeled by normalize_state(); the same moves solve both."""
+    return Cube(normalize_state(str(cube))[0])
+
+
+# --- Solvability check ---
+# A 2x2 state is solvable exactly when its 8 corners are the 8 real pieces,
+# each once, and their twists add up to a multiple of 3 (any permutation of
+# the corners can be reached). After normalize_state() the DBL corner is at
+# home, so the state is then in the <U, R, F> frame every solver works in.
+CORNER_NAMES = ("UFR", "UFL", "UBL", "UBR", "DFR", "DFL", "DBR", "DBL")  # order of CORNER_FACELETS
+_CORNER_BY_COLOR_SET = {frozenset(colors): i for i, colors in enumerate(CORNER_COLORS)}
+_STANDARD_OPPOSITES = [(SOLVED_STATE_STR[face * 4], SOLVED_STATE_STR[_OPPOSITE_FACE[face] * 4]) for face in (0, 1, 2)]
+
+
+class InvalidCubeError(ValueError):
+    """A sticker state that no sequence of moves can solve."""
+
+
+def validate_state(state_str):
+    """
+    Checks that a 24-character state can be solved: only W, Y, R, O, B, G,
+    4 stickers of each, a consistent opposite for each color, the 8 real
+    corner pieces once each, and a total twist that is a multiple of 3.
+    Runs in constant time (a few dozen dict lookups). Any orientation and
+    color scheme is accepted.
+    Returns the normalized state string (see normalize_state).
+    Raises InvalidCubeError naming the first problem found.
+    """
+    if len(state_str) != 24:
+        raise InvalidCubeError(f"A cube has 24 stickers, got {len(state_str)}.")
+    for i, c in enumerate(state_str):
+        if c not in CHAR_TO_INT_COLOR:
+            raise InvalidCubeError(f"Invalid color character '{c}' at sticker {i} (use W, Y, R, O, B, G).")
+    counts = collections.Counter(state_str)
+    for color in COLOR_MAP:
+        if counts[color] != 4:
+            raise InvalidCubeError(
+                f"There must be exactly 4 '{color}' stickers. Found {counts[color]}.")
+    try:
+        normalized, _ = normalize_state(state_str)
+    except ValueError as e:
+        # Point at a corner if one breaks the standard scheme
+        for name, facelets in zip(CORNER_NAMES, CORNER_FACELETS):
+            colors = {state_str[f] for f in facelets}
+            shown = "-".join(state_str[f] for f in facelets)
+            if len(colors) < 3:
+                raise InvalidCubeError(f"Corner {name} ({shown}) shows the same color twice.") from None
+            for a, b in _STANDARD_OPPOSITES:
+                if a in colors and b in colors:
+                    raise InvalidCubeError(
+                        f"Corner {name} ({shown}) shows {a} and {b}, which are on opposite faces.") from None
+        raise InvalidCubeError(str(e)) from None
+    seen = {}
+    total_twist = 0
+    for name, facelets in zip(CORNER_NAMES, CORNER_FACELETS):
+        colors = tuple(normalized[f] for f in facelets)
+        shown = "-".join(state_str[f] for f in facelets)
+        twist = next((k for k, c in enumerate(colors) if c in _UD_COLORS), None)
+        cubie = None if twist is None else _CORNER_BY_COLORS.get(colors[twist:] + colors[:twist])
+        if cubie is None:
+            if frozenset(colors) in _CORNER_BY_COLOR_SET:
+                raise InvalidCubeError(
+                    f"Corner {name} ({shown}) is a mirror image of a real piece: two of its stickers are swapped.")
+            raise InvalidCubeError(f"Corner {name} ({shown}) is not a real corner piece.")
+        if cubie in seen:
+            raise InvalidCubeError(f"Corners {seen[cubie]} and {name} are the same piece ({shown}).")
+        seen[cubie] = name
+        total_twist += twist
+    if total_twist % 3:
+        raise InvalidCubeError(
+            f"Corner twists add up to {total_twist % 3} mod 3: a corner has been twisted in place.")
+    return normalized
+
+
+def validate_cube(cube: Cube) -> Cube:
+    """The normalized cube (see validate_state). Raises InvalidCubeError."""
+    return Cube(validate_state(str(cube)))
+
+
+# Helper functions for file I/O
+def _generate_file_content_from_state(cube_state_list):
+    """Generates the 6-line string content for saving to a file."""
+    s = cube_state_list
+    lines = [
+        f"{s[0]}{s[1]}",
+        f"{s[2]}{s[3]}",
+        f"{s[16]}{s[17]}{s[4]}{s[5]}{s[8]}{s[9]}{s[12]}{s[13]}",
+        f"{s[18]}{s[19]}{s[6]}{s[7]}{s[10]}{s[11]}{s[14]}{s[15]}",
+        f"{s[20]}{s[21]}",
+        f"{s[22]}{s[23]}"
+    ]
+    return "\n".join(lines)
+
+def _parse_file_content_to_state(file_content):
+    """Parses 6-line file content into a 24-character list."""
+    lines = file_content.strip().split('\n')
+    if len(lines) != 6:
+        raise ValueError("File must contain exactly 6 lines for cube state.")
+    
+    parsed_state = [''] * 24
+    
+    # U face
+    parsed_state[0] = lines[0][0]
+    parsed_state[1] = lines[0][1]
+    parsed_state[2] = lines[1][0]
+    parsed_state[3] = lines[1][1]
+
+    # Middle faces (L-F-R-B)
+    parsed_state[16] = lines[2][0] # L0
+    parsed_state[17] = lines[2][1] # L1
+    parsed_state[4] = lines[2][2]  # F0
+    parsed_state[5] = lines[2][3]  # F1
+    parsed_state[8] = lines[2][4]  # R0
+    parsed_state[9] = lines[2][5]  # R1
+    parsed_state[12] = lines[2][6] # B0
+    parsed_state[13] = lines[2][7] # B1
+
+    parsed_state[18] = lines[3][0] # L2
+    parsed_state[19] = lines[3][1] # L3
+    parsed_state[6] = lines[3][2]  # F2
+    parsed_state[7] = lines[3][3]  # F3
+    parsed_state[10] = lines[3][4] # R2
+    parsed_state[11] = lines[3][5] # R3
+    parsed_state[14] = lines[3][6] # B2
+    parsed_state[15] = lines[3][7] # B3
+
+    # D face
+    parsed_state[20] = lines[4][0]
+    parsed_state[21] = lines[4][1]
+    parsed_state[22] = lines[5][0]
+    parsed_state[23] = lines[5][1]
+
+    # Validate colors, counts and corner pieces
+    try:
+        validate_state("".join(parsed_state))
+    except InvalidCubeError as e:
+        raise InvalidCubeError(f"Invalid cube configuration: {e}") from None
+
+    return parsed_state
+
+
+def read_states(stream):
+    """Reads states from a text stream of 24-character strings, one per
+    line, or 6-line blocks (optionally separated by blank lines). Yields
+    (state string or None, error or None) per state of the input, in order."""
+    block = []
+    for line in stream:
+        line = line.strip()
+        if not line:
+            if block:
+                yield None, f"Incomplete 6-line state ({len(block)} lines)"
+                block = []
+            continue
+        if not block and len(line) == 24:
+            yield line, None
+            continue
+        block.append(line)
+        if len(block) == 6:
+            try:
+                yield "".join(_parse_file_content_to_state("\n".join(block))), None
+            except (ValueError, IndexError) as e:
+                yield None, str(e) or "Malformed 6-line state"
+            block = []
+    if block:
+        yield None, f"Incomplete 6-line state ({len(block)} lines)"
@@ -0,0 +1,159 @@
+"""Instrumentation: timed spans and counters recorded by the solver code and
+sent to pluggable sinks (log, in-memory histograms, Prometheus text)."""
+import collections
+import logging
+import os
+import threading
+import time
+
+_log = logging.getLogger("cube_solver")
+
+
+# --- Instrumentation ---
+# Solver code records timed spans (`with METRICS.span("c_solve"):`) and
+# counters (`METRICS.count("timeouts")`). Both go to the configured sinks;
+# with no sink, span() returns a shared no-op context manager and count()
+# returns at once, so instrumented code costs one attribute check.
+# A sink is any object with record_span(name, seconds) and
+# record_count(name, amount).
+
+SPAN_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        for sink in self.metrics.sinks:
+            sink.record_span(self.name, elapsed)
+        return False
+
+
+class Metrics:
+    """Fans timed spans and counters out to a list of sinks."""
+
+    def __init__(self, sinks=()):
+        self.sinks = tuple(sinks)
+
+    def add_sink(self, sink):
+        self.sinks = self.sinks + (sink,)
+        return sink
+
+    def span(self, name):
+        """Context manager timing the enclosed block as span `name`."""
+        if not self.sinks:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def count(self, name, amount=1):
+        if not self.sinks:
+            return
+        for sink in self.sinks:
+            sink.record_count(name, amount)
+
+
+class LoggingSink:
+    """Logs every span and counter increment to the `cube_solver.metrics` logger."""
+
+    def __init__(self, logger=None, level=logging.INFO):
+        self.logger = logger or logging.getLogger("cube_solver.metrics")
+        self.level = level
+
+    def record_span(self, name, seconds):
+        self.logger.log(self.level, "span %s %.3f ms", name, seconds * 1000)
+
+    def record_count(self, name, amount):
+        self.logger.log(self.level, "count %s +%d", name, amount)
+
+
+class HistogramSink:
+    """Keeps per-span latency histograms (SPAN_BUCKETS, in seconds) and counter totals in memory."""
+
+    def __init__(self, buckets=SPAN_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._spans = {}     # name -> [bucket counts..., +Inf count, sum of seconds]
+        self._counters = collections.Counter()
+
+    def record_span(self, name, seconds):
+        i = 0
+        while i < len(self.buckets) and seconds > self.buckets[i]:
+            i += 1
+        with self._lock:
+            hist = self._spans.get(name)
+            if hist is None:
+                hist = self._spans[name] = [0] * (len(self.buckets) + 1) + [0.0]
+            hist[i] += 1
+            hist[-1] += seconds
+
+    def record_count(self, name, amount):
+        with self._lock:
+            self._counters[name] += amount
+
+    def snapshot(self):
+        """Returns {"spans": {name: {"count", "sum", "buckets"}}, "counters": {...}};
+        bucket counts are per bucket (not cumulative), the last one is +Inf."""
+        with self._lock:
+            spans = {name: {"count": sum(hist[:-1]), "sum": hist[-1], "buckets": hist[:-1]}
+                     for name, hist in self._spans.items()}
+            return {"spans": spans, "counters": dict(self._counters)}
+
+
+class PrometheusSink(HistogramSink):
+    """A HistogramSink that renders its data in the Prometheus text exposition format."""
+
+    def render(self, prefix="cube_solver"):
+        snap = self.snapshot()
+        lines = [f"# HELP {prefix}_span_seconds Time spent per solver phase.",
+                 f"# TYPE {prefix}_span_seconds histogram"]
+        for name, span in sorted(snap["spans"].items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), span["buckets"]):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{prefix}_span_seconds_bucket{{span="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'{prefix}_span_seconds_sum{{span="{name}"}} {span["sum"]!r}')
+            lines.append(f'{prefix}_span_seconds_count{{span="{name}"}} {span["count"]}')
+        for name, total in sorted(snap["counters"].items()):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {total}")
+        return "\n".join(lines) + "\n"
+
+
+_SINK_TYPES = {"log": LoggingSink, "histogram": HistogramSink, "prometheus": PrometheusSink}
+
+
+def metrics_from_env():
+    """Builds a Metrics from CUBE_METRICS, a comma-separated list of sinks
+    (log, histogram, prometheus). Unset or empty: no sinks, no overhead."""
+    sinks = []
+    for name in os.environ.get("CUBE_METRICS", "").split(","):
+        name = name.strip()
+        if name in _SINK_TYPES:
+            sinks.append(_SINK_TYPES[name]())
+        elif name:
+            _log.warning("Ignoring unknown CUBE_METRICS sink %r (choose from %s)", name, ", ".join(_SINK_TYPES))
+    return Metrics(sinks)
@@ -0,0 +1,1215 @@
+"""Solver dispatch and engines: solve_cube() with its solution cache, the
+background SolveExecutor, the C solver (in-process library, resident
+processes or one-shot binary) and the Python searches (bidirectional BFS,
+NumPy frontier search, IDA*, solution enumeration)."""
+import array
+import atexit
+import collections
+import concurrent.futures
+import ctypes
+import logging
+import os
+import queue
+import select
+import subprocess
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from .batch import (
+    _REPO_ROOT, _distance_table_path, _expand_indices, _reduced_rep_indices, _solve_cube_table, _table_get,
+    canonical_state, get_distance_table, reduce_indices, solution_from_canonical, solution_to_canonical,
+    stickers_to_states,
+)
+from .cube import (
+    INT_TO_CHAR_COLOR, INVERSE_MOVE_INDEX, MAX_DISTANCE, MOVE_INDEX, MOVES, N_ORI, N_PERM, SOLVED_STATE_INT, Cube,
+    InvalidCubeError, _coord_index, _coord_move_tables, _generate_file_content_from_state, apply_move_packed,
+    packed_to_coords, validate_cube, validate_state,
+)
+from .metrics import metrics_from_env
+
+_log = logging.getLogger("cube_solver")
+
+METRICS = metrics_from_env()
+
+
+class SolutionCache:
+    """A thread-safe, size-bounded LRU cache of solutions, keyed by packed state.
+
+    Entries have no expiry; the least recently used one is evicted once
+    `capacity` entries are stored (0 disables the cache). Hit, miss and
+    eviction counts are kept for stats().
+    """
+
+    def __init__(self, capacity=None):
+        if capacity is None:
+            capacity = int(os.environ.get("CUBE_SOLUTION_CACHE_SIZE", "10000"))
+        self.capacity = capacity
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Returns the cached moves for `key` (a tuple), or None."""
+        with self._lock:
+            moves = self._entries.get(key)
+            if moves is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return moves
+
+    def put(self, key, moves):
+        with self._lock:
+            if self.capacity <= 0:
+                return
+            self._entries[key] = tuple(moves)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Returns a dict of the counters and current size."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "size": len(self._entries), "capacity": self.capacity}
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_default_solution_cache = None
+_default_solution_cache_lock = threading.Lock()
+
+
+def get_solution_cache():
+    """Returns the process-wide SolutionCache, creating it on first use."""
+    global _default_solution_cache
+    with _default_solution_cache_lock:
+        if _default_solution_cache is None:
+            _default_solution_cache = SolutionCache()
+        return _default_solution_cache
+
+
+SOLVER_BACKENDS = ("auto", "ida", "c-ida")
+
+
+def solve_cube(initial_cube: Cube, max_depth: int = 10, updater_func=None, pool=None, cache=None,
+               backend=None):
+    """
+    Solves a 2x2 Rubik's cube. Uses the precomputed distance table when it
+    is available, otherwise falls back to the C solver (shared library or
+    binary), or to the NumPy frontier search when neither has been built. Colors are
+    first normalized (see normalize_state), so the cube may be held any
+    way up and use any color scheme.
+    Solutions are cached under the symmetry class of the state (see
+    canonical_state), so a repeat of any state of the class is a cache hit.
+    Returns a list of moves to solve the cube.
+    Raises InvalidCubeError (a ValueError) if the state cannot be solved,
+    before any solver runs (see validate_state).
+    Raises RuntimeError if C solver fails or is not available.
+    `pool` is the SolverPool to use; defaults to the process-wide pool.
+    `cache` is the SolutionCache to use; defaults to the process-wide cache.
+    `backend` (default: $CUBE_SOLVER_BACKEND, else "auto") selects the engine:
+    "auto" for the cascade above, "ida" for the Python IDA* search, "c-ida"
+    for the C library's IDA* search. Both IDA* engines are optimal and use
+    a few KB of pruning tables instead of the distance table.
+    """
+    if backend is None:
+        backend = os.environ.get("CUBE_SOLVER_BACKEND", "auto")
+    if backend not in SOLVER_BACKENDS:
+        raise ValueError(f"Unknown solver backend {backend!r} (choose from {', '.join(SOLVER_BACKENDS)})")
+    with METRICS.span("solve_cube"):
+        try:
+            result = _solve_cube_cached(initial_cube, updater_func, pool, cache, backend)
+        except SolveCancelled:
+            METRICS.count("cancelled")
+            raise
+        except Exception:
+            METRICS.count("failures")
+            raise
+    METRICS.count("solves")
+    return result
+
+
+def _solve_cube_cached(initial_cube: Cube, updater_func, pool, cache, backend):
+    _log.debug("solve_cube() called with %s", initial_cube)
+    with METRICS.span("validate"):
+        normalized = validate_cube(initial_cube)
+        if normalized != initial_cube:
+            _log.debug("Normalized colors: %s", normalized)
+        initial_cube = normalized
+        key, transform = canonical_state(initial_cube.state)
+    if cache is None:
+        cache = get_solution_cache()
+    cached = cache.get(key)
+    if cached is not None:
+        METRICS.count("cache_hits")
+        result = solution_from_canonical(cached, transform)
+        _log.debug("solve_cube() returning cached solution: %s", result)
+        return result
+    METRICS.count("cache_misses")
+    if backend == "auto":
+        result = _solve_normalized_cube(initial_cube, updater_func=updater_func, pool=pool)
+    else:
+        result = _solve_cube_with_ida(initial_cube, native=backend == "c-ida")
+    cache.put(key, solution_to_canonical(result, transform))
+    return result
+
+
+def _solve_normalized_cube(initial_cube: Cube, updater_func=None, pool=None):
+    """The solver cascade of solve_cube() for a color-normalized cube."""
+    try:
+        table = get_distance_table()
+    except RuntimeError as e:
+        _log.debug("%s", e)
+        table = None
+    if table is not None:
+        try:
+            with METRICS.span("table_walk"):
+                result = _solve_cube_table(initial_cube, table)
+            _log.debug("solve_cube() returning table solution: %s", result)
+            return result
+        except ValueError as e:
+            _log.debug("Table lookup not possible (%s), falling back to C solver", e)
+    if not os.path.exists(_solver_binary_path()) and not os.path.exists(_solver_library_path()):
+        _log.debug("C solver not built, using NumPy frontier search")
+        try:
+            with METRICS.span("frontier_search"):
+                result = _solve_cube_frontier(initial_cube, updater_func=updater_func)
+        except ValueError as e:
+            raise RuntimeError(f"❌ Cube state cannot be solved: {e}") from e
+        if result is None:
+            raise RuntimeError("❌ Frontier search found no solution.")
+        _log.debug("solve_cube() returning frontier solution: %s", result)
+        return result
+    result = _try_c_solver(initial_cube, pool=pool)
+    _log.debug("solve_cube() returning: %s", result)
+    return result
+
+
+def _solve_cube_with_ida(initial_cube: Cube, native):
+    """The "ida" and "c-ida" backends of solve_cube()."""
+    if native:
+        library = get_solver_library()
+        if library is None:
+            raise RuntimeError(f"❌ C solver library not found at: {_solver_library_path()}")
+        with METRICS.span("c_solve"):
+            return library.solve_ida(str(initial_cube))
+    try:
+        with METRICS.span("ida_search"):
+            result = _solve_cube_ida(initial_cube)
+    except ValueError as e:
+        raise RuntimeError(f"❌ Cube state cannot be solved: {e}") from e
+    if result is None:
+        raise RuntimeError("❌ IDA* search found no solution.")
+    return result
+
+
+class SolveCancelled(RuntimeError):
+    """Raised by a solve whose every requester cancelled it."""
+
+
+class _Flight:
+    """One in-flight solve, shared by every ticket that asked for the same state."""
+
+    def __init__(self, key, speculative=False):
+        self.key = key
+        self.future = None
+        self.progress = None
+        self.cancel_event = threading.Event()
+        # A speculative solve (see SolveExecutor.prefetch) has no tickets
+        # until a real request joins it
+        self.speculative = speculative
+        self.tickets = 0 if speculative else 1
+
+
+class SolveTicket:
+    """A requester's handle on a (possibly shared) background solve."""
+
+    def __init__(self, executor, flight):
+        self._executor = executor
+        self._flight = flight
+        self.cancelled = False
+
+    @property
+    def state(self):
+        return self._flight.key[0]
+
+    @property
+    def progress(self):
+        """The last progress message of the solve, or None."""
+        return self._flight.progress
+
+    def done(self):
+        return self.cancelled or self._flight.future.done()
+
+    def result(self, timeout=None):
+        """Returns the moves; raises what the solve raised, or SolveCancelled."""
+        if self.cancelled:
+            raise SolveCancelled("❌ Solve cancelled.")
+        return self._flight.future.result(timeout)
+
+    def cancel(self):
+        """Withdraws this request. The solve itself stops once no ticket wants it."""
+        if not self.cancelled:
+            self.cancelled = True
+            self._executor._release(self._flight)
+
+
+# Most states waiting for a speculative solve: the current state and its
+# one-move neighbors for a few recent edits
+PREFETCH_QUEUE_SIZE = 4 * (len(MOVES) + 1)
+
+
+class SolveExecutor:
+    """Runs solves on a shared thread pool and returns SolveTickets.
+
+    Requests for the same state (and backend) made while a solve is running
+    join it instead of starting another (single flight). Cancelling the last
+    ticket of a solve drops it if it has not started, and otherwise stops it
+    at its next progress report; C solves cannot be interrupted, so their
+    result is discarded, and they hold their worker until they return.
+
+    prefetch() solves states nobody has asked for yet, only on idle workers
+    and at most `max_speculative` at a time (default: $CUBE_PREFETCH_LIMIT,
+    else one less than the workers, so a real request always finds a free
+    worker). Cancelled solves that are still running count against that
+    limit too. A real request for a state being prefetched joins that solve.
+    """
+
+    def __init__(self, max_workers=None, solve_func=None, max_speculative=None):
+        if max_workers is None:
+            max_workers = int(os.environ.get("CUBE_SOLVE_WORKERS", "2"))
+        if max_speculative is None:
+            max_speculative = int(os.environ.get("CUBE_PREFETCH_LIMIT", str(max_workers - 1)))
+        self.max_workers = max_workers
+        self.max_speculative = max_speculative
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers,
+                                                           thread_name_prefix="cube-solve")
+        self._solve_func = solve_func or solve_cube
+        self._lock = threading.Lock()
+        self._flights = {}
+        # Flights cancelled while running: no ticket wants them, but their
+        # worker stays busy until they return
+        self._abandoned = set()
+        # (cube, solve_kwargs) waiting for a speculative solve, newest last
+        self._prefetch_queue = collections.deque(maxlen=PREFETCH_QUEUE_SIZE)
+
+    def submit(self, cube: Cube, **solve_kwargs):
+        """Starts (or joins) a solve of `cube`; `solve_kwargs` go to solve_cube."""
+        key = (str(cube), solve_kwargs.get("backend"))
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None and not flight.cancel_event.is_set():
+                if flight.speculative:
+                    flight.speculative = False
+                    METRICS.count("prefetch_joins")
+                else:
+                    METRICS.count("single_flight_joins")
+                flight.tickets += 1
+                return SolveTicket(self, flight)
+            flight = self._start(key, cube, solve_kwargs)
+        self._watch([flight])
+        return SolveTicket(self, flight)
+
+    def prefetch(self, cubes, **solve_kwargs):
+        """Queues `cubes` for speculative solves, for their side effect on
+        the solution cache; `solve_kwargs` go to solve_cube. They start on
+        idle workers, in the order given, ahead of older queued states (which
+        are dropped once PREFETCH_QUEUE_SIZE are waiting). States already in
+        flight are skipped. Failures are ignored.
+        Returns the number of solves started at once."""
+        with self._lock:
+            self._prefetch_queue.extend((cube, solve_kwargs) for cube in reversed(list(cubes)))
+            started = self._start_prefetches()
+        self._watch(started)
+        return len(started)
+
+    def _start_prefetches(self):
+        """Starts queued speculative solves while the caps allow. Called with
+        the lock held; the caller passes the result to _watch()."""
+        started = []
+        while self._prefetch_queue and len(self._flights) + len(self._abandoned) < self.max_workers:
+            speculative = sum(f.speculative for f in self._flights.values())
+            if speculative + len(self._abandoned) >= self.max_speculative:
+                break
+            cube, solve_kwargs = self._prefetch_queue.pop()
+            key = (str(cube), solve_kwargs.get("backend"))
+            if key not in self._flights:
+                started.append(self._start(key, cube, solve_kwargs, speculative=True))
+        if started:
+            METRICS.count("prefetches", len(started))
+        return started
+
+    def _watch(self, flights):
+        # Outside the lock: a callback runs at once if its solve already finished
+        for flight in flights:
+            flight.future.add_done_callback(lambda _, flight=flight: self._forget(flight))
+
+    def _start(self, key, cube, solve_kwargs, speculative=False):
+        """Submits a new flight. Called with the lock held."""
+        flight = self._flights[key] = _Flight(key, speculative)
+        flight.future = self._pool.submit(self._run, flight, cube, solve_kwargs)
+        return flight
+
+    def _run(self, flight, cube, solve_kwargs):
+        def report(message):
+            if flight.cancel_event.is_set():
+                raise SolveCancelled("❌ Solve cancelled.")
+            flight.progress = message
+
+        report("Solving...")
+        return self._solve_func(cube, updater_func=report, **solve_kwargs)
+
+    def _forget(self, flight):
+        with self._lock:
+            if self._flights.get(flight.key) is flight:
+                del self._flights[flight.key]
+            self._abandoned.discard(flight)
+            # The worker is free again
+            started = self._start_prefetches()
+        self._watch(started)
+
+    def _release(self, flight):
+        with self._lock:
+            flight.tickets -= 1
+            if flight.tickets > 0:
+                return
+            flight.cancel_event.set()
+            if self._flights.get(flight.key) is flight:
+                del self._flights[flight.key]
+            if not flight.future.done():
+                # Until its _forget(), at once if it never started
+                self._abandoned.add(flight)
+        if flight.future.cancel():
+            METRICS.count("cancelled")
+
+    def in_flight(self):
+        """Number of distinct solves queued or running."""
+        with self._lock:
+            return len(self._flights)
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            self._prefetch_queue.clear()
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+def _solver_binary_path():
+    """Returns the path of the C solver binary (bin/solver at the repository root)."""
+    return os.path.join(_REPO_ROOT, "bin", "solver")
+
+
+def _try_c_solver(cube: Cube, pool=None):
+    """
+    Attempts to solve the cube using the C solver.
+    Calls the in-process library (bin/libcubesolver.so) when it is built,
+    otherwise a resident solver process from `pool`. CUBE_SOLVER_MODE=resident
+    forces the pool and CUBE_SOLVER_MODE=oneshot starts a fresh process for
+    this solve.
+    Returns a list of moves on success.
+    Raises RuntimeError with a descriptive message on failure.
+    """
+    mode = os.environ.get("CUBE_SOLVER_MODE", "library")
+    if mode == "oneshot":
+        return _try_c_solver_oneshot(cube)
+    if mode == "library":
+        library = get_solver_library()
+        if library is not None:
+            _log.debug("Solving via shared library: %s", cube)
+            with METRICS.span("c_solve"):
+                return library.solve(str(cube))
+    if pool is None:
+        pool = get_solver_pool()
+    _log.debug("Solving via resident pool: %s", cube)
+    return pool.solve(str(cube))
+
+
+def _try_c_solver_oneshot(cube: Cube):
+    """
+    Solves the cube by starting `bin/solver <file>` once for this state.
+    Returns a list of moves on success.
+    Raises RuntimeError with a descriptive message on failure.
+    """
+    solver_binary = _solver_binary_path()
+    if not os.path.exists(solver_binary):
+        raise RuntimeError(f"❌ C solver binary not found at: {solver_binary}")
+
+    # Write the state in the 6-line file format
+    with METRICS.span("tempfile_write"):
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
+            temp_file = f.name
+            f.write(_generate_file_content_from_state(list(str(cube))))
+
+    try:
+        _log.debug("Executing: %s %s", solver_binary, temp_file)
+        try:
+            with METRICS.span("process_spawn"):
+                proc = subprocess.Popen([solver_binary, temp_file], stdout=subprocess.PIPE,
+                                        stderr=subprocess.PIPE, text=True)
+        except OSError as e:
+            raise RuntimeError(f"❌ C solver binary not executable or not found: {e}")
+        try:
+            with METRICS.span("c_solve"):
+                stdout, stderr = proc.communicate(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+            METRICS.count("timeouts")
+            raise RuntimeError("❌ C solver timed out after 30 seconds")
+
+        if proc.returncode != 0:
+            stderr_snippet = (stderr or "")[:500]
+            raise RuntimeError(f"❌ C solver exited with code {proc.returncode}. Stderr: {stderr_snippet}")
+
+        with METRICS.span("parse"):
+            moves = _parse_oneshot_output(stdout or "")
+        _log.debug("C solver returned %s", moves)
+        return moves
+    finally:
+        if os.path.exists(temp_file):
+            try:
+                os.unlink(temp_file)
+            except Exception:
+                pass
+
+
+def _parse_oneshot_output(stdout):
+    """Extracts the moves from `bin/solver <file>` output ("Solution (n moves):"
+    followed by the moves line)."""
+    output_lines = stdout.strip().splitlines()
+    for i, line in enumerate(output_lines):
+        if 'Solution' in line and 'moves' in line:
+            if i + 1 < len(output_lines):
+                return output_lines[i + 1].split()
+            return []
+        if line == "Search memory budget exceeded.":
+            raise RuntimeError(_SOLVER_BUDGET_ERROR)
+        if line == "Unsolvable state.":
+            raise RuntimeError("❌ C solver rejected the state: unsolvable state")
+    raise RuntimeError(f"C solver returned no solution in stdout. Output: {stdout[:500]}")
+
+
+class SolverProcess:
+    """A resident `bin/solver --serve` process driven over its line protocol.
+
+    Each request is one line on stdin (`PING` or a 24-character state) and
+    each response is one line on stdout (`PONG`, `OK <n> <moves...>`,
+    `NOSOLUTION` or `ERR <message>`).
+    """
+
+    def __init__(self, binary_path):
+        self.binary_path = binary_path
+        self.proc = None
+        self.last_used = 0.0
+
+    def start(self):
+        with METRICS.span("process_spawn"):
+            self.proc = subprocess.Popen(
+                [self.binary_path, "--serve"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                text=True,
+                bufsize=1,
+            )
+        self.last_used = time.monotonic()
+
+    def is_alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def request(self, line, timeout):
+        """Sends one request line and returns the response line.
+
+        Raises subprocess.TimeoutExpired if no response arrives in time and
+        EOFError/OSError if the process has died.
+        """
+        if not self.is_alive():
+            raise EOFError("solver process is not running")
+        self.proc.stdin.write(line + "\n")
+        self.proc.stdin.flush()
+        ready, _, _ = select.select([self.proc.stdout], [], [], timeout)
+        if not ready:
+            raise subprocess.TimeoutExpired(self.proc.args, timeout)
+        response = self.proc.stdout.readline()
+        if not response:
+            raise EOFError("solver process exited")
+        self.last_used = time.monotonic()
+        return response.rstrip("\n")
+
+    def ping(self, timeout=5.0):
+        """Health check: True if the process answers PING with PONG."""
+        try:
+            return self.request("PING", timeout) == "PONG"
+        except (OSError, EOFError, subprocess.TimeoutExpired):
+            return False
+
+    def close(self):
+        if self.proc is None:
+            return
+        try:
+            if self.proc.poll() is None:
+                self.proc.stdin.write("QUIT\n")
+                self.proc.stdin.flush()
+                self.proc.wait(timeout=1)
+        except (OSError, subprocess.TimeoutExpired):
+            self.proc.kill()
+            self.proc.wait()
+        self.proc = None
+
+    def restart(self):
+        self.close()
+        self.start()
+
+
+def _parse_serve_response(response):
+    """Converts one `--serve` response line into a list of moves."""
+    if response.startswith("OK "):
+        return response.split()[2:]
+    if response == "NOSOLUTION":
+        raise RuntimeError("C solver returned no solution.")
+    if response == "ERR memory budget exceeded":
+        raise RuntimeError(_SOLVER_BUDGET_ERROR)
+    if response.startswith("ERR "):
+        raise RuntimeError(f"❌ C solver rejected the state: {response[4:]}")
+    raise RuntimeError(f"C solver returned an unrecognized response: {response[:500]}")
+
+
+class SolverPool:
+    """A bounded pool of resident solver processes shared by all sessions.
+
+    Processes are started on demand up to `size`, keep their search tables
+    allocated between solves, are pinged before reuse after `idle_ping`
+    seconds of inactivity, and are restarted if they crash or time out.
+    """
+
+    def __init__(self, binary_path=None, size=None, timeout=30.0, idle_ping=60.0):
+        self.binary_path = binary_path or _solver_binary_path()
+        self.size = size or int(os.environ.get("CUBE_SOLVER_POOL_SIZE", "2"))
+        self.timeout = timeout
+        self.idle_ping = idle_ping
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._workers = []
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._workers) < self.size:
+                worker = SolverProcess(self.binary_path)
+                self._workers.append(worker)
+                return worker
+        return self._idle.get()
+
+    def _ensure_healthy(self, worker):
+        if not worker.is_alive():
+            worker.restart()
+        elif time.monotonic() - worker.last_used > self.idle_ping and not worker.ping():
+            worker.restart()
+
+    def solve(self, state_str):
+        """Solves one 24-character state. Returns a list of moves."""
+        if not os.path.exists(self.binary_path):
+            raise RuntimeError(f"❌ C solver binary not found at: {self.binary_path}")
+        worker = self._acquire()
+        try:
+            self._ensure_healthy(worker)
+            for attempt in range(2):
+                try:
+                    with METRICS.span("c_solve"):
+                        response = worker.request(state_str, self.timeout)
+                    break
+                except subprocess.TimeoutExpired:
+                    worker.restart()
+                    METRICS.count("timeouts")
+                    raise RuntimeError(f"❌ C solver timed out after {self.timeout:g} seconds")
+                except (OSError, EOFError) as e:
+                    worker.restart()
+                    if attempt == 1:
+                        raise RuntimeError(f"❌ C solver process crashed: {e}")
+        finally:
+            self._idle.put(worker)
+        with METRICS.span("parse"):
+            return _parse_serve_response(response)
+
+    def health_check(self):
+        """Pings every idle process, restarting unresponsive ones.
+        Returns the number of processes that answered."""
+        healthy = 0
+        checked = []
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            checked.append(worker)
+            if worker.is_alive() and worker.ping():
+                healthy += 1
+            else:
+                worker.restart()
+        for worker in checked:
+            self._idle.put(worker)
+        return healthy
+
+    def close(self):
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.close()
+
+
+_default_solver_pool = None
+_default_solver_pool_lock = threading.Lock()
+
+
+def get_solver_pool():
+    """Returns the process-wide SolverPool, creating it on first use."""
+    global _default_solver_pool
+    with _default_solver_pool_lock:
+        if _default_solver_pool is None:
+            _default_solver_pool = SolverPool()
+            atexit.register(_default_solver_pool.close)
+        return _default_solver_pool
+
+
+def _solver_library_path():
+    """Returns the path of the C solver library (bin/libcubesolver.so at the repository root)."""
+    return os.path.join(_REPO_ROOT, "bin", "libcubesolver.so")
+
+
+# Mirrors cube_solver.h
+SOLVER_MAX_MOVES = 24
+_SOLVER_NO_SOLUTION = -1
+_SOLVER_INVALID_STATE = -2
+_SOLVER_OUT_OF_MEMORY = -3
+_SOLVER_BUDGET_ERROR = "❌ C solver search exceeded its memory budget (raise CUBE_BFS_MEMORY_MB)"
+# Sticker characters -> color codes, for bytes.translate
+_STICKER_CODES = bytes.maketrans(
+    "".join(INT_TO_CHAR_COLOR[i] for i in range(6)).encode(), bytes(range(6)))
+
+
+def _rejection_reason(state_str):
+    """Why the C solver rejects a state: the validate_state() diagnostic, or
+    that the state is solvable but not normalized into its frame."""
+    try:
+        validate_state(state_str)
+    except InvalidCubeError as e:
+        return str(e)
+    return "invalid state (the DBL corner is not home; normalize colors first)"
+
+
+class SolverLibrary:
+    """The C solver loaded in-process from bin/libcubesolver.so through ctypes.
+
+    ctypes releases the GIL for the duration of each call, so threads solve
+    in parallel. Batches given as a C-contiguous uint8 NumPy array or as
+    bytes are passed to C without copying.
+
+    The distance table at `table_path` (default: $CUBE_DISTANCE_TABLE, else
+    bin/distance_table.bin) is mapped if it exists. With `load_table` off,
+    no table is mapped and any mapped before in this process is dropped, so
+    solves use the BFS fallback.
+    """
+
+    def __init__(self, library_path=None, table_path=None, load_table=True):
+        self.library_path = library_path or _solver_library_path()
+        lib = ctypes.CDLL(self.library_path)
+        u8_p = ctypes.POINTER(ctypes.c_uint8)
+        lib.cube_solver_init.argtypes = [ctypes.c_char_p]
+        lib.cube_solver_init.restype = ctypes.c_int
+        lib.cube_solver_shutdown.argtypes = []
+        lib.cube_solver_shutdown.restype = None
+        lib.solve.argtypes = [ctypes.c_char_p, u8_p]
+        lib.solve.restype = ctypes.c_int
+        lib.solve_ida.argtypes = [ctypes.c_char_p, u8_p]
+        lib.solve_ida.restype = ctypes.c_int
+        lib.solve_many.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_void_p, ctypes.c_void_p]
+        lib.solve_many.restype = ctypes.c_size_t
+        lib.cube_build_table.argtypes = [ctypes.c_char_p, ctypes.c_int, ctypes.c_int]
+        lib.cube_build_table.restype = ctypes.c_int
+        lib.cube_solver_set_memory_budget.argtypes = [ctypes.c_size_t]
+        lib.cube_solver_set_memory_budget.restype = ctypes.c_size_t
+        size_p = ctypes.POINTER(ctypes.c_size_t)
+        lib.cube_solver_memory.argtypes = [size_p, size_p, size_p]
+        lib.cube_solver_memory.restype = None
+        lib.cube_state_file_open.argtypes = [ctypes.c_char_p]
+        lib.cube_state_file_open.restype = ctypes.c_void_p
+        lib.cube_state_file_count.argtypes = [ctypes.c_void_p]
+        lib.cube_state_file_count.restype = ctypes.c_uint64
+        lib.cube_state_file_read.argtypes = [ctypes.c_void_p, ctypes.c_uint64, ctypes.c_void_p, ctypes.c_void_p]
+        lib.cube_state_file_read.restype = ctypes.c_int
+        lib.cube_state_file_close.argtypes = [ctypes.c_void_p]
+        lib.cube_state_file_close.restype = None
+        self._lib = lib
+        if not load_table:
+            lib.cube_solver_init(None)
+            lib.cube_solver_shutdown()
+            self.has_table = False
+            return
+        if table_path is None:
+            table_path = os.environ.get("CUBE_DISTANCE_TABLE", _distance_table_path())
+        self.has_table = bool(lib.cube_solver_init(os.fsencode(table_path)))
+
+    def solve(self, state_str):
+        """Solves one 24-character state. Returns a list of moves."""
+        return self._solve_with(self._lib.solve, state_str)
+
+    def solve_ida(self, state_str):
+        """Like solve(), but always with the C IDA* engine (no table, flat memory)."""
+        return self._solve_with(self._lib.solve_ida, state_str)
+
+    def _solve_with(self, solve_func, state_str):
+        if len(state_str) != 24:
+            raise RuntimeError("❌ C solver rejected the state: invalid state")
+        moves = (ctypes.c_uint8 * SOLVER_MAX_MOVES)()
+        n = solve_func(state_str.encode().translate(_STICKER_CODES), moves)
+        if n == _SOLVER_INVALID_STATE:
+            raise RuntimeError(f"❌ C solver rejected the state: {_rejection_reason(state_str)}")
+        if n == _SOLVER_NO_SOLUTION:
+            raise RuntimeError("C solver returned no solution.")
+        if n == _SOLVER_OUT_OF_MEMORY:
+            raise RuntimeError(_SOLVER_BUDGET_ERROR)
+        return [MOVES[m] for m in moves[:n]]
+
+    def solve_many(self, stickers):
+        """Solves a batch of states: an (N, 24) uint8 array of color codes, or
+        bytes holding N * 24 codes back to back. Returns (moves, lengths):
+        moves is (N, SOLVER_MAX_MOVES) uint8 move indices into MOVES, and
+        lengths holds each solution length, -1 (no solution), -2 (invalid)
+        or -3 (memory budget exceeded)."""
+        if isinstance(stickers, (bytes, bytearray, memoryview)):
+            stickers = np.frombuffer(stickers, dtype=np.uint8).reshape(-1, 24)
+        stickers = np.ascontiguousarray(stickers, dtype=np.uint8)
+        if stickers.ndim != 2 or stickers.shape[1] != 24:
+            raise ValueError("stickers must have shape (N, 24)")
+        n = len(stickers)
+        moves = np.zeros((n, SOLVER_MAX_MOVES), dtype=np.uint8)
+        lengths = np.empty(n, dtype=np.int8)
+        self._lib.solve_many(stickers.ctypes.data, n, moves.ctypes.data, lengths.ctypes.data)
+        return moves, lengths
+
+    def memory_stats(self):
+        """Returns the memory of the BFS fallback, in bytes: what its buffers
+        hold now ("bytes"), the most they have held ("peak") and the cap
+        ("budget", 0 for none)."""
+        values = [ctypes.c_size_t() for _ in range(3)]
+        self._lib.cube_solver_memory(*(ctypes.byref(v) for v in values))
+        return dict(zip(("bytes", "peak", "budget"), (v.value for v in values)))
+
+    def set_memory_budget(self, budget):
+        """Caps the BFS buffers at `budget` bytes (0: no cap), freeing them if
+        they already hold more; solves that would need more raise
+        RuntimeError. Returns the previous cap."""
+        return self._lib.cube_solver_set_memory_budget(budget)
+
+    def read_state_file(self, path):
+        """Reads a binary state file with the C reader. Returns (stickers,
+        moves, lengths) like solve_many(), with the stored solutions: lengths
+        holds each stored solution length, or -1 where none is stored.
+        Raises RuntimeError if the C library cannot read the file."""
+        handle = self._lib.cube_state_file_open(os.fsencode(path))
+        if not handle:
+            raise RuntimeError(f"❌ C solver could not read the state file {path}.")
+        try:
+            n = self._lib.cube_state_file_count(handle)
+            stickers = np.zeros((n, 24), dtype=np.uint8)
+            moves = np.zeros((n, SOLVER_MAX_MOVES), dtype=np.uint8)
+            lengths = np.empty(n, dtype=np.int8)
+            for i in range(n):
+                lengths[i] = self._lib.cube_state_file_read(
+                    handle, i, stickers[i].ctypes.data, moves[i].ctypes.data)
+        finally:
+            self._lib.cube_state_file_close(handle)
+        if (lengths == _SOLVER_INVALID_STATE).any():
+            raise RuntimeError(f"❌ State file {path} has corrupt records.")
+        return stickers, moves, lengths
+
+    def build_table(self, path, threads=0, verbose=False):
+        """Writes the distance table to `path` with the multi-threaded C BFS
+        (threads <= 0: one per core). Raises RuntimeError on failure."""
+        if self._lib.cube_build_table(os.fsencode(path), threads, int(verbose)) != 0:
+            raise RuntimeError(f"❌ Could not write the distance table to {path}.")
+
+    def close(self):
+        self._lib.cube_solver_shutdown()
+
+
+_default_solver_library = None
+_default_solver_library_lock = threading.Lock()
+
+
+def get_solver_library():
+    """Returns the process-wide SolverLibrary, loading it on first use.
+    Returns None if bin/libcubesolver.so has not been built."""
+    global _default_solver_library
+    with _default_solver_library_lock:
+        if _default_solver_library is None and os.path.exists(_solver_library_path()):
+            _default_solver_library = SolverLibrary()
+        return _default_solver_library
+
+
+def solve_batch(stickers):
+    """Optimal solutions of a sticker matrix uint8[N, 24] of states in the
+    <U, R, F> frame: (moves uint8[N, 11] padded with 255, lengths uint8[N]).
+    Uses the C library with its distance table when built, else the table
+    walk in Python, else the C or Python IDA* search."""
+    n = len(stickers)
+    moves = np.full((n, MAX_DISTANCE), 255, dtype=np.uint8)
+    library = get_solver_library()
+    if library is not None and library.has_table:
+        solved, lengths = library.solve_many(stickers)
+        if (lengths < 0).any():
+            raise RuntimeError(f"❌ C solver failed on {int((lengths < 0).sum())} states.")
+        moves[:] = np.where(np.arange(MAX_DISTANCE) < lengths[:, None], solved[:, :MAX_DISTANCE], 255)
+        return moves, lengths.astype(np.uint8)
+    table = get_distance_table()
+    lengths = np.empty(n, dtype=np.uint8)
+    for i, state in enumerate(stickers_to_states(stickers)):
+        cube = Cube(packed_state=state)
+        if table is not None:
+            solution = _solve_cube_table(cube, table)
+        elif library is not None:
+            solution = library.solve_ida(str(cube))
+        else:
+            solution = _solve_cube_ida(cube)
+        lengths[i] = len(solution)
+        moves[i, :len(solution)] = [MOVE_INDEX[m] for m in solution]
+    return moves, lengths
+
+
+def _solve_cube_python(initial_cube: Cube, max_depth: int = 18, updater_func=None, stats=None):
+    """
+    Solves a 2x2 Rubik's cube using Bidirectional Breadth-First Search (BFS) in Python.
+    Returns a list of moves to solve the cube, or None if no solution is found.
+
+    Each side numbers its visited states in BFS order and keeps only
+    (parent node, move index) per node in flat arrays; the moves are read
+    back along the parent pointers once the two searches meet.
+    If a `stats` dict is given, stats["nodes"] is set to the number of
+    states the two searches visited.
+    Raises InvalidCubeError if the state cannot be solved, instead of
+    searching all max_depth levels for it.
+    """
+    if stats is not None:
+        stats["nodes"] = 1
+    if initial_cube.is_solved():
+        return []
+    validate_state(str(initial_cube))
+
+    class Side:
+        def __init__(self, root_state):
+            self.nodes = {root_state: 0}          # state -> node number
+            self.states = [root_state]            # node number -> state
+            self.parents = array.array('i', [-1])  # node number -> parent node
+            self.moves = bytearray([255])         # node number -> move index (255 at the root)
+            self.level_start = 0
+
+        def path(self, node):
+            """Move indices from the root to `node`."""
+            moves = []
+            while self.parents[node] >= 0:
+                moves.append(self.moves[node])
+                node = self.parents[node]
+            return moves[::-1]
+
+        def expand_level(self, other):
+            """Expands every node of the current level. Returns the (own node,
+            other node) pair of the first state both sides reached, or None."""
+            level_end = len(self.states)
+            nodes, states, parents, moves = self.nodes, self.states, self.parents, self.moves
+            for node in range(self.level_start, level_end):
+                state = states[node]
+                last_face = moves[node] // 3  # 85 at the root, matching no face
+                for move_index in range(9):
+                    if move_index // 3 == last_face: continue
+                    next_state = apply_move_packed(state, move_index)
+                    if next_state not in nodes:
+                        nodes[next_state] = len(states)
+                        states.append(next_state)
+                        parents.append(node)
+                        moves.append(move_index)
+                        other_node = other.nodes.get(next_state)
+                        if other_node is not None:
+                            return len(states) - 1, other_node
+            self.level_start = level_end
+            return None
+
+    def simplify_moves(moves):
+        if not moves: return moves
+        res = []
+        for m in moves:
+            if res and res[-1][0] == m[0]:
+                # Combine same face moves
+                f = m[0]
+                m1 = res[-1][1:] or "1"
+                m2 = m[1:] or "1"
+                def to_val(x): return 2 if x=="2" else (3 if x=="'" else 1)
+                val = (to_val(m1) + to_val(m2)) % 4
+                res.pop()
+                if val == 1: res.append(f)
+                elif val == 2: res.append(f + "2")
+                elif val == 3: res.append(f + "'")
+            else:
+                res.append(m)
+        return res
+
+    fwd = Side(initial_cube.state)
+    bwd = Side(SOLVED_STATE_INT)
+
+    def solution(fwd_node, bwd_node):
+        # The backward path is walked from the meet point towards solved, inverting each move
+        moves = fwd.path(fwd_node) + [INVERSE_MOVE_INDEX[m] for m in reversed(bwd.path(bwd_node))]
+        return simplify_moves([MOVES[m] for m in moves])
+
+    try:
+        for depth in range((max_depth // 2) + 1):
+            if updater_func:
+                updater_func(f"Searching at depth: {depth * 2}")
+
+            # Expand forward by one level
+            meet = fwd.expand_level(bwd)
+            if meet:
+                return solution(*meet)
+
+            # Expand backward by one level
+            meet = bwd.expand_level(fwd)
+            if meet:
+                return solution(meet[1], meet[0])
+
+        return None
+    finally:
+        if stats is not None:
+            stats["nodes"] = len(fwd.states) + len(bwd.states)
+
+
+
+def _isin_sorted(values, sorted_values):
+    """Vectorized membership test of `values` in the sorted array `sorted_values`."""
+    if sorted_values.size == 0:
+        return np.zeros(values.shape, dtype=bool)
+    pos = np.searchsorted(sorted_values, values)
+    pos[pos == sorted_values.size] = 0
+    return sorted_values[pos] == values
+
+
+def _frontier_path(levels, idx, towards_root, reduced=False):
+    """
+    Walks from `idx` (whose key is in levels[-1]) back to the root of a BFS
+    whose layers are `levels`, finding a parent in each previous layer. With
+    `reduced`, the layers hold symmetry-reduced indices. Returns the moves
+    from the root to idx, or from idx to the root when `towards_root` is set.
+    """
+    moves = []
+    for depth in range(len(levels) - 1, 0, -1):
+        neighbors = _expand_indices(np.array([idx], dtype=np.int64))[0]
+        keys = reduce_indices(neighbors) if reduced else neighbors
+        m = int(np.argmax(_isin_sorted(keys, levels[depth - 1])))
+        moves.append(MOVES[m] if towards_root else MOVES[INVERSE_MOVE_INDEX[m]])
+        idx = int(neighbors[m])
+    return moves if towards_root else moves[::-1]
+
+
+def _solve_cube_frontier(initial_cube: Cube, max_depth: int = 14, updater_func=None, stats=None):
+    """
+    Solves a 2x2 Rubik's cube optimally with a level-synchronous bidirectional
+    BFS over coordinate indices. Each step expands a whole layer (the smaller
+    side) as one NumPy array: 9 moves x frontier, np.unique, then sorted
+    membership tests against the two previous layers of the same side and the
+    last layer of the other side. The backward search starts from the solved
+    state, which every symmetry fixes, so it runs over symmetry-reduced
+    indices (about 6x fewer states). Only the layers are kept; the path is
+    rebuilt from them once the searches meet.
+    Returns a list of moves, or None if no solution has at most max_depth moves.
+    Raises ValueError if the state is not reachable with U, R, F moves.
+    If a `stats` dict is given, stats["nodes"] is set to the total size of
+    the layers (forward states plus backward classes).
+    """
+    start = _coord_index(initial_cube.state)
+    if stats is not None:
+        stats["nodes"] = 1 if start == 0 else 2
+    if start == 0:
+        return []
+    fwd_levels = [np.array([start], dtype=np.int64)]
+    bwd_levels = [np.array([0], dtype=np.int64)]
+    fwd_keys = reduce_indices(fwd_levels[-1])
+
+    while len(fwd_levels) + len(bwd_levels) - 2 < max_depth:
+        forward = fwd_levels[-1].size <= bwd_levels[-1].size
+        if updater_func:
+            updater_func(f"Searching at depth: {len(fwd_levels) + len(bwd_levels) - 1}")
+
+        if forward:
+            levels = fwd_levels
+            children = np.unique(_expand_indices(fwd_levels[-1]))
+        else:
+            levels = bwd_levels
+            children = np.unique(reduce_indices(_expand_indices(_reduced_rep_indices(bwd_levels[-1]))))
+        # In an undirected graph a layer's neighbors lie in the layers d-1, d and d+1
+        for seen in levels[-2:]:
+            children = children[~_isin_sorted(children, seen)]
+        if children.size == 0:
+            return None
+        levels.append(children)
+        if stats is not None:
+            stats["nodes"] += children.size
+        if forward:
+            fwd_keys = reduce_indices(children)
+
+        # The first layer touching the other side's last layer gives an optimal length
+        meet = fwd_levels[-1][_isin_sorted(fwd_keys, bwd_levels[-1])]
+        if meet.size:
+            idx = int(meet[0])
+            return _frontier_path(fwd_levels, idx, towards_root=False) + \
+                _frontier_path(bwd_levels, idx, towards_root=True, reduced=True)
+    return None
+
+
+_prune_tables = None
+
+
+def _pruning_tables():
+    """
+    Admissible heuristics for IDA*: the distance of every corner permutation
+    (5,040 entries) and every corner twist (729 entries) from solved, each
+    ignoring the other coordinate. A state needs at least the larger of its
+    two distances. Built once by BFS over the coordinate move tables.
+    Returns (perm_dist, ori_dist) as bytearrays.
+    """
+    global _prune_tables
+    if _prune_tables is None:
+        perm_move, ori_move = _coord_move_tables()
+        tables = []
+        for size, move_table in ((N_PERM, perm_move), (N_ORI, ori_move)):
+            dist = bytearray(b'\xff') * size
+            dist[0] = 0
+            frontier = [0]
+            d = 0
+            while frontier:
+                d += 1
+                next_frontier = []
+                for rank in frontier:
+                    for n in move_table[rank * 9:rank * 9 + 9]:
+                        if dist[n] == 255:
+                            dist[n] = d
+                            next_frontier.append(n)
+                frontier = next_frontier
+            tables.append(dist)
+        _prune_tables = tuple(tables)
+    return _prune_tables
+
+
+def _solve_cube_ida(initial_cube: Cube, max_depth: int = 11, stats=None):
+    """
+    Solves a 2x2 Rubik's cube optimally with iterative-deepening A* over the
+    corner coordinates, pruned by _pruning_tables(). Memory stays flat: one
+    path of at most max_depth moves plus the two small tables, whatever the
+    depth. Consecutive turns of the same face are skipped.
+    Returns a list of moves, or None if no solution has at most max_depth moves.
+    Raises ValueError if the state is not reachable with U, R, F moves.
+    If a `stats` dict is given, stats["nodes"] is set to the number of nodes visited.
+    """
+    perm_move, ori_move = _coord_move_tables()
+    perm_dist, ori_dist = _pruning_tables()
+    perm_rank, ori_rank = packed_to_coords(initial_cube.state)
+    path = []
+    nodes = 0
+
+    def search(p, o, remaining, last_face):
+        nonlocal nodes
+        nodes += 1
+        if p == 0 and o == 0:
+            return True
+        p9, o9 = p * 9, o * 9
+        for m in range(9):
+            if m // 3 == last_face:
+                continue
+            np_, no = perm_move[p9 + m], ori_move[o9 + m]
+            # Prune children that cannot reach solved in the moves left
+            if perm_dist[np_] >= remaining or ori_dist[no] >= remaining:
+                continue
+            path.append(m)
+            if search(np_, no, remaining - 1, m // 3):
+                return True
+            path.pop()
+        return False
+
+    try:
+        bound = max(perm_dist[perm_rank], ori_dist[ori_rank])
+        while bound <= max_depth:
+            if search(perm_rank, ori_rank, bound, -1):
+                return [MOVES[m] for m in path]
+            bound += 1
+        return None
+    finally:
+        if stats is not None:
+            stats["nodes"] = nodes
+
+
+def iter_solutions(initial_cube: Cube, extra: int = 0, table=None):
+    """
+    Yields every solution of at most optimal + `extra` moves, lazily: by
+    length, then in MOVES order move by move. Consecutive turns of the same
+    face are skipped and no solution passes through the solved state.
+
+    The depth-first search carries each node's exact distance, read from the
+    distance table (`table`, default get_distance_table()): a child at
+    distance c has c mod 3 in the table and c within one of its parent's, so
+    a branch is cut as soon as it cannot finish in the moves left. For
+    optimal solutions every node visited lies on a solution. Without a table
+    the search falls back to the _pruning_tables() lower bound.
+    Raises InvalidCubeError (a ValueError) if the state cannot be solved.
+    """
+    cube = validate_cube(initial_cube)
+    perm_move, ori_move = _coord_move_tables()
+    if table is None:
+        table = get_distance_table()
+    start = _coord_index(cube.state)
+    if table is not None:
+        optimal = len(_solve_cube_table(cube, table))
+
+        def distance(idx, parent_distance):
+            return parent_distance + (_table_get(table, idx) - parent_distance + 1) % 3 - 1
+    else:
+        perm_dist, ori_dist = _pruning_tables()
+        optimal = len(_solve_cube_ida(cube))
+
+        def distance(idx, parent_distance):
+            return max(perm_dist[idx // N_ORI], ori_dist[idx % N_ORI])
+
+    path = []
+
+    def search(idx, dist, remaining, last_face):
+        if remaining == 0:
+            if idx == 0:
+                yield list(path)
+            return
+        if idx == 0:
+            return
+        p9 = (idx // N_ORI) * 9
+        o9 = (idx % N_ORI) * 9
+        for m in range(9):
+            if m // 3 == last_face:
+                continue
+            n = perm_move[p9 + m] * N_ORI + ori_move[o9 + m]
+            child_dist = distance(n, dist)
+            if child_dist >= remaining:
+                continue
+            path.append(MOVES[m])
+            yield from search(n, child_dist, remaining - 1, m // 3)
+            path.pop()
+
+    for length in range(optimal, optimal + extra + 1):
+        yield from search(start, optimal, length, -1)
@@ -0,0 +1,868 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <stdint.h>
+#include <stdbool.h>
+#include <fcntl.h>
+#include <pthread.h>
+#include <unistd.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+
+#include "cube_solver.h"
+
+/* Compact state: 24 stickers, 3 bits each = 72 bits.
+   Sticker indices (same as src/cube_core/cube.py):
+   U: 0,1,2,3
+   F: 4,5,6,7
+   R: 8,9,10,11
+   B: 12,13,14,15
+   L: 16,17,18,19
+   D: 20,21,22,23
+
+   Corner DBL is (22, 15, 18) = (D2, B3, L2).
+   If we only use U, R, F moves, the DBL corner never moves.
+   So we have 7 corners left. Each corner has 3 stickers.
+   7 corners * 3 stickers = 21 stickers.
+   21 stickers * 3 bits = 63 bits. Fits in uint64_t!
+
+   Stickers to exclude: 15 (B3), 18 (L2), 22 (D2).
+*/
+
+typedef uint64_t packed_state;
+
+typedef struct { uint8_t s[24]; } CubeState;
+static const char* SOLVED_STATE_STR = "WWWWGGGGRRRRBBBBOOOOYYYY";
+static CubeState SOLVED;
+
+static packed_state pack(const CubeState* cs) {
+    packed_state res = 0;
+    int bit = 0;
+    for (int i = 0; i < 24; i++) {
+        if (i == 15 || i == 18 || i == 22) continue;
+        res |= ((packed_state)(cs->s[i] & 0x7)) << (bit * 3);
+        bit++;
+    }
+    return res;
+}
+
+static inline bool states_equal(const CubeState* a, const CubeState* b) {
+    return memcmp(a->s, b->s, 24) == 0;
+}
+
+static void rotate_face(CubeState* state, int start) {
+    uint8_t t = state->s[start];
+    state->s[start] = state->s[start+2];
+    state->s[start+2] = state->s[start+3];
+    state->s[start+3] = state->s[start+1];
+    state->s[start+1] = t;
+}
+
+static void apply_move(CubeState* s, char face) {
+    CubeState old = *s;
+    if (face == 'U') {
+        rotate_face(s, 0);
+        s->s[4] = old.s[8]; s->s[5] = old.s[9];
+        s->s[8] = old.s[12]; s->s[9] = old.s[13];
+        s->s[12] = old.s[16]; s->s[13] = old.s[17];
+        s->s[16] = old.s[4]; s->s[17] = old.s[5];
+    } else if (face == 'R') {
+        rotate_face(s, 8);
+        /* F -> U -> B -> D -> F: 5 -> 1 -> 14 -> 21 -> 5, 7 -> 3 -> 12 -> 23 -> 7 */
+        s->s[1] = old.s[5]; s->s[3] = old.s[7];
+        s->s[14] = old.s[1]; s->s[12] = old.s[3];
+        s->s[23] = old.s[12]; s->s[21] = old.s[14];
+        s->s[7] = old.s[23]; s->s[5] = old.s[21];
+    } else if (face == 'F') {
+        rotate_face(s, 4);
+        /* 2 -> 8 -> 21 -> 19 -> 2, 3 -> 10 -> 20 -> 17 -> 3 */
+        s->s[2] = old.s[19]; s->s[3] = old.s[17];
+        s->s[8] = old.s[2]; s->s[10] = old.s[3];
+        s->s[21] = old.s[8]; s->s[20] = old.s[10];
+        s->s[19] = old.s[21]; s->s[17] = old.s[20];
+    }
+}
+
+/* --- Corner coordinates (mirrors src/cube_core/cube.py) ---
+   Corners as (U/D sticker, then the other two clockwise). The DBL corner
+   (index 7) never moves under U, R, F, so a state is the permutation rank
+   (0..5039) and twist rank (0..728) of the other 7 corners. */
+static const int CORNER_FACELETS[8][3] = {
+    {3, 8, 5}, {2, 4, 17}, {0, 16, 13}, {1, 12, 9},
+    {21, 7, 10}, {20, 19, 6}, {23, 11, 14}, {22, 15, 18}
+};
+#define N_PERM 5040
+#define N_ORI 729
+#define N_STATES (N_PERM * N_ORI)
+static const char* MOVE_NAMES[9] = {"U", "U'", "U2", "R", "R'", "R2", "F", "F'", "F2"};
+static uint16_t PERM_MOVE[N_PERM][9];
+static uint16_t ORI_MOVE[N_ORI][9];
+
+static void apply_named_move(CubeState* s, const char* m) {
+    int count = (m[1] == '\'') ? 3 : (m[1] == '2' ? 2 : 1);
+    for (int k = 0; k < count; k++) apply_move(s, m[0]);
+}
+
+/* Decodes the 8 corners; returns false if a corner's stickers are not a real corner. */
+static bool corner_cubies(const CubeState* cs, int perm[8], int ori[8]) {
+    uint8_t ud0 = SOLVED.s[0], ud1 = SOLVED.s[20];
+    unsigned seen = 0;
+    for (int i = 0; i < 8; i++) {
+        uint8_t c[3];
+        for (int k = 0; k < 3; k++) c[k] = cs->s[CORNER_FACELETS[i][k]];
+        int twist = -1;
+        for (int k = 0; k < 3; k++) if (c[k] == ud0 || c[k] == ud1) { twist = k; break; }
+        if (twist < 0) return false;
+        perm[i] = -1;
+        for (int j = 0; j < 8; j++) {
+            const int* f = CORNER_FACELETS[j];
+            if (SOLVED.s[f[0]] == c[twist] && SOLVED.s[f[1]] == c[(twist + 1) % 3]
+                && SOLVED.s[f[2]] == c[(twist + 2) % 3]) { perm[i] = j; break; }
+        }
+        if (perm[i] < 0 || (seen & (1u << perm[i]))) return false;
+        seen |= 1u << perm[i];
+        ori[i] = twist;
+    }
+    return true;
+}
+
+static int perm_rank(const int* perm) {
+    int rank = 0;
+    for (int i = 0; i < 7; i++) {
+        int smaller = 0;
+        for (int j = i + 1; j < 7; j++) if (perm[j] < perm[i]) smaller++;
+        rank = rank * (7 - i) + smaller;
+    }
+    return rank;
+}
+
+static void perm_unrank(int rank, int* perm) {
+    int digits[7], available[7];
+    for (int base = 1; base <= 7; base++) { digits[7 - base] = rank % base; rank /= base; }
+    for (int i = 0; i < 7; i++) available[i] = i;
+    for (int i = 0, n = 7; i < 7; i++, n--) {
+        perm[i] = available[digits[i]];
+        memmove(&available[digits[i]], &available[digits[i] + 1], sizeof(int) * (n - digits[i] - 1));
+    }
+}
+
+static int ori_rank(const int* ori) {
+    int rank = 0;
+    for (int i = 0; i < 6; i++) rank = rank * 3 + ori[i];
+    return rank;
+}
+
+static void ori_unrank(int rank, int* ori) {
+    int sum = 0;
+    for (int i = 5; i >= 0; i--) { ori[i] = rank % 3; rank /= 3; sum += ori[i]; }
+    ori[6] = (3 - sum % 3) % 3;
+}
+
+/* perm_rank * 729 + ori_rank, or -1 if the state is outside the <U, R, F> frame. */
+static int coord_index(const CubeState* cs) {
+    int perm[8], ori[8], twist = 0;
+    if (!corner_cubies(cs, perm, ori) || perm[7] != 7 || ori[7] != 0) return -1;
+    for (int i = 0; i < 7; i++) twist += ori[i];
+    if (twist % 3 != 0) return -1;
+    return perm_rank(perm) * N_ORI + ori_rank(ori);
+}
+
+/* Inverse of coord_index: rebuilds all 24 stickers from the coordinates. */
+static void coords_to_cube(int p_rank, int o_rank, CubeState* cs) {
+    int perm[8], ori[8];
+    perm_unrank(p_rank, perm); perm[7] = 7;
+    ori_unrank(o_rank, ori); ori[7] = 0;
+    for (int i = 0; i < 8; i++)
+        for (int k = 0; k < 3; k++)
+            cs->s[CORNER_FACELETS[i][(k + ori[i]) % 3]] = SOLVED.s[CORNER_FACELETS[perm[i]][k]];
+}
+
+static void init_coord_tables(void) {
+    int cp[9][8], co[9][8];
+    for (int m = 0; m < 9; m++) {
+        CubeState s = SOLVED;
+        apply_named_move(&s, MOVE_NAMES[m]);
+        corner_cubies(&s, cp[m], co[m]);
+    }
+    for (int r = 0; r < N_PERM; r++) {
+        int perm[7], next[7];
+        perm_unrank(r, perm);
+        for (int m = 0; m < 9; m++) {
+            for (int i = 0; i < 7; i++) next[i] = perm[cp[m][i]];
+            PERM_MOVE[r][m] = (uint16_t)perm_rank(next);
+        }
+    }
+    for (int r = 0; r < N_ORI; r++) {
+        int ori[7], next[7];
+        ori_unrank(r, ori);
+        for (int m = 0; m < 9; m++) {
+            for (int i = 0; i < 7; i++) next[i] = (ori[cp[m][i]] + co[m][i]) % 3;
+            ORI_MOVE[r][m] = (uint16_t)ori_rank(next);
+        }
+    }
+}
+
+typedef struct { packed_state ps; int parent; const char* move; char last; uint32_t slot; } Node;
+#define NO_SLOT UINT32_MAX
+#define MAX_SOLUTION 64
+/* First capacities of a queue / visited table; both double as the frontier grows. */
+#define INITIAL_QUEUE 1024
+#define INITIAL_TABLE 2048
+/* Default cap on the BFS buffers; $CUBE_BFS_MEMORY_MB overrides it. */
+#define DEFAULT_BFS_BUDGET ((size_t)1024 << 20)
+typedef struct { packed_state ps; int node_idx; bool occupied; } Entry;
+
+/* One direction of the search: a queue of every node reached (parents are
+   queue indices) and an open-addressing table of the states in it, sized to
+   a power of two and kept at most half full. */
+typedef struct {
+    Node* q; int q_cap, t;
+    Entry* table; uint32_t table_cap, used;
+} Side;
+
+/* Search buffers, kept across solves and grown on demand; each search only
+   clears the slots the previous one touched. `bytes` is what the buffers
+   hold now, `peak` the most they have held, `budget` the cap (0: none). */
+typedef struct {
+    Side fwd, bwd;
+    size_t bytes, peak, budget;
+} Solver;
+
+static uint32_t hash_slot(packed_state ps, uint32_t mask) {
+    return (uint32_t)((ps * 0x9E3779B97F4A7C15ULL) >> 32) & mask;
+}
+
+static int visited(packed_state ps, const Side* s) {
+    uint32_t mask = s->table_cap - 1, h = hash_slot(ps, mask);
+    while (s->table[h].occupied) {
+        if (s->table[h].ps == ps) return s->table[h].node_idx;
+        h = (h + 1) & mask;
+    }
+    return -1;
+}
+
+static uint32_t add_visited(packed_state ps, int node_idx, Side* s) {
+    uint32_t mask = s->table_cap - 1, h = hash_slot(ps, mask);
+    while (s->table[h].occupied) h = (h + 1) & mask;
+    s->table[h].ps = ps; s->table[h].node_idx = node_idx; s->table[h].occupied = true;
+    s->used++;
+    return h;
+}
+
+/* Accounts for `add` more bytes; false if that would pass the budget. */
+static bool solver_charge(Solver* sv, size_t add) {
+    if (sv->budget && sv->bytes + add > sv->budget) return false;
+    sv->bytes += add;
+    if (sv->bytes > sv->peak) sv->peak = sv->bytes;
+    return true;
+}
+
+/* Makes room for one more node in the queue (doubling it when full). */
+static bool queue_reserve(Solver* sv, Side* s) {
+    if (s->t < s->q_cap) return true;
+    int cap = s->q_cap ? s->q_cap * 2 : INITIAL_QUEUE;
+    size_t add = (size_t)(cap - s->q_cap) * sizeof(Node);
+    if (!solver_charge(sv, add)) return false;
+    Node* q = realloc(s->q, (size_t)cap * sizeof(Node));
+    if (!q) { sv->bytes -= add; return false; }
+    s->q = q; s->q_cap = cap;
+    return true;
+}
+
+/* Makes room for one more state in the table: past half full, moves the
+   states of the queue into a table twice the size. Both tables are held
+   while rehashing, so both count against the budget. */
+static bool table_reserve(Solver* sv, Side* s) {
+    if (s->table && (s->used + 1) * 2 <= s->table_cap) return true;
+    uint32_t cap = s->table_cap ? s->table_cap * 2 : INITIAL_TABLE;
+    size_t size = (size_t)cap * sizeof(Entry);
+    if (!solver_charge(sv, size)) return false;
+    Entry* table = calloc(cap, sizeof(Entry));
+    if (!table) { sv->bytes -= size; return false; }
+    free(s->table);
+    sv->bytes -= (size_t)s->table_cap * sizeof(Entry);
+    s->table = table; s->table_cap = cap; s->used = 0;
+    for (int i = 0; i < s->t; i++)
+        if (s->q[i].slot != NO_SLOT) s->q[i].slot = add_visited(s->q[i].ps, i, s);
+    return true;
+}
+
+/* Appends a node and records its state; false if the buffers cannot grow. */
+static bool push_node(Solver* sv, Side* s, Node node, bool record) {
+    if (!queue_reserve(sv, s) || (record && !table_reserve(sv, s))) return false;
+    node.slot = record ? add_visited(node.ps, s->t, s) : NO_SLOT;
+    s->q[s->t++] = node;
+    return true;
+}
+
+/* Clear only the table slots recorded by the previous search. */
+static void side_reset(Side* s) {
+    for (int i = 0; i < s->t; i++)
+        if (s->q[i].slot != NO_SLOT) s->table[s->q[i].slot].occupied = false;
+    s->t = 0; s->used = 0;
+}
+
+static void side_free(Side* s) {
+    free(s->q); free(s->table);
+    *s = (Side){0};
+}
+
+static void solver_free(Solver* sv) {
+    side_free(&sv->fwd); side_free(&sv->bwd);
+    sv->bytes = 0;
+}
+
+/* Hardcoded inverse moves because of static buffer issues */
+static const char* get_inv(const char* m) {
+    if (strcmp(m, "U") == 0) return "U'"; if (strcmp(m, "U'") == 0) return "U";
+    if (strcmp(m, "U2") == 0) return "U2";
+    if (strcmp(m, "R") == 0) return "R'"; if (strcmp(m, "R'") == 0) return "R";
+    if (strcmp(m, "R2") == 0) return "R2";
+    if (strcmp(m, "F") == 0) return "F'"; if (strcmp(m, "F'") == 0) return "F";
+    if (strcmp(m, "F2") == 0) return "F2";
+    return m;
+}
+
+/* Expands every node of the current level of `s`. Returns 1 when a state
+   reached by `other` is met (its index there in `*meet`), 0 otherwise, or
+   CUBE_OUT_OF_MEMORY if the level does not fit in the budget. */
+static int expand_level(Solver* sv, Side* s, const Side* other, int* head, int* meet) {
+    static const char* moves[] = {"U", "U'", "U2", "R", "R'", "R2", "F", "F'", "F2"};
+    int level = s->t - *head;
+    for (int i = 0; i < level; i++) {
+        int curr_idx = (*head)++; Node curr = s->q[curr_idx];
+        CubeState cs;
+        /* Unpack briefly to apply move */
+        int bit = 0;
+        for (int j = 0; j < 24; j++) {
+            if (j == 15 || j == 18 || j == 22) {
+                cs.s[j] = SOLVED.s[j]; // Fix corner
+            } else {
+                cs.s[j] = (uint8_t)((curr.ps >> (bit * 3)) & 0x7);
+                bit++;
+            }
+        }
+        for (int m = 0; m < 9; m++) {
+            if (moves[m][0] == curr.last) continue;
+            CubeState next_cs = cs;
+            int count = (moves[m][1] == '\'') ? 3 : (moves[m][1] == '2' ? 2 : 1);
+            for (int k = 0; k < count; k++) apply_move(&next_cs, moves[m][0]);
+            packed_state nps = pack(&next_cs);
+            if (visited(nps, s) != -1) continue;
+            int other_idx = visited(nps, other);
+            Node node = {nps, curr_idx, moves[m], moves[m][0], NO_SLOT};
+            if (!push_node(sv, s, node, other_idx == -1)) return CUBE_OUT_OF_MEMORY;
+            if (other_idx != -1) { *meet = other_idx; return 1; }
+        }
+    }
+    return 0;
+}
+
+/* Writes the solution into `out` and returns its length, -1 if none was
+   found, or CUBE_OUT_OF_MEMORY if the search would pass the memory budget. */
+static int solve_bidirectional(Solver* sv, CubeState start, const char** out) {
+    packed_state start_ps = pack(&start);
+    packed_state solved_ps = pack(&SOLVED);
+    if (start_ps == solved_ps) return 0;
+
+    Side* fwd = &sv->fwd;
+    Side* bwd = &sv->bwd;
+    side_reset(fwd); side_reset(bwd);
+    if (!push_node(sv, fwd, (Node){start_ps, -1, NULL, 0, NO_SLOT}, true)
+        || !push_node(sv, bwd, (Node){solved_ps, -1, NULL, 0, NO_SLOT}, true))
+        return CUBE_OUT_OF_MEMORY;
+    int h_fwd = 0, h_bwd = 0;
+    int sol_fwd = -1, sol_bwd = -1, meet = -1;
+
+    for (int d = 0; d < 10; d++) {
+        int r = expand_level(sv, fwd, bwd, &h_fwd, &meet);
+        if (r < 0) return r;
+        if (r) { sol_fwd = fwd->t - 1; sol_bwd = meet; break; }
+        r = expand_level(sv, bwd, fwd, &h_bwd, &meet);
+        if (r < 0) return r;
+        if (r) { sol_fwd = meet; sol_bwd = bwd->t - 1; break; }
+        /* A side with no new states has reached everything it can */
+        if (h_fwd == fwd->t || h_bwd == bwd->t) break;
+    }
+    if (sol_fwd == -1) return -1;
+    const Node* q_fwd = fwd->q;
+    const Node* q_bwd = bwd->q;
+    int p1[64], l1 = 0, p2[64], l2 = 0, n = 0;
+    int idx = sol_fwd; while (idx != -1 && q_fwd[idx].parent != -1) { p1[l1++] = idx; idx = q_fwd[idx].parent; }
+    if (idx != -1 && q_fwd[idx].move) p1[l1++] = idx;
+    idx = sol_bwd; while (idx != -1 && q_bwd[idx].parent != -1) { p2[l2++] = idx; idx = q_bwd[idx].parent; }
+    if (idx != -1 && q_bwd[idx].move) p2[l2++] = idx;
+    for (int j = l1 - 1; j >= 0; j--) if (q_fwd[p1[j]].move) out[n++] = q_fwd[p1[j]].move;
+    for (int j = 0; j < l2; j++) if (q_bwd[p2[j]].move) out[n++] = get_inv(q_bwd[p2[j]].move);
+    return n;
+}
+
+/* --- Distance table file (written by generate_table.py) ---
+   128-byte little-endian header followed by 2 bits per state (distance mod 3):
+     0  char[8]  magic "CUBEDTBL"       24 uint32 CRC-32 of the data
+     8  uint32   version                28 uint8 bits per state, uint8 encoding
+     12 uint32   header size            32 char[32] move set, NUL padded
+     16 uint32   number of states       64 char[24] solved state (color scheme)
+     20 uint32   data size in bytes */
+#define TABLE_MAGIC "CUBEDTBL"
+#define TABLE_VERSION 1
+#define TABLE_HEADER_SIZE 128
+#define TABLE_MOVE_SET "U U' U2 R R' R2 F F' F2"
+
+typedef struct { const uint8_t* data; void* map; size_t map_len; } DistTable;
+
+static uint32_t crc32(const uint8_t* buf, size_t len) {
+    static uint32_t crc_table[256];
+    if (!crc_table[1]) {
+        for (uint32_t i = 0; i < 256; i++) {
+            uint32_t c = i;
+            for (int k = 0; k < 8; k++) c = (c & 1) ? 0xEDB88320u ^ (c >> 1) : c >> 1;
+            crc_table[i] = c;
+        }
+    }
+    uint32_t c = 0xFFFFFFFFu;
+    for (size_t i = 0; i < len; i++) c = crc_table[(c ^ buf[i]) & 0xFF] ^ (c >> 8);
+    return c ^ 0xFFFFFFFFu;
+}
+
+static uint32_t read_u32(const uint8_t* p) {
+    return (uint32_t)p[0] | ((uint32_t)p[1] << 8) | ((uint32_t)p[2] << 16) | ((uint32_t)p[3] << 24);
+}
+
+/* Maps the table read-only so every solver process shares one page-cache copy.
+   Returns false (leaving `t` empty) if the file is missing or does not match this build. */
+static bool table_open(DistTable* t, const char* path) {
+    t->data = NULL; t->map = NULL; t->map_len = 0;
+    int fd = open(path, O_RDONLY);
+    if (fd < 0) return false;
+    struct stat st;
+    if (fstat(fd, &st) != 0 || st.st_size < TABLE_HEADER_SIZE) { close(fd); return false; }
+    void* map = mmap(NULL, (size_t)st.st_size, PROT_READ, MAP_SHARED, fd, 0);
+    close(fd);
+    if (map == MAP_FAILED) return false;
+    const uint8_t* h = map;
+    const char* problem = NULL;
+    uint32_t data_size = read_u32(h + 20);
+    if (memcmp(h, TABLE_MAGIC, 8) != 0) problem = "bad magic";
+    else if (read_u32(h + 8) != TABLE_VERSION) problem = "unsupported version";
+    else if (read_u32(h + 12) != TABLE_HEADER_SIZE || read_u32(h + 16) != N_STATES
+             || data_size != (N_STATES + 3) / 4 || h[28] != 2 || h[29] != 1) problem = "unexpected layout";
+    else if ((size_t)st.st_size != TABLE_HEADER_SIZE + (size_t)data_size) problem = "truncated";
+    else if (strncmp((const char*)h + 32, TABLE_MOVE_SET, 32) != 0) problem = "different move set";
+    else if (memcmp(h + 64, SOLVED_STATE_STR, 24) != 0) problem = "different color scheme";
+    else if (crc32(h + TABLE_HEADER_SIZE, data_size) != read_u32(h + 24)) problem = "checksum mismatch";
+    if (problem) {
+        fprintf(stderr, "Ignoring distance table %s: %s.\n", path, problem);
+        munmap(map, (size_t)st.st_size);
+        return false;
+    }
+    t->map = map; t->map_len = (size_t)st.st_size; t->data = h + TABLE_HEADER_SIZE;
+    return true;
+}
+
+static void table_close(DistTable* t) {
+    if (t->map) munmap(t->map, t->map_len);
+    t->data = NULL; t->map = NULL;
+}
+
+static inline int table_get(const uint8_t* data, uint32_t idx) {
+    return (data[idx >> 2] >> ((idx & 3) * 2)) & 3;
+}
+
+/* Walks downhill through the table: the neighbor with value (d - 1) mod 3 is
+   one move closer. Returns the solution length, or -1 if `start` is outside
+   the <U, R, F> frame. */
+static int solve_table(const uint8_t* data, const CubeState* start, const char** out) {
+    int idx = coord_index(start);
+    if (idx < 0) return -1;
+    int n = 0;
+    while (idx != 0 && n < 11) {
+        int want = (table_get(data, (uint32_t)idx) + 2) % 3;
+        int p = idx / N_ORI, o = idx % N_ORI, m;
+        for (m = 0; m < 9; m++) {
+            int next = PERM_MOVE[p][m] * N_ORI + ORI_MOVE[o][m];
+            if (table_get(data, (uint32_t)next) == want) { idx = next; break; }
+        }
+        if (m == 9) return -1;
+        out[n++] = MOVE_NAMES[m];
+    }
+    return idx == 0 ? n : -1;
+}
+
+/* --- IDA* over the corner coordinates ---
+   Admissible heuristic: the larger of the permutation's and the twist's own
+   distance from solved (5,040 + 729 bytes, built by BFS at init). Memory is
+   one path of at most CUBE_MAX_MOVES moves, whatever the depth. */
+static uint8_t PERM_DIST[N_PERM];
+static uint8_t ORI_DIST[N_ORI];
+
+static void init_prune_table(uint8_t* dist, int size, const uint16_t (*move)[9]) {
+    static int frontier[N_PERM], next[N_PERM];
+    memset(dist, 0xFF, (size_t)size);
+    dist[0] = 0;
+    int n = 1, d = 0;
+    frontier[0] = 0;
+    while (n) {
+        int n_next = 0;
+        d++;
+        for (int i = 0; i < n; i++)
+            for (int m = 0; m < 9; m++) {
+                int r = move[frontier[i]][m];
+                if (dist[r] == 0xFF) { dist[r] = (uint8_t)d; next[n_next++] = r; }
+            }
+        memcpy(frontier, next, sizeof(int) * (size_t)n_next);
+        n = n_next;
+    }
+}
+
+static bool ida_search(int p, int o, int remaining, int last_face, uint8_t* path, int depth) {
+    if (p == 0 && o == 0) return true;
+    for (int m = 0; m < 9; m++) {
+        if (m / 3 == last_face) continue;
+        int np = PERM_MOVE[p][m], no = ORI_MOVE[o][m];
+        /* Prune children that cannot reach solved in the moves left */
+        if (PERM_DIST[np] >= remaining || ORI_DIST[no] >= remaining) continue;
+        path[depth] = (uint8_t)m;
+        if (ida_search(np, no, remaining - 1, m / 3, path, depth + 1)) return true;
+    }
+    return false;
+}
+
+/* Returns the optimal solution length, or -1 if `idx` is not a coordinate index. */
+static int solve_ida_index(int idx, uint8_t* moves_out) {
+    if (idx < 0) return -1;
+    int p = idx / N_ORI, o = idx % N_ORI;
+    int bound = PERM_DIST[p] > ORI_DIST[o] ? PERM_DIST[p] : ORI_DIST[o];
+    for (; bound <= CUBE_MAX_MOVES; bound++)
+        if (ida_search(p, o, bound, -1, moves_out, 0)) return bound;
+    return -1;
+}
+
+/* --- Library state and public API (cube_solver.h) ---
+   The move/coordinate tables and the mapped distance table are read-only
+   after init, so table walks need no locking. The BFS buffers grow with the
+   frontier and are kept between solves, so the fallback search runs under a
+   mutex. */
+static pthread_once_t init_once = PTHREAD_ONCE_INIT;
+static pthread_mutex_t table_lock = PTHREAD_MUTEX_INITIALIZER;
+static pthread_mutex_t bfs_lock = PTHREAD_MUTEX_INITIALIZER;
+static DistTable dist_table;
+static Solver bfs_solver;
+
+static void init_tables(void) {
+    for (int i = 0; i < 24; i++) {
+        char c = SOLVED_STATE_STR[i];
+        SOLVED.s[i] = (c=='W'?0:c=='Y'?1:c=='R'?2:c=='O'?3:c=='B'?4:5);
+    }
+    init_coord_tables();
+    init_prune_table(PERM_DIST, N_PERM, (const uint16_t (*)[9])PERM_MOVE);
+    init_prune_table(ORI_DIST, N_ORI, (const uint16_t (*)[9])ORI_MOVE);
+    const char* env = getenv("CUBE_DISTANCE_TABLE");
+    if (env) table_open(&dist_table, env);
+    const char* budget_mb = getenv("CUBE_BFS_MEMORY_MB");
+    bfs_solver.budget = budget_mb ? (size_t)strtoull(budget_mb, NULL, 10) << 20 : DEFAULT_BFS_BUDGET;
+}
+
+int cube_solver_init(const char* table_path) {
+    pthread_once(&init_once, init_tables);
+    if (!table_path) return dist_table.data != NULL;
+    pthread_mutex_lock(&table_lock);
+    table_close(&dist_table);
+    table_open(&dist_table, table_path);
+    int mapped = dist_table.data != NULL;
+    pthread_mutex_unlock(&table_lock);
+    return mapped;
+}
+
+void cube_solver_shutdown(void) {
+    pthread_mutex_lock(&table_lock);
+    table_close(&dist_table);
+    pthread_mutex_unlock(&table_lock);
+    pthread_mutex_lock(&bfs_lock);
+    solver_free(&bfs_solver);
+    pthread_mutex_unlock(&bfs_lock);
+}
+
+size_t cube_solver_set_memory_budget(size_t bytes) {
+    pthread_once(&init_once, init_tables);
+    pthread_mutex_lock(&bfs_lock);
+    size_t previous = bfs_solver.budget;
+    bfs_solver.budget = bytes;
+    /* Growth alone is charged, so buffers already past the new cap would
+       otherwise stay in use; the next search reallocates within it */
+    if (bytes && bfs_solver.bytes > bytes) solver_free(&bfs_solver);
+    pthread_mutex_unlock(&bfs_lock);
+    return previous;
+}
+
+void cube_solver_memory(size_t* bytes, size_t* peak, size_t* budget) {
+    pthread_once(&init_once, init_tables);
+    pthread_mutex_lock(&bfs_lock);
+    if (bytes) *bytes = bfs_solver.bytes;
+    if (peak) *peak = bfs_solver.peak;
+    if (budget) *budget = bfs_solver.budget;
+    pthread_mutex_unlock(&bfs_lock);
+}
+
+static bool load_stickers(const uint8_t* stickers, CubeState* cs) {
+    for (int i = 0; i < 24; i++) {
+        if (stickers[i] > 5) return false;
+        cs->s[i] = stickers[i];
+    }
+    return true;
+}
+
+/* Table walk when a table is mapped, otherwise the bidirectional BFS.
+   Callers have checked that the state is in the <U, R, F> frame. */
+static int solve_state(CubeState start, const char** out) {
+    if (dist_table.data) {
+        int n = solve_table(dist_table.data, &start, out);
+        if (n >= 0) return n;
+    }
+    pthread_mutex_lock(&bfs_lock);
+    int n = solve_bidirectional(&bfs_solver, start, out);
+    pthread_mutex_unlock(&bfs_lock);
+    return n;
+}
+
+int solve(const uint8_t stickers[24], uint8_t* moves_out) {
+    pthread_once(&init_once, init_tables);
+    CubeState start;
+    /* Constant-time solvability check: real corners, each once, DBL home and
+       total twist 0 mod 3. Anything else would send the BFS through every
+       level before it gave up. */
+    if (!load_stickers(stickers, &start) || coord_index(&start) < 0) return CUBE_INVALID_STATE;
+    const char* sol[MAX_SOLUTION];
+    int n = solve_state(start, sol);
+    if (n == CUBE_OUT_OF_MEMORY) return n;
+    if (n < 0 || n > CUBE_MAX_MOVES) return CUBE_NO_SOLUTION;
+    for (int j = 0; j < n; j++) {
+        int m = 0;
+        while (strcmp(MOVE_NAMES[m], sol[j]) != 0) m++;
+        moves_out[j] = (uint8_t)m;
+    }
+    return n;
+}
+
+int solve_ida(const uint8_t stickers[24], uint8_t* moves_out) {
+    pthread_once(&init_once, init_tables);
+    CubeState start;
+    int idx;
+    if (!load_stickers(stickers, &start) || (idx = coord_index(&start)) < 0) return CUBE_INVALID_STATE;
+    int n = solve_ida_index(idx, moves_out);
+    return n < 0 ? CUBE_NO_SOLUTION : n;
+}
+
+size_t solve_many(const uint8_t* states, size_t n, uint8_t* moves_out, int8_t* lengths) {
+    for (size_t i = 0; i < n; i++)
+        lengths[i] = (int8_t)solve(states + i * 24, moves_out + i * CUBE_MAX_MOVES);
+    return n;
+}
+
+int cube_coord_index(const uint8_t stickers[24]) {
+    pthread_once(&init_once, init_tables);
+    CubeState cs;
+    return load_stickers(stickers, &cs) ? coord_index(&cs) : -1;
+}
+
+int cube_from_coords(int perm_rank, int ori_rank, uint8_t stickers_out[24]) {
+    pthread_once(&init_once, init_tables);
+    if (perm_rank < 0 || perm_rank >= N_PERM || ori_rank < 0 || ori_rank >= N_ORI) return -1;
+    CubeState cs;
+    coords_to_cube(perm_rank, ori_rank, &cs);
+    memcpy(stickers_out, cs.s, 24);
+    return 0;
+}
+
+/* --- Binary state files (written by StateFileWriter in src/cube_core/batch.py) ---
+   64-byte little-endian header followed by fixed-width records:
+     0  char[8]  magic "CUBESTAT"       28 uint8 state encoding, uint8 moves per record
+     8  uint32   version                30 uint16 reserved
+     12 uint32   header size            32 char[24] solved state (color scheme)
+     16 uint64   number of records
+     24 uint32   record size in bytes
+   A record is a uint32 coordinate index (encoding 1) or 9 bytes of 3-bit
+   stickers (encoding 2), then, if moves per record > 0, a uint8 solution
+   length (255: none stored) and the moves, padded with 255. */
+#define STATE_FILE_MAGIC "CUBESTAT"
+#define STATE_FILE_VERSION 1
+#define STATE_FILE_HEADER_SIZE 64
+#define STATE_ENCODING_COORD 1
+#define STATE_ENCODING_PACKED 2
+#define PACKED_STATE_BYTES 9
+#define STATE_NO_SOLUTION 255
+
+struct CubeStateFile {
+    const uint8_t* records;
+    void* map;
+    size_t map_len;
+    uint64_t count;
+    uint32_t record_size;
+    int encoding, max_moves;
+};
+
+static uint64_t read_u64(const uint8_t* p) {
+    return (uint64_t)read_u32(p) | ((uint64_t)read_u32(p + 4) << 32);
+}
+
+CubeStateFile* cube_state_file_open(const char* path) {
+    pthread_once(&init_once, init_tables);
+    int fd = open(path, O_RDONLY);
+    if (fd < 0) return NULL;
+    struct stat st;
+    if (fstat(fd, &st) != 0 || st.st_size < STATE_FILE_HEADER_SIZE) { close(fd); return NULL; }
+    void* map = mmap(NULL, (size_t)st.st_size, PROT_READ, MAP_SHARED, fd, 0);
+    close(fd);
+    if (map == MAP_FAILED) return NULL;
+    const uint8_t* h = map;
+    const char* problem = NULL;
+    uint64_t count = read_u64(h + 16);
+    uint32_t record_size = read_u32(h + 24);
+    int encoding = h[28], max_moves = h[29];
+    uint32_t expected = (encoding == STATE_ENCODING_COORD ? 4 : PACKED_STATE_BYTES)
+                        + (max_moves ? 1 + (uint32_t)max_moves : 0);
+    if (memcmp(h, STATE_FILE_MAGIC, 8) != 0) problem = "bad magic";
+    else if (read_u32(h + 8) != STATE_FILE_VERSION) problem = "unsupported version";
+    else if (read_u32(h + 12) != STATE_FILE_HEADER_SIZE || record_size != expected
+             || (encoding != STATE_ENCODING_COORD && encoding != STATE_ENCODING_PACKED)
+             || max_moves > CUBE_MAX_MOVES) problem = "unexpected layout";
+    else if ((uint64_t)st.st_size - STATE_FILE_HEADER_SIZE != count * record_size) problem = "truncated";
+    else if (memcmp(h + 32, SOLVED_STATE_STR, 24) != 0) problem = "different color scheme";
+    CubeStateFile* f = problem ? NULL : malloc(sizeof *f);
+    if (!f) {
+        if (problem) fprintf(stderr, "Cannot read state file %s: %s.\n", path, problem);
+        munmap(map, (size_t)st.st_size);
+        return NULL;
+    }
+    f->map = map; f->map_len = (size_t)st.st_size; f->records = h + STATE_FILE_HEADER_SIZE;
+    f->count = count; f->record_size = record_size; f->encoding = encoding; f->max_moves = max_moves;
+    return f;
+}
+
+uint64_t cube_state_file_count(const CubeStateFile* f) {
+    return f->count;
+}
+
+int cube_state_file_read(const CubeStateFile* f, uint64_t i, uint8_t stickers_out[24], uint8_t* moves_out) {
+    if (i >= f->count) return CUBE_INVALID_STATE;
+    const uint8_t* r = f->records + i * f->record_size;
+    int state_bytes;
+    if (f->encoding == STATE_ENCODING_COORD) {
+        uint32_t idx = read_u32(r);
+        if (idx >= N_STATES) return CUBE_INVALID_STATE;
+        CubeState cs;
+        coords_to_cube((int)(idx / N_ORI), (int)(idx % N_ORI), &cs);
+        memcpy(stickers_out, cs.s, 24);
+        state_bytes = 4;
+    } else {
+        /* Sticker k occupies bits 3k..3k+2 of the little-endian 72-bit value */
+        for (int k = 0; k < 24; k++) {
+            int bit = 3 * k, byte = bit >> 3;
+            unsigned v = r[byte] | (byte + 1 < PACKED_STATE_BYTES ? (unsigned)r[byte + 1] << 8 : 0);
+            stickers_out[k] = (uint8_t)((v >> (bit & 7)) & 7);
+        }
+        state_bytes = PACKED_STATE_BYTES;
+    }
+    if (!f->max_moves || r[state_bytes] == STATE_NO_SOLUTION) return CUBE_NO_SOLUTION;
+    int n = r[state_bytes];
+    if (n > f->max_moves) return CUBE_INVALID_STATE;
+    if (moves_out) memcpy(moves_out, r + state_bytes + 1, (size_t)n);
+    return n;
+}
+
+void cube_state_file_close(CubeStateFile* f) {
+    if (!f) return;
+    munmap(f->map, f->map_len);
+    free(f);
+}
+
+/* --- Multi-threaded table builder ---
+   Breadth-first over all coordinate indices, one level at a time. Each
+   thread scans its slice of the index range for states at the current
+   depth and claims unvisited neighbors with a compare-and-swap on their
+   depth byte, so no locks are taken and every state is counted once. A
+   slice whose thread cannot be created runs on the calling thread. */
+typedef struct {
+    uint8_t* depth;
+    uint32_t begin, end;
+    uint8_t d;
+    size_t found;
+    bool threaded;
+} BuildSlice;
+
+static void* build_level(void* arg) {
+    BuildSlice* sl = arg;
+    uint8_t next = (uint8_t)(sl->d + 1);
+    size_t found = 0;
+    for (uint32_t idx = sl->begin; idx < sl->end; idx++) {
+        if (__atomic_load_n(&sl->depth[idx], __ATOMIC_RELAXED) != sl->d) continue;
+        int p = (int)(idx / N_ORI), o = (int)(idx % N_ORI);
+        for (int m = 0; m < 9; m++) {
+            uint32_t n = (uint32_t)PERM_MOVE[p][m] * N_ORI + ORI_MOVE[o][m];
+            uint8_t expected = 0xFF;
+            if (__atomic_compare_exchange_n(&sl->depth[n], &expected, next, false,
+                                            __ATOMIC_RELAXED, __ATOMIC_RELAXED)) found++;
+        }
+    }
+    sl->found = found;
+    return NULL;
+}
+
+static bool write_u32(FILE* f, uint32_t v) {
+    uint8_t b[4] = {(uint8_t)v, (uint8_t)(v >> 8), (uint8_t)(v >> 16), (uint8_t)(v >> 24)};
+    return fwrite(b, 1, 4, f) == 4;
+}
+
+int cube_build_table(const char* path, int threads, int verbose) {
+    pthread_once(&init_once, init_tables);
+    if (threads <= 0) threads = (int)sysconf(_SC_NPROCESSORS_ONLN);
+    if (threads <= 0) threads = 1;
+    uint8_t* depth = malloc(N_STATES);
+    BuildSlice* slices = calloc((size_t)threads, sizeof(BuildSlice));
+    pthread_t* tids = calloc((size_t)threads, sizeof(pthread_t));
+    if (!depth || !slices || !tids) { free(depth); free(slices); free(tids); return -1; }
+    memset(depth, 0xFF, N_STATES);
+    depth[0] = 0;
+    size_t found = 1;
+    for (int d = 0; found; d++) {
+        if (verbose) fprintf(stderr, "Depth %d: %zu states\n", d, found);
+        found = 0;
+        for (int t = 0; t < threads; t++) {
+            slices[t] = (BuildSlice){depth, (uint32_t)((uint64_t)N_STATES * t / threads),
+                                     (uint32_t)((uint64_t)N_STATES * (t + 1) / threads), (uint8_t)d, 0, false};
+            if (t > 0) slices[t].threaded = pthread_create(&tids[t], NULL, build_level, &slices[t]) == 0;
+        }
+        for (int t = 0; t < threads; t++)
+            if (!slices[t].threaded) build_level(&slices[t]);
+        for (int t = 0; t < threads; t++) {
+            if (slices[t].threaded) pthread_join(tids[t], NULL);
+            found += slices[t].found;
+        }
+    }
+    free(slices); free(tids);
+
+    /* Same file layout as write_distance_table() in src/cube_core/batch.py */
+    uint32_t data_size = (N_STATES + 3) / 4;
+    uint8_t* data = calloc(data_size, 1);
+    if (!data) { free(depth); return -1; }
+    for (uint32_t idx = 0; idx < N_STATES; idx++)
+        data[idx >> 2] |= (uint8_t)((depth[idx] % 3) << ((idx & 3) * 2));
+    free(depth);
+    char tmp_path[4096];
+    snprintf(tmp_path, sizeof(tmp_path), "%s.tmp", path);
+    FILE* f = fopen(tmp_path, "wb");
+    if (!f) { free(data); return -1; }
+    uint8_t move_set[32] = {0}, pad[40] = {0};
+    memcpy(move_set, TABLE_MOVE_SET, strlen(TABLE_MOVE_SET));
+    bool ok = fwrite(TABLE_MAGIC, 1, 8, f) == 8
+        && write_u32(f, TABLE_VERSION) && write_u32(f, TABLE_HEADER_SIZE) && write_u32(f, N_STATES)
+        && write_u32(f, data_size) && write_u32(f, crc32(data, data_size))
+        && fputc(2, f) != EOF && fputc(1, f) != EOF && fputc(0, f) != EOF && fputc(0, f) != EOF
+        && fwrite(move_set, 1, 32, f) == 32 && fwrite(SOLVED_STATE_STR, 1, 24, f) == 24
+        && fwrite(pad, 1, 40, f) == 40 && fwrite(data, 1, data_size, f) == data_size;
+    free(data);
+    if (fclose(f) != 0) ok = false;
+    /* Atomic replace: processes that have the old table mapped keep it */
+    if (!ok || rename(tmp_path, path) != 0) { remove(tmp_path); return -1; }
+    return 0;
+}
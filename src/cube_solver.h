@@ -0,0 +1,106 @@
+/* 2x2 cube solver library (bin/libcubesolver.so).
+
+   A state is 24 sticker color codes in the order of str(Cube) in src/cube_core/cube.py
+   (U 0-3, F 4-7, R 8-11, B 12-15, L 16-19, D 20-23), colors coded
+   W=0 Y=1 R=2 O=3 B=4 G=5. Moves are returned as indices into
+   CUBE_MOVE_NAMES ("U", "U'", "U2", "R", "R'", "R2", "F", "F'", "F2"),
+   the same order as MOVES in src/cube_core/cube.py.
+
+   solve() and solve_many() are thread-safe: table walks run concurrently,
+   the BFS fallback (no table mapped) runs one at a time. The BFS buffers
+   start small, grow with the frontier and are capped by a memory budget
+   (default 1 GiB, $CUBE_BFS_MEMORY_MB, or cube_solver_set_memory_budget). */
+#ifndef CUBE_SOLVER_H
+#define CUBE_SOLVER_H
+
+#include <stddef.h>
+#include <stdint.h>
+
+#if defined(__GNUC__)
+#define CUBE_API __attribute__((visibility("default")))
+#else
+#define CUBE_API
+#endif
+
+/* Longest solution solve() can return; the row stride of solve_many(). */
+#define CUBE_MAX_MOVES 24
+
+/* Return values of solve() besides a solution length. */
+#define CUBE_NO_SOLUTION (-1)
+#define CUBE_INVALID_STATE (-2)
+#define CUBE_OUT_OF_MEMORY (-3)  /* the BFS would pass its memory budget */
+
+#define CUBE_MOVE_NAMES { "U", "U'", "U2", "R", "R'", "R2", "F", "F'", "F2" }
+
+/* Builds the move tables and maps the distance table at `table_path`
+   (NULL: $CUBE_DISTANCE_TABLE, if set). Solving works without a table,
+   through the BFS. Call it before solving from several threads; calling it
+   again replaces the table.
+   Returns 1 if a distance table is mapped, 0 otherwise. */
+CUBE_API int cube_solver_init(const char* table_path);
+
+/* Unmaps the distance table and frees the BFS buffers. */
+CUBE_API void cube_solver_shutdown(void);
+
+/* Caps the BFS buffers at `bytes` (0: no cap) and returns the previous cap.
+   Buffers already larger than the new cap are freed. A search that would
+   need more fails with CUBE_OUT_OF_MEMORY. */
+CUBE_API size_t cube_solver_set_memory_budget(size_t bytes);
+
+/* Reports the bytes the BFS buffers hold now, the most they have held since
+   the library was loaded, and the budget. Any pointer may be NULL. */
+CUBE_API void cube_solver_memory(size_t* bytes, size_t* peak, size_t* budget);
+
+/* Solves one state. Writes up to CUBE_MAX_MOVES move indices to `moves_out`
+   and returns the solution length, CUBE_NO_SOLUTION, CUBE_INVALID_STATE or
+   CUBE_OUT_OF_MEMORY. A state that cannot be solved (a color code above 5,
+   a corner that is not a real piece or appears twice, total twist not 0
+   mod 3) or whose DBL corner is not home is CUBE_INVALID_STATE, found in
+   constant time before any search. */
+CUBE_API int solve(const uint8_t stickers[24], uint8_t* moves_out);
+
+/* Same contract as solve(), but always searches with IDA* over the corner
+   coordinates, pruned by two small distance tables (under 6 KB): optimal,
+   with flat memory and no distance table file. Thread-safe, lock-free. */
+CUBE_API int solve_ida(const uint8_t stickers[24], uint8_t* moves_out);
+
+/* Solves `n` states stored back to back (24 bytes each). State i's moves go
+   to moves_out[i * CUBE_MAX_MOVES ...] and its solve() result to lengths[i].
+   Returns the number of states solved. */
+CUBE_API size_t solve_many(const uint8_t* states, size_t n, uint8_t* moves_out, int8_t* lengths);
+
+/* Builds the full distance table (2 bits per state, the layout read by
+   cube_solver_init) with a level-by-level BFS split across `threads` threads
+   (<= 0: one per online core) and writes it to `path`, replacing any
+   existing file atomically. With `verbose`, prints each depth's state count
+   to stderr. Returns 0, or -1 if memory or the file could not be written. */
+CUBE_API int cube_build_table(const char* path, int threads, int verbose);
+
+/* perm_rank * 729 + ori_rank of a state, or -1 if it is outside the
+   <U, R, F> frame (the DBL corner is not home, or corners are invalid). */
+CUBE_API int cube_coord_index(const uint8_t stickers[24]);
+
+/* Writes the stickers of the state with the given coordinates. Returns 0,
+   or -1 if the coordinates are out of range. */
+CUBE_API int cube_from_coords(int perm_rank, int ori_rank, uint8_t stickers_out[24]);
+
+/* A binary state file (StateFileWriter in src/cube_core/batch.py), mapped read-only. */
+typedef struct CubeStateFile CubeStateFile;
+
+/* Maps the state file at `path`. Returns NULL (with the reason on stderr
+   if the file exists) if it cannot be read or does not match this build. */
+CUBE_API CubeStateFile* cube_state_file_open(const char* path);
+
+/* Number of records in the file. */
+CUBE_API uint64_t cube_state_file_count(const CubeStateFile* f);
+
+/* Writes the stickers of record `i` to `stickers_out` and its stored moves
+   (if `moves_out` is not NULL) and returns the stored solution length,
+   CUBE_NO_SOLUTION if the record has none, or CUBE_INVALID_STATE if `i` is
+   out of range or the record is corrupt. Thread-safe. */
+CUBE_API int cube_state_file_read(const CubeStateFile* f, uint64_t i, uint8_t stickers_out[24], uint8_t* moves_out);
+
+/* Unmaps the file. */
+CUBE_API void cube_state_file_close(CubeStateFile* f);
+
+#endif
@@ -4,223 +4,168 @@
 #include <stdint.h>
 #include <stdbool.h>
 
-/* Compact state: 24 stickers, 3 bits each = 72 bits.
-   BUT, we can fix one corner. Let's fix corner DFL (stickers 18, 6, 20).
-   Actually, a simpler way to fix orientation is to only use U, R, F moves.
-   If we only use U, R, F moves, the corner DLB (stickers 14, 19, 22 - wait, indexing?)
-   Let's check indices from app.py:
-   U: 0,1,2,3
-   F: 4,5,6,7
-   R: 8,9,10,11
-   B: 12,13,14,15
-   L: 16,17,18,19
-   D: 20,21,22,23
-   
-   Corner DBL is (15, 19, 23).
-   If we only use U, R, F moves, the DBL corner (15, 19, 23) never moves.
-   So we have 7 corners left. Each corner has 3 stickers.
-   7 corners * 3 stickers = 21 stickers.
-   21 stickers * 3 bits = 63 bits. Fits in uint64_t!
-   
-   Stickers to exclude: 15 (B3), 19 (L3), 23 (D3).
-*/
+#include "cube_solver.h"
 
-typedef uint64_t packed_state;
+/* Command-line front end of libcubesolver: solves a 6-line state file or
+   every record of a binary state file with --states FILE, answers requests
+   on stdin with --serve, or writes the distance table with
+   --build-table [PATH] [THREADS]. All solving is done by the library. */
 
-typedef struct { uint8_t s[24]; } CubeState;
-const char* SOLVED_STATE_STR = "WWWWGGGGRRRRBBBBOOOOYYYY";
-CubeState SOLVED;
+static const char* MOVE_NAMES[9] = CUBE_MOVE_NAMES;
+static const char COLOR_CHARS[] = "WYROBG";
 
-static packed_state pack(const CubeState* cs) {
-    packed_state res = 0;
-    int bit = 0;
-    for (int i = 0; i < 24; i++) {
-        if (i == 15 || i == 19 || i == 23) continue;
-        res |= ((packed_state)(cs->s[i] & 0x7)) << (bit * 3);
-        bit++;
-    }
-    return res;
-}
-
-static inline bool states_equal(const CubeState* a, const CubeState* b) {
-    return memcmp(a->s, b->s, 24) == 0;
+/* Path of the table: $CUBE_DISTANCE_TABLE, else distance_table.bin next to the binary. */
+static void table_path(const char* argv0, char* buf, size_t len) {
+    const char* env = getenv("CUBE_DISTANCE_TABLE");
+    if (env) { snprintf(buf, len, "%s", env); return; }
+    const char* slash = strrchr(argv0, '/');
+    int dir_len = slash ? (int)(slash - argv0) : 1;
+    snprintf(buf, len, "%.*s/distance_table.bin", dir_len, slash ? argv0 : ".");
 }
 
-static void rotate_face(CubeState* state, int start) {
-    uint8_t t = state->s[start];
-    state->s[start] = state->s[start+2];
-    state->s[start+2] = state->s[start+3];
-    state->s[start+3] = state->s[start+1];
-    state->s[start+1] = t;
+static void print_solution(const uint8_t* sol, int n) {
+    if (n == CUBE_OUT_OF_MEMORY) { printf("Search memory budget exceeded.\n"); return; }
+    if (n == CUBE_INVALID_STATE) { printf("Unsolvable state.\n"); return; }
+    if (n < 0) { printf("No solution found.\n"); return; }
+    printf("\nSolution (%d moves):\n", n);
+    for (int j = 0; j < n; j++) printf("%s ", MOVE_NAMES[sol[j]]);
+    printf("\n");
 }
 
-static void apply_move(CubeState* s, char face) {
-    CubeState old = *s;
-    if (face == 'U') {
-        rotate_face(s, 0);
-        s->s[4] = old.s[8]; s->s[5] = old.s[9];
-        s->s[8] = old.s[12]; s->s[9] = old.s[13];
-        s->s[12] = old.s[16]; s->s[13] = old.s[17];
-        s->s[16] = old.s[4]; s->s[17] = old.s[5];
-    } else if (face == 'R') {
-        rotate_face(s, 8);
-        s->s[1] = old.s[15]; s->s[3] = old.s[13];
-        s->s[5] = old.s[1]; s->s[7] = old.s[3];
-        s->s[21] = old.s[5]; s->s[23] = old.s[7];
-        s->s[15] = old.s[21]; s->s[13] = old.s[23];
-    } else if (face == 'F') {
-        rotate_face(s, 4);
-        s->s[2] = old.s[17]; s->s[3] = old.s[19];
-        s->s[8] = old.s[2]; s->s[10] = old.s[3];
-        s->s[20] = old.s[8]; s->s[21] = old.s[10];
-        s->s[17] = old.s[20]; s->s[19] = old.s[21];
+static int color_code(char c) {
+    switch (c) {
+        case 'W': return 0; case 'Y': return 1; case 'R': return 2;
+        case 'O': return 3; case 'B': return 4; case 'G': return 5;
+        default: return -1;
     }
 }
 
-typedef struct { packed_state ps; int parent; const char* move; char last; } Node;
-#define TABLE_SIZE 10000003
-typedef struct { packed_state ps; int node_idx; bool occupied; } Entry;
-
-static int visited(packed_state ps, Entry* table) {
-    uint32_t h = (uint32_t)(ps ^ (ps >> 32)) % TABLE_SIZE;
-    while (table[h].occupied) {
-        if (table[h].ps == ps) return table[h].node_idx;
-        h = (h + 1) % TABLE_SIZE;
+static bool parse_stickers(const char* text, uint8_t stickers[24]) {
+    if (strlen(text) != 24) return false;
+    for (int i = 0; i < 24; i++) {
+        int c = color_code(text[i]);
+        if (c < 0) return false;
+        stickers[i] = (uint8_t)c;
     }
-    return -1;
+    return true;
 }
 
-static void add_visited(packed_state ps, int node_idx, Entry* table) {
-    uint32_t h = (uint32_t)(ps ^ (ps >> 32)) % TABLE_SIZE;
-    while (table[h].occupied) h = (h + 1) % TABLE_SIZE;
-    table[h].ps = ps; table[h].node_idx = node_idx; table[h].occupied = true;
-}
-
-const char* inv_move(const char* m) {
-    if (m[1] == '2') return m;
-    if (m[1] == '\'') { static char buf[2]; buf[0]=m[0]; buf[1]='\0'; return buf; }
-    static char buf2[3]; buf2[0]=m[0]; buf2[1]='\''; buf2[2]='\0'; return buf2;
-}
-
-/* Hardcoded inverse moves because of static buffer issues */
-const char* get_inv(const char* m) {
-    if (strcmp(m, "U") == 0) return "U'"; if (strcmp(m, "U'") == 0) return "U";
-    if (strcmp(m, "U2") == 0) return "U2";
-    if (strcmp(m, "R") == 0) return "R'"; if (strcmp(m, "R'") == 0) return "R";
-    if (strcmp(m, "R2") == 0) return "R2";
-    if (strcmp(m, "F") == 0) return "F'"; if (strcmp(m, "F'") == 0) return "F";
-    if (strcmp(m, "F2") == 0) return "F2";
-    return m;
+/* Resident mode: one request per line on stdin, one response per line on stdout.
+     PING                      -> PONG
+     QUIT                      -> (exit)
+     <24 sticker chars>        -> OK <n> <moves...> | NOSOLUTION | ERR <message>
+     MEMORY                    -> OK <bfs bytes> <peak bytes> <budget bytes>
+     COORD <24 sticker chars>  -> OK <perm_rank> <ori_rank> | ERR <message>
+     STATE <perm> <ori>        -> OK <24 sticker chars> | ERR <message>
+   Sticker order matches str(Cube) in src/cube_core/cube.py. */
+static int serve(void) {
+    char line[256];
+    uint8_t stickers[24], sol[CUBE_MAX_MOVES];
+    while (fgets(line, sizeof(line), stdin)) {
+        line[strcspn(line, "\r\n")] = '\0';
+        if (strcmp(line, "PING") == 0) { printf("PONG\n"); fflush(stdout); continue; }
+        if (strcmp(line, "QUIT") == 0) break;
+        if (strcmp(line, "MEMORY") == 0) {
+            size_t bytes, peak, budget;
+            cube_solver_memory(&bytes, &peak, &budget);
+            printf("OK %zu %zu %zu\n", bytes, peak, budget);
+            fflush(stdout); continue;
+        }
+        if (strncmp(line, "COORD ", 6) == 0) {
+            int idx = parse_stickers(line + 6, stickers) ? cube_coord_index(stickers) : -1;
+            if (idx < 0) printf("ERR state outside the <U, R, F> frame\n");
+            else printf("OK %d %d\n", idx / 729, idx % 729);
+            fflush(stdout); continue;
+        }
+        if (strncmp(line, "STATE ", 6) == 0) {
+            int p_rank, o_rank;
+            if (sscanf(line + 6, "%d %d", &p_rank, &o_rank) != 2
+                || cube_from_coords(p_rank, o_rank, stickers) != 0) {
+                printf("ERR coordinates out of range\n");
+            } else {
+                printf("OK ");
+                for (int i = 0; i < 24; i++) putchar(COLOR_CHARS[stickers[i]]);
+                printf("\n");
+            }
+            fflush(stdout); continue;
+        }
+        if (!parse_stickers(line, stickers)) { printf("ERR invalid state\n"); fflush(stdout); continue; }
+        int n = solve(stickers, sol);
+        if (n == CUBE_OUT_OF_MEMORY) printf("ERR memory budget exceeded\n");
+        else if (n == CUBE_INVALID_STATE) printf("ERR unsolvable state\n");
+        else if (n < 0) printf("NOSOLUTION\n");
+        else {
+            printf("OK %d", n);
+            for (int j = 0; j < n; j++) printf(" %s", MOVE_NAMES[sol[j]]);
+            printf("\n");
+        }
+        fflush(stdout);
+    }
+    return 0;
 }
 
-void solve_bidirectional(CubeState start) {
-    packed_state start_ps = pack(&start);
-    packed_state solved_ps = pack(&SOLVED);
-    if (start_ps == solved_ps) { printf("\nSolution (0 moves):\n\n"); return; }
-    
-    Entry* table_fwd = calloc(TABLE_SIZE, sizeof(Entry));
-    Entry* table_bwd = calloc(TABLE_SIZE, sizeof(Entry));
-    int q_cap = 5000000;
-    Node* q_fwd = malloc(sizeof(Node) * q_cap);
-    Node* q_bwd = malloc(sizeof(Node) * q_cap);
-    int h_fwd = 0, t_fwd = 0, h_bwd = 0, t_bwd = 0;
-    
-    q_fwd[t_fwd++] = (Node){start_ps, -1, NULL, 0}; add_visited(start_ps, 0, table_fwd);
-    q_bwd[t_bwd++] = (Node){solved_ps, -1, NULL, 0}; add_visited(solved_ps, 0, table_bwd);
-    
-    const char* moves[] = {"U", "U'", "U2", "R", "R'", "R2", "F", "F'", "F2"};
-    int sol_fwd = -1, sol_bwd = -1;
-    
-    for (int d = 0; d < 10; d++) {
-        int lev_fwd = t_fwd - h_fwd;
-        for (int i = 0; i < lev_fwd; i++) {
-            int curr_idx = h_fwd++; Node curr = q_fwd[curr_idx];
-            CubeState cs;
-            /* Unpack briefly to apply move */
-            int bit = 0;
-            for (int j = 0; j < 24; j++) {
-                if (j == 15 || j == 19 || j == 23) {
-                    cs.s[j] = SOLVED.s[j]; // Fix corner
-                } else {
-                    cs.s[j] = (uint8_t)((curr.ps >> (bit * 3)) & 0x7);
-                    bit++;
-                }
-            }
-            for (int m = 0; m < 9; m++) {
-                if (moves[m][0] == curr.last) continue;
-                CubeState next_cs = cs;
-                int count = (moves[m][1] == '\'') ? 3 : (moves[m][1] == '2' ? 2 : 1);
-                for (int k = 0; k < count; k++) apply_move(&next_cs, moves[m][0]);
-                packed_state nps = pack(&next_cs);
-                if (visited(nps, table_fwd) == -1) {
-                    int bidx = visited(nps, table_bwd);
-                    if (bidx != -1) { sol_fwd = t_fwd; sol_bwd = bidx;
-                        q_fwd[t_fwd++] = (Node){nps, curr_idx, moves[m], moves[m][0]}; goto found; }
-                    if (t_fwd < q_cap) {
-                        q_fwd[t_fwd++] = (Node){nps, curr_idx, moves[m], moves[m][0]};
-                        add_visited(nps, t_fwd - 1, table_fwd);
-                    }
-                }
-            }
+/* Solves every record of a binary state file, one line per record:
+     <24 sticker chars> OK <n> <moves...> | NOSOLUTION | ERR <message>
+   Stored solutions are ignored; the states are solved again. */
+static int solve_state_file(const char* path) {
+    CubeStateFile* f = cube_state_file_open(path);
+    if (!f) { fprintf(stderr, "Cannot read state file %s\n", path); return 1; }
+    uint8_t stickers[24], sol[CUBE_MAX_MOVES];
+    uint64_t count = cube_state_file_count(f);
+    for (uint64_t i = 0; i < count; i++) {
+        if (cube_state_file_read(f, i, stickers, NULL) == CUBE_INVALID_STATE) {
+            printf("ERR corrupt record %llu\n", (unsigned long long)i);
+            continue;
         }
-        int lev_bwd = t_bwd - h_bwd;
-        for (int i = 0; i < lev_bwd; i++) {
-            int curr_idx = h_bwd++; Node curr = q_bwd[curr_idx];
-            CubeState cs;
-            int bit = 0;
-            for (int j = 0; j < 24; j++) {
-                if (j == 15 || j == 19 || j == 23) cs.s[j] = SOLVED.s[j];
-                else { cs.s[j] = (uint8_t)((curr.ps >> (bit * 3)) & 0x7); bit++; }
-            }
-            for (int m = 0; m < 9; m++) {
-                if (moves[m][0] == curr.last) continue;
-                CubeState next_cs = cs;
-                int count = (moves[m][1] == '\'') ? 3 : (moves[m][1] == '2' ? 2 : 1);
-                for (int k = 0; k < count; k++) apply_move(&next_cs, moves[m][0]);
-                packed_state nps = pack(&next_cs);
-                if (visited(nps, table_bwd) == -1) {
-                    int fidx = visited(nps, table_fwd);
-                    if (fidx != -1) { sol_fwd = fidx; sol_bwd = t_bwd;
-                        q_bwd[t_bwd++] = (Node){nps, curr_idx, moves[m], moves[m][0]}; goto found; }
-                    if (t_bwd < q_cap) {
-                        q_bwd[t_bwd++] = (Node){nps, curr_idx, moves[m], moves[m][0]};
-                        add_visited(nps, t_bwd - 1, table_bwd);
-                    }
-                }
-            }
+        for (int k = 0; k < 24; k++) putchar(stickers[k] < 6 ? COLOR_CHARS[stickers[k]] : '?');
+        int n = solve(stickers, sol);
+        if (n == CUBE_OUT_OF_MEMORY) printf(" ERR memory budget exceeded\n");
+        else if (n == CUBE_INVALID_STATE) printf(" ERR unsolvable state\n");
+        else if (n < 0) printf(" NOSOLUTION\n");
+        else {
+            printf(" OK %d", n);
+            for (int j = 0; j < n; j++) printf(" %s", MOVE_NAMES[sol[j]]);
+            printf("\n");
         }
     }
-found:
-    if (sol_fwd != -1) {
-        int p1[64], l1 = 0, p2[64], l2 = 0;
-        int idx = sol_fwd; while (idx != -1 && q_fwd[idx].parent != -1) { p1[l1++] = idx; idx = q_fwd[idx].parent; }
-        if (idx != -1 && q_fwd[idx].move) p1[l1++] = idx;
-        idx = sol_bwd; while (idx != -1 && q_bwd[idx].parent != -1) { p2[l2++] = idx; idx = q_bwd[idx].parent; }
-        if (idx != -1 && q_bwd[idx].move) p2[l2++] = idx;
-        printf("\nSolution (%d moves):\n", l1 + l2);
-        for (int j = l1 - 1; j >= 0; j--) if(q_fwd[p1[j]].move) printf("%s ", q_fwd[p1[j]].move);
-        for (int j = 0; j < l2; j++) if(q_bwd[p2[j]].move) printf("%s ", get_inv(q_bwd[p2[j]].move));
-        printf("\n");
-    } else printf("No solution found.\n");
-    free(table_fwd); free(table_bwd); free(q_fwd); free(q_bwd);
+    cube_state_file_close(f);
+    return 0;
 }
 
 int main(int argc, char** argv) {
-    for (int i = 0; i < 24; i++) {
-        char c = SOLVED_STATE_STR[i];
-        SOLVED.s[i] = (c=='W'?0:c=='Y'?1:c=='R'?2:c=='O'?3:c=='B'?4:5);
+    char path[4096];
+    table_path(argv[0], path, sizeof(path));
+    if (argc >= 2 && argc <= 4 && strcmp(argv[1], "--build-table") == 0) {
+        const char* out = argc >= 3 ? argv[2] : path;
+        int threads = argc == 4 ? atoi(argv[3]) : 0;
+        if (cube_build_table(out, threads, 1) != 0) { fprintf(stderr, "Failed to write %s\n", out); return 1; }
+        fprintf(stderr, "Wrote %s\n", out);
+        return 0;
+    }
+    if (argc == 3 && strcmp(argv[1], "--states") == 0) {
+        cube_solver_init(path);
+        int rc = solve_state_file(argv[2]);
+        cube_solver_shutdown();
+        return rc;
     }
     if (argc != 2) return 1;
+    cube_solver_init(path);
+    if (strcmp(argv[1], "--serve") == 0) { int rc = serve(); cube_solver_shutdown(); return rc; }
     FILE* f = fopen(argv[1], "r"); if (!f) return 1;
-    CubeState start; char line[256];
+    uint8_t start[24];
     char* fl[6]; for (int i = 0; i < 6; i++) { fl[i] = malloc(256); fgets(fl[i], 256, f); }
     #define CC(c) (c=='W'?0:c=='Y'?1:c=='R'?2:c=='O'?3:c=='B'?4:5)
-    start.s[0]=CC(fl[0][0]); start.s[1]=CC(fl[0][1]); start.s[2]=CC(fl[1][0]); start.s[3]=CC(fl[1][1]);
-    start.s[16]=CC(fl[2][0]); start.s[17]=CC(fl[2][1]); start.s[4]=CC(fl[2][2]); start.s[5]=CC(fl[2][3]);
-    start.s[8]=CC(fl[2][4]); start.s[9]=CC(fl[2][5]); start.s[12]=CC(fl[2][6]); start.s[13]=CC(fl[2][7]);
-    start.s[18]=CC(fl[3][0]); start.s[19]=CC(fl[3][1]); start.s[6]=CC(fl[3][2]); start.s[7]=CC(fl[3][3]);
-    start.s[10]=CC(fl[3][4]); start.s[11]=CC(fl[3][5]); start.s[14]=CC(fl[3][6]); start.s[15]=CC(fl[3][7]);
-    start.s[20]=CC(fl[4][0]); start.s[21]=CC(fl[4][1]); start.s[22]=CC(fl[5][0]); start.s[23]=CC(fl[5][1]);
+    start[0]=CC(fl[0][0]); start[1]=CC(fl[0][1]); start[2]=CC(fl[1][0]); start[3]=CC(fl[1][1]);
+    start[16]=CC(fl[2][0]); start[17]=CC(fl[2][1]); start[4]=CC(fl[2][2]); start[5]=CC(fl[2][3]);
+    start[8]=CC(fl[2][4]); start[9]=CC(fl[2][5]); start[12]=CC(fl[2][6]); start[13]=CC(fl[2][7]);
+    start[18]=CC(fl[3][0]); start[19]=CC(fl[3][1]); start[6]=CC(fl[3][2]); start[7]=CC(fl[3][3]);
+    start[10]=CC(fl[3][4]); start[11]=CC(fl[3][5]); start[14]=CC(fl[3][6]); start[15]=CC(fl[3][7]);
+    start[20]=CC(fl[4][0]); start[21]=CC(fl[4][1]); start[22]=CC(fl[5][0]); start[23]=CC(fl[5][1]);
     for (int i = 0; i < 6; i++) free(fl[i]); fclose(f);
-    solve_bidirectional(start); return 0;
+    uint8_t sol[CUBE_MAX_MOVES];
+    print_solution(sol, solve(start, sol));
+    size_t peak;
+    cube_solver_memory(NULL, &peak, NULL);
+    if (peak) fprintf(stderr, "Search memory: peak %zu KiB\n", peak >> 10);
+    cube_solver_shutdown(); return 0;
 }
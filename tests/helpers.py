@@ -0,0 +1,14 @@
+"""Cube helpers shared by the tests."""
+from src.cube_core import MOVES, Cube
+
+
+def apply_moves(cube, moves):
+    """Returns `cube` after the moves in `moves`, in order."""
+    for m in moves:
+        cube = cube.apply_move(m)
+    return cube
+
+
+def scrambled(rng, n=20):
+    """A cube scrambled from solved by `n` moves drawn from `rng` (a random.Random)."""
+    return apply_moves(Cube(), [rng.choice(MOVES) for _ in range(n)])
@@ -0,0 +1,73 @@
+import random
+import unittest
+
+import numpy as np
+
+from src.cube_core import (
+    MOVES, PACKED_STATE_BYTES, Cube, apply_moves_batch, apply_moves_coords_batch, coords_to_stickers_batch,
+    is_solved_batch, pack_states_batch, states_to_stickers, stickers_to_coords_batch, stickers_to_states,
+    unpack_states_batch,
+)
+from src.cube_core.cube import _pack_state
+from tests.helpers import scrambled
+
+
+def _random_cubes(n, seed):
+    rng = random.Random(seed)
+    return [scrambled(rng, rng.randint(0, 20)) for _ in range(n)]
+
+
+class TestBatchMoves(unittest.TestCase):
+
+    def setUp(self):
+        self.cubes = _random_cubes(64, seed=3)
+        self.stickers = states_to_stickers(self.cubes)
+
+    def test_pack_format_matches_pack_state(self):
+        self.assertEqual(self.stickers.shape, (64, 24))
+        packed = pack_states_batch(self.stickers)
+        self.assertEqual(packed.shape, (64, PACKED_STATE_BYTES))
+        for row, cube in zip(packed, self.cubes):
+            self.assertEqual(int.from_bytes(row.tobytes(), "little"), _pack_state(list(str(cube))))
+        np.testing.assert_array_equal(unpack_states_batch(packed), self.stickers)
+        self.assertEqual(stickers_to_states(self.stickers), [c.state for c in self.cubes])
+
+    def test_single_moves_match_cube(self):
+        for move in MOVES:
+            moved = stickers_to_states(apply_moves_batch(self.stickers, move))
+            self.assertEqual(moved, [c.apply_move(move).state for c in self.cubes], move)
+
+    def test_sequence_matches_cube(self):
+        sequence = ["R", "U'", "F2", "R2", "F'", "U"]
+        expected = []
+        for cube in self.cubes:
+            for move in sequence:
+                cube = cube.apply_move(move)
+            expected.append(cube.state)
+        self.assertEqual(stickers_to_states(apply_moves_batch(self.stickers, sequence)), expected)
+
+    def test_is_solved_batch(self):
+        stickers = states_to_stickers([Cube(), Cube().apply_move("R"), Cube()])
+        self.assertEqual(is_solved_batch(stickers).tolist(), [True, False, True])
+        undone = apply_moves_batch(apply_moves_batch(stickers, ["R", "U"]), ["U'", "R'"])
+        self.assertEqual(is_solved_batch(undone).tolist(), [True, False, True])
+
+    def test_coordinates_match_scalar_versions(self):
+        perm_ranks, ori_ranks = stickers_to_coords_batch(self.stickers)
+        self.assertEqual(list(zip(perm_ranks.tolist(), ori_ranks.tolist())),
+                         [c.to_coords() for c in self.cubes])
+        np.testing.assert_array_equal(coords_to_stickers_batch(perm_ranks, ori_ranks), self.stickers)
+
+        sequence = ["F", "R'", "U2"]
+        perm_moved, ori_moved = apply_moves_coords_batch(perm_ranks, ori_ranks, sequence)
+        expected = stickers_to_coords_batch(apply_moves_batch(self.stickers, sequence))
+        np.testing.assert_array_equal(perm_moved, expected[0])
+        np.testing.assert_array_equal(ori_moved, expected[1])
+
+    def test_invalid_input_is_rejected(self):
+        with self.assertRaises(ValueError):
+            apply_moves_batch(self.stickers, "D")
+        twisted = self.stickers.copy()
+        twisted[5, [3, 8, 5]] = twisted[5, [5, 3, 8]]
+        with self.assertRaisesRegex(ValueError, "State 5"):
+            stickers_to_coords_batch(twisted)
@@ -0,0 +1,101 @@
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import batch_solve
+from src.cube_core import SOLVED_STATE_STR, Cube, read_states
+from src.cube_core.cube import _generate_file_content_from_state
+from tests.helpers import apply_moves
+
+
+# A stand-in for `bin/solver --serve` that solves the solved state and
+# hangs on anything else
+STUB_SOLVER = """import sys
+for line in sys.stdin:
+    line = line.strip()
+    if line == "QUIT":
+        break
+    if line != "{solved}":
+        sys.stdin.read()
+    print("OK 0", flush=True)
+"""
+
+SCRAMBLES = [["R"], ["U", "F"], ["R", "U", "F'"], ["F2", "U'", "R2", "U"], [], ["U2"]]
+
+
+class TestBatchSolve(unittest.TestCase):
+
+    def _input(self):
+        lines = [str(apply_moves(Cube(), moves)) for moves in SCRAMBLES]
+        # The app's 6-line format, separated by a blank line
+        lines += ["", _generate_file_content_from_state(list(str(apply_moves(Cube(), ["R'", "F"])))), "", "XX"]
+        return "\n".join(lines) + "\n"
+
+    def test_read_states_accepts_both_formats(self):
+        records = list(read_states(io.StringIO(self._input())))
+        self.assertEqual(len(records), len(SCRAMBLES) + 2)
+        self.assertEqual(records[0], (str(apply_moves(Cube(), ["R"])), None))
+        self.assertEqual(records[len(SCRAMBLES)], (str(apply_moves(Cube(), ["R'", "F"])), None))
+        self.assertIsNone(records[-1][0])
+        self.assertIn("Incomplete", records[-1][1])
+
+    def test_ordered_and_unordered_runs_agree(self):
+        records = list(enumerate(read_states(io.StringIO(self._input()))))
+        records = [(index, state, error) for index, (state, error) in records]
+        outputs = []
+        for jobs, ordered in ((1, True), (2, True), (2, False)):
+            out = io.StringIO()
+            written = batch_solve.run(iter(records), out, jobs, ordered=ordered, chunk_size=2)
+            self.assertEqual(written, len(records))
+            rows = [json.loads(line) for line in out.getvalue().splitlines()]
+            if ordered:
+                self.assertEqual([r["index"] for r in rows], list(range(len(records))))
+            outputs.append(sorted(rows, key=lambda r: r["index"]))
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertEqual(outputs[0], outputs[2])
+
+        for row in outputs[0][:-1]:
+            cube = Cube(row["state"])
+            for m in row["moves"]:
+                cube = cube.apply_move(m)
+            self.assertTrue(cube.is_solved())
+            self.assertEqual(row["length"], len(row["moves"]))
+        self.assertEqual(outputs[0][len(SCRAMBLES) - 2]["moves"], [])
+        self.assertIn("error", outputs[0][-1])
+
+    def test_errors_are_reported_per_state(self):
+        twisted = list(SOLVED_STATE_STR)
+        twisted[3], twisted[8], twisted[5] = twisted[5], twisted[3], twisted[8]
+        rows = [json.loads(line) for line in batch_solve.solve_chunk([(7, "".join(twisted), None)])]
+        self.assertEqual(rows[0]["index"], 7)
+        self.assertIn("error", rows[0])
+
+    def test_hung_resident_solver_fails_one_state_and_restarts(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "solver")
+            with open(path, "w") as f:
+                f.write(f"#!{sys.executable}\n" + STUB_SOLVER.format(solved=SOLVED_STATE_STR))
+            os.chmod(path, 0o755)
+            solver = batch_solve.SolverProcess(path)
+            with mock.patch.multiple(batch_solve, _table=None, _library=None, _solver=solver, SOLVE_TIMEOUT=0.5):
+                try:
+                    records = [(0, str(apply_moves(Cube(), ["R"])), None), (1, SOLVED_STATE_STR, None)]
+                    rows = [json.loads(line) for line in batch_solve.solve_chunk(records)]
+                finally:
+                    solver.close()
+        self.assertIn("timed out", rows[0]["error"])
+        self.assertEqual(rows[1]["moves"], [])
+
+    def test_completed_indices_drops_a_partial_line(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "out.jsonl")
+            with open(path, "w") as f:
+                f.write('{"index": 0}\n{"index": 3}\n{"index": 4, "sta')
+            done = batch_solve.completed_indices(path)
+            self.assertEqual([i for i, flag in enumerate(done) if flag], [0, 3])
+            with open(path) as f:
+                self.assertEqual(f.read(), '{"index": 0}\n{"index": 3}\n')
@@ -1,5 +1,7 @@
+import random
 import unittest
-from src.app import Cube, SOLVED_STATE_STR
+from src.cube_core import MOVES, SOLVED_STATE_STR, Cube, apply_move_packed, coords_to_packed, packed_to_coords
+from src.cube_core.cube import _pack_state
 
 class TestCube(unittest.TestCase):
 
@@ -13,26 +15,26 @@ class TestCube(unittest.TestCase):
         # Apply R move to a solved cube
         moved_cube = cube.apply_move('R')
         
-        # After R move on solved:
-        # Original: U1=W, U3=W, F1=G, F3=G, D1=Y, D3=Y, B1=B, B3=B
+        # After R move on solved (F -> U -> B -> D -> F):
+        # Original: U1=W, U3=W, F1=G, F3=G, D1=Y, D3=Y, B0=B, B2=B
         # Expected:
-        # U1 should be B (from B3)
-        # U3 should be B (from B1)
-        # F1 should be W (from U1)
-        # F3 should be W (from U3)
-        # D1 should be G (from F1)
-        # D3 should be G (from F3)
-        # B3 should be Y (from D1)
-        # B1 should be Y (from D3)
+        # U1 should be G (from F1)
+        # U3 should be G (from F3)
+        # B2 should be W (from U1)
+        # B0 should be W (from U3)
+        # D3 should be B (from B0)
+        # D1 should be B (from B2)
+        # F3 should be Y (from D3)
+        # F1 should be Y (from D1)
         
-        self.assertEqual(str(moved_cube)[1], 'B') # U1
-        self.assertEqual(str(moved_cube)[3], 'B') # U3
-        self.assertEqual(str(moved_cube)[5], 'W') # F1
-        self.assertEqual(str(moved_cube)[7], 'W') # F3
-        self.assertEqual(str(moved_cube)[21], 'G') # D1
-        self.assertEqual(str(moved_cube)[23], 'G') # D3
-        self.assertEqual(str(moved_cube)[15], 'Y') # B3
-        self.assertEqual(str(moved_cube)[13], 'Y') # B1
+        self.assertEqual(str(moved_cube)[1], 'G') # U1
+        self.assertEqual(str(moved_cube)[3], 'G') # U3
+        self.assertEqual(str(moved_cube)[14], 'W') # B2
+        self.assertEqual(str(moved_cube)[12], 'W') # B0
+        self.assertEqual(str(moved_cube)[23], 'B') # D3
+        self.assertEqual(str(moved_cube)[21], 'B') # D1
+        self.assertEqual(str(moved_cube)[7], 'Y') # F3
+        self.assertEqual(str(moved_cube)[5], 'Y') # F1
 
         # Check that applying R three more times returns to solved
         restored_cube = moved_cube.apply_move('R').apply_move('R').apply_move('R')
@@ -89,8 +91,8 @@ class TestCube(unittest.TestCase):
         # U3 should be O (from L1)
         # R0 should be W (from U2)
         # R2 should be W (from U3)
-        # D0 should be R (from R0)
-        # D1 should be R (from R2)
+        # D1 should be R (from R0)
+        # D0 should be R (from R2)
         # L3 should be Y (from D1)
         # L1 should be Y (from D0)
 
@@ -102,3 +104,45 @@ class TestCube(unittest.TestCase):
         self.assertEqual(str(moved_cube)[21], 'R') # D1
         self.assertEqual(str(moved_cube)[19], 'Y') # L3
         self.assertEqual(str(moved_cube)[17], 'Y') # L1
+
+    def test_coords_of_solved_cube(self):
+        self.assertEqual(Cube().to_coords(), (0, 0))
+        self.assertEqual(Cube().coord_index(), 0)
+        self.assertTrue(Cube.from_coords(0, 0).is_solved())
+
+    def test_coords_roundtrip_is_lossless(self):
+        rng = random.Random(4)
+        cube = Cube()
+        for _ in range(300):
+            cube = cube.apply_move(rng.choice(cube.get_possible_moves()))
+            perm_rank, ori_rank = cube.to_coords()
+            self.assertEqual(Cube.from_coords(perm_rank, ori_rank), cube)
+            self.assertEqual(coords_to_packed(perm_rank, ori_rank), cube.state)
+            self.assertEqual(packed_to_coords(_pack_state(list(str(cube)))), (perm_rank, ori_rank))
+
+    def test_coords_reject_states_outside_the_frame(self):
+        # A single twisted corner cannot be reached with face turns
+        s = list(SOLVED_STATE_STR)
+        s[3], s[8], s[5] = s[5], s[3], s[8]
+        with self.assertRaises(ValueError):
+            Cube("".join(s)).to_coords()
+        with self.assertRaises(ValueError):
+            Cube.from_coords(5040, 0)
+
+    def test_packed_move_tables_compose(self):
+        rng = random.Random(5)
+        state = Cube().state
+        for _ in range(100):
+            state = apply_move_packed(state, rng.randrange(len(MOVES)))
+        for m, move in enumerate(MOVES):
+            base = MOVES.index(move[0])
+            once = apply_move_packed(state, base)
+            if move.endswith("'"):
+                expected = apply_move_packed(apply_move_packed(once, base), base)
+            elif move.endswith("2"):
+                expected = apply_move_packed(state, base)
+                expected = apply_move_packed(expected, base)
+            else:
+                expected = once
+            self.assertEqual(apply_move_packed(state, m), expected, move)
+            self.assertEqual(Cube(packed_state=state).apply_move(move).state, expected)
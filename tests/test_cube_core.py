@@ -0,0 +1,58 @@
+"""Tests for the headless src.cube_core package: lazy loading, no UI
+dependency and the import-time budget."""
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+import src.cube_core as cube_core
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from src.cube_core import Cube
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({"ms": elapsed, "solved": Cube().apply_move("R").apply_move("R'").is_solved(),
+                  "modules": sorted(sys.modules)}))
+"""
+
+
+def _probe():
+    result = subprocess.run([sys.executable, "-c", _PROBE], cwd=ROOT, capture_output=True, text=True,
+                            timeout=60, check=True)
+    return json.loads(result.stdout)
+
+
+class TestCubeCore(unittest.TestCase):
+
+    def test_cube_import_is_light_and_within_budget(self):
+        # Best of three, so a busy machine does not fail the budget
+        runs = [_probe() for _ in range(3)]
+        self.assertTrue(runs[0]["solved"])
+        modules = set(runs[0]["modules"])
+        for heavy in ("numpy", "streamlit", "subprocess", "ctypes", "src.cube_core.batch",
+                      "src.cube_core.solvers"):
+            self.assertNotIn(heavy, modules)
+        self.assertLess(min(run["ms"] for run in runs), cube_core.IMPORT_BUDGET_MS)
+
+    def test_names_resolve_to_their_submodule(self):
+        from src.cube_core import batch, cube, solvers
+        self.assertIs(cube_core.Cube, cube.Cube)
+        self.assertIs(cube_core.StateFile, batch.StateFile)
+        self.assertIs(cube_core.solve_cube, solvers.solve_cube)
+        for name in cube_core.__all__:
+            self.assertTrue(hasattr(cube_core, name), name)
+        self.assertIn("solve_cube", dir(cube_core))
+
+    def test_unknown_name_raises_attribute_error(self):
+        with self.assertRaises(AttributeError):
+            cube_core.no_such_name
+        with self.assertRaises(ImportError):
+            from src.cube_core import no_such_name  # noqa: F401
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+import random
+import tempfile
+import unittest
+
+from src.cube_core import (
+    MOVES, N_ORI, N_PERM, Cube, SolverLibrary, get_distance_table, open_distance_table, write_distance_table,
+)
+from src.cube_core.batch import _distance_table_path, _solve_cube_table
+from src.cube_core.cube import _coord_index, _coord_move_tables, _ori_rank, _ori_unrank, _perm_rank, _perm_unrank
+from src.cube_core.solvers import _solver_library_path
+
+
+class TestCornerCoordinates(unittest.TestCase):
+
+    def test_rank_unrank_roundtrip(self):
+        for rank in range(N_PERM):
+            self.assertEqual(_perm_rank(_perm_unrank(rank)), rank)
+        for rank in range(N_ORI):
+            ori = _ori_unrank(rank)
+            self.assertEqual(sum(ori) % 3, 0)
+            self.assertEqual(_ori_rank(ori), rank)
+
+    def test_solved_state_is_index_zero(self):
+        self.assertEqual(_coord_index(Cube().state), 0)
+
+    def test_move_tables_match_sticker_moves(self):
+        perm_move, ori_move = _coord_move_tables()
+        rng = random.Random(7)
+        cube = Cube()
+        idx = 0
+        for _ in range(200):
+            m = rng.randrange(9)
+            cube = cube.apply_move(MOVES[m])
+            p, o = divmod(idx, N_ORI)
+            idx = perm_move[p * 9 + m] * N_ORI + ori_move[o * 9 + m]
+            self.assertEqual(idx, _coord_index(cube.state))
+
+    def test_invalid_corner_is_rejected(self):
+        # Swap two stickers of the UFR corner (a twisted-in-place mirror image)
+        s = list(str(Cube()))
+        s[8], s[5] = s[5], s[8]
+        with self.assertRaises(ValueError):
+            _coord_index(Cube("".join(s)).state)
+
+
+@unittest.skipUnless(os.path.exists(_distance_table_path()), "run generate_table.py first")
+class TestDistanceTableSolver(unittest.TestCase):
+
+    def test_known_depths(self):
+        table = get_distance_table()
+        self.assertEqual(_solve_cube_table(Cube(), table), [])
+        self.assertEqual(_solve_cube_table(Cube().apply_move("R"), table), ["R'"])
+        self.assertEqual(len(_solve_cube_table(Cube().apply_move("R").apply_move("U"), table)), 2)
+
+    def test_random_scrambles_are_solved_optimally(self):
+        table = get_distance_table()
+        rng = random.Random(11)
+        for _ in range(100):
+            cube = Cube()
+            scramble = [rng.choice(MOVES) for _ in range(rng.randint(0, 25))]
+            for m in scramble:
+                cube = cube.apply_move(m)
+            solution = _solve_cube_table(cube, table)
+            self.assertLessEqual(len(solution), min(11, len(scramble)))
+            for m in solution:
+                cube = cube.apply_move(m)
+            self.assertTrue(cube.is_solved())
+
+    def test_file_roundtrip_and_header_checks(self):
+        data = bytes(get_distance_table())
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "table.bin")
+            write_distance_table(path, data)
+            self.assertEqual(bytes(open_distance_table(path)), data)
+
+            raw = bytearray(open(path, "rb").read())
+            corrupt = bytearray(raw)
+            corrupt[-1] ^= 0xFF
+            with open(path, "wb") as f:
+                f.write(corrupt)
+            with self.assertRaisesRegex(RuntimeError, "checksum"):
+                open_distance_table(path)
+
+            other_scheme = bytearray(raw)
+            other_scheme[64:68] = b"YYYY"
+            with open(path, "wb") as f:
+                f.write(other_scheme)
+            with self.assertRaisesRegex(RuntimeError, "color scheme"):
+                open_distance_table(path)
+
+    @unittest.skipUnless(os.path.exists(_solver_library_path()), "run make build first")
+    def test_threaded_c_builder_writes_the_same_file(self):
+        data = bytes(get_distance_table())
+        library = SolverLibrary(load_table=False)
+        with tempfile.TemporaryDirectory() as tmp:
+            python_path = os.path.join(tmp, "python.bin")
+            write_distance_table(python_path, data)
+            for threads in (1, 3):
+                c_path = os.path.join(tmp, f"c{threads}.bin")
+                library.build_table(c_path, threads=threads)
+                with open(c_path, "rb") as a, open(python_path, "rb") as b:
+                    self.assertEqual(a.read(), b.read())
@@ -0,0 +1,70 @@
+import os
+import random
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from src.cube_core import INVERSE_MOVE_INDEX, MOVES, Cube, get_distance_table, solve_cube, solvers
+from src.cube_core.batch import _distance_table_path, _solve_cube_table
+from src.cube_core.solvers import _isin_sorted, _solve_cube_frontier, _solve_cube_python
+from tests.helpers import apply_moves
+
+
+class TestFrontierSearch(unittest.TestCase):
+
+    def test_helpers(self):
+        for m, inv in enumerate(INVERSE_MOVE_INDEX):
+            self.assertTrue(apply_moves(Cube(), [MOVES[m], MOVES[inv]]).is_solved())
+        sorted_values = np.array([2, 5, 9], dtype=np.int64)
+        self.assertEqual(_isin_sorted(np.array([1, 2, 9, 10]), sorted_values).tolist(),
+                         [False, True, True, False])
+
+    def test_known_scrambles(self):
+        self.assertEqual(_solve_cube_frontier(Cube()), [])
+        self.assertEqual(_solve_cube_frontier(apply_moves(Cube(), ["R"])), ["R'"])
+        self.assertEqual(_solve_cube_frontier(apply_moves(Cube(), ["U2", "F"])), ["F'", "U2"])
+
+    def test_random_scrambles_are_solved(self):
+        rng = random.Random(8)
+        table = get_distance_table() if os.path.exists(_distance_table_path()) else None
+        for _ in range(30):
+            scramble = [rng.choice(MOVES) for _ in range(rng.randint(0, 25))]
+            cube = apply_moves(Cube(), scramble)
+            solution = _solve_cube_frontier(cube)
+            self.assertTrue(apply_moves(cube, solution).is_solved())
+            self.assertLessEqual(len(solution), min(11, len(scramble)))
+            if table is not None:
+                self.assertEqual(len(solution), len(_solve_cube_table(cube, table)))
+
+    def test_max_depth_limits_the_search(self):
+        self.assertIsNone(_solve_cube_frontier(apply_moves(Cube(), ["R", "U", "F"]), max_depth=2))
+
+    def test_unreachable_state_is_rejected(self):
+        s = list(str(Cube()))
+        s[3], s[8], s[5] = s[5], s[3], s[8]
+        with self.assertRaises(ValueError):
+            _solve_cube_frontier(Cube("".join(s)))
+
+    def test_solve_cube_uses_frontier_without_binary(self):
+        cube = apply_moves(Cube(), ["F", "R'", "U2", "R"])
+        with mock.patch.object(solvers, "get_distance_table", return_value=None), \
+                mock.patch.object(solvers, "_solver_binary_path", return_value="/nonexistent/solver"), \
+                mock.patch.object(solvers, "_solver_library_path", return_value="/nonexistent/libcubesolver.so"):
+            solution = solve_cube(cube, cache=solvers.SolutionCache(0))
+        self.assertTrue(apply_moves(cube, solution).is_solved())
+        self.assertEqual(len(solution), 4)
+
+
+class TestPythonSearch(unittest.TestCase):
+
+    def test_matches_frontier_lengths(self):
+        rng = random.Random(9)
+        for _ in range(10):
+            cube = apply_moves(Cube(), [rng.choice(MOVES) for _ in range(rng.randint(1, 25))])
+            solution = _solve_cube_python(cube)
+            self.assertTrue(apply_moves(cube, solution).is_solved())
+            self.assertEqual(len(solution), len(_solve_cube_frontier(cube)))
+
+    def test_solved_cube(self):
+        self.assertEqual(_solve_cube_python(Cube()), [])
@@ -0,0 +1,84 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import generate_states
+from src.cube_core import (
+    MOVES, N_STATES, Cube, apply_moves_batch, is_solved_batch, optimal_distances, sample_coord_indices,
+    sample_cubes, unpack_states_batch,
+)
+from src.cube_core.cube import _parse_file_content_to_state
+
+# Number of states at each optimal distance 0-11
+DISTANCE_COUNTS = [1, 9, 54, 321, 1847, 9992, 50136, 227536, 870072, 1887748, 623800, 2644]
+
+
+class TestSampling(unittest.TestCase):
+
+    def test_optimal_distances(self):
+        self.assertEqual(np.bincount(optimal_distances()).tolist(), DISTANCE_COUNTS)
+
+    def test_uniform_samples_follow_the_distance_distribution(self):
+        indices = sample_coord_indices(200000, rng=1)
+        self.assertTrue(((indices >= 0) & (indices < N_STATES)).all())
+        observed = np.bincount(optimal_distances()[indices], minlength=12)
+        expected = np.array(DISTANCE_COUNTS) / N_STATES * len(indices)
+        # Distances with enough expected samples land within a few standard deviations
+        for o, e in zip(observed, expected):
+            if e > 100:
+                self.assertLess(abs(o - e), 5 * np.sqrt(e))
+
+    def test_stratified_samples_have_the_requested_distance(self):
+        depth = optimal_distances()
+        for d in (0, 5, 11):
+            indices = sample_coord_indices(500, rng=d, distance=d)
+            self.assertTrue((depth[indices] == d).all())
+        self.assertGreater(len(set(sample_coord_indices(2000, rng=3, distance=11).tolist())), 1000)
+        with self.assertRaises(ValueError):
+            sample_coord_indices(1, distance=12)
+
+    def test_sample_cubes_are_reachable(self):
+        for cube in sample_cubes(20, rng=4):
+            self.assertEqual(Cube.from_coords(*cube.to_coords()), cube)
+
+
+class TestGenerateStates(unittest.TestCase):
+
+    def _corpus(self, directory, name, jobs, **plan):
+        path = os.path.join(directory, name)
+        chunks = generate_states.plan_chunks(7, chunk_size=300, **plan)
+        generate_states.write_corpus(path, chunks, jobs)
+        with np.load(path) as corpus:
+            return {k: corpus[k] for k in corpus.files}
+
+    def test_corpus_columns_hold_optimal_solutions(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            corpus = self._corpus(tmp, "corpus.npz", 1, count=1000)
+        self.assertEqual(len(corpus["index"]), 1000)
+        self.assertTrue(np.array_equal(corpus["distance"], optimal_distances()[corpus["index"]]))
+        stickers = unpack_states_batch(corpus["states"])
+        for row, moves, n in zip(stickers, corpus["moves"], corpus["distance"]):
+            self.assertTrue((moves[n:] == 255).all())
+            self.assertTrue(is_solved_batch(apply_moves_batch(row[None], [MOVES[m] for m in moves[:n]]))[0])
+
+    def test_output_does_not_depend_on_the_number_of_jobs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            one = self._corpus(tmp, "one.npz", 1, per_distance=200)
+            two = self._corpus(tmp, "two.npz", 2, per_distance=200)
+            self.assertEqual(sorted(os.listdir(tmp)), ["one.npz", "two.npz"])
+        for name in generate_states.COLUMNS:
+            self.assertTrue(np.array_equal(one[name], two[name]))
+        self.assertEqual(np.bincount(one["distance"]).tolist(), [200] * 12)
+
+    def test_fixtures_load_in_the_app(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for path in generate_states.write_fixtures(tmp, 3, seed=5, distance=11):
+                with open(path) as f:
+                    state = "".join(_parse_file_content_to_state(f.read()))
+                self.assertEqual(optimal_distances()[Cube(state).coord_index()], 11)
+
+
+if __name__ == '__main__':
+    unittest.main()
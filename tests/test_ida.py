@@ -0,0 +1,71 @@
+import os
+import random
+import unittest
+
+from src.cube_core import (
+    N_ORI, N_PERM, Cube, SolutionCache, SolverLibrary, build_distance_table, get_distance_table, solve_cube,
+)
+from src.cube_core.batch import _solve_cube_table
+from src.cube_core.solvers import _pruning_tables, _solve_cube_ida, _solver_library_path
+from tests.helpers import apply_moves, scrambled
+
+
+class TestPruningTables(unittest.TestCase):
+
+    def test_sizes_and_admissibility(self):
+        perm_dist, ori_dist = _pruning_tables()
+        self.assertEqual((len(perm_dist), len(ori_dist)), (N_PERM, N_ORI))
+        self.assertEqual(perm_dist[0], 0)
+        self.assertEqual(ori_dist[0], 0)
+        self.assertNotIn(255, perm_dist)
+        self.assertNotIn(255, ori_dist)
+        # The whole state is at least as far as either part (11 is the diameter)
+        self.assertLessEqual(max(perm_dist), 11)
+        self.assertLessEqual(max(ori_dist), 11)
+
+
+class TestIdaSearch(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.table = get_distance_table() or build_distance_table()
+
+    def test_optimal_lengths(self):
+        rng = random.Random(11)
+        for _ in range(25):
+            cube = scrambled(rng, 25)
+            solution = _solve_cube_ida(cube)
+            self.assertTrue(apply_moves(cube, solution).is_solved())
+            self.assertEqual(len(solution), len(_solve_cube_table(cube, self.table)))
+
+    def test_solved_and_depth_limit(self):
+        self.assertEqual(_solve_cube_ida(Cube()), [])
+        cube = scrambled(random.Random(12), 25)
+        optimal = len(_solve_cube_table(cube, self.table))
+        self.assertIsNone(_solve_cube_ida(cube, max_depth=optimal - 1))
+
+    def test_native_engine_matches(self):
+        if not os.path.exists(_solver_library_path()):
+            self.skipTest("bin/libcubesolver.so not built")
+        library = SolverLibrary(load_table=False)
+        rng = random.Random(13)
+        for _ in range(25):
+            cube = scrambled(rng, 25)
+            solution = library.solve_ida(str(cube))
+            self.assertTrue(apply_moves(cube, solution).is_solved())
+            self.assertEqual(len(solution), len(_solve_cube_table(cube, self.table)))
+
+    def test_solve_cube_backend_selection(self):
+        cube = scrambled(random.Random(14), 25)
+        optimal = len(_solve_cube_table(cube, self.table))
+        for backend in ("ida", "c-ida"):
+            if backend == "c-ida" and not os.path.exists(_solver_library_path()):
+                continue
+            solution = solve_cube(cube, cache=SolutionCache(0), backend=backend)
+            self.assertEqual(len(solution), optimal)
+        with self.assertRaises(ValueError):
+            solve_cube(cube, backend="bogus")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import itertools
+import json
+import random
+import unittest
+from unittest import mock
+
+import batch_solve
+from src.cube_core import MOVE_INDEX, MOVES, Cube, get_distance_table, iter_solutions, solvers
+from tests.helpers import apply_moves, scrambled
+
+
+def _brute_force(cube, max_length):
+    """Every sequence of at most max_length moves, without consecutive turns
+    of the same face, that solves `cube` without passing through solved."""
+    found = []
+    for length in range(max_length + 1):
+        for seq in itertools.product(MOVES, repeat=length):
+            if any(a[0] == b[0] for a, b in zip(seq, seq[1:])):
+                continue
+            states = [cube]
+            for m in seq:
+                states.append(states[-1].apply_move(m))
+            if states[-1].is_solved() and not any(s.is_solved() for s in states[:-1]):
+                found.append(list(seq))
+    return found
+
+
+class TestIterSolutions(unittest.TestCase):
+
+    def test_matches_brute_force_in_canonical_order(self):
+        rng = random.Random(7)
+        for _ in range(4):
+            cube = scrambled(rng, 3)
+            optimal = len(next(iter_solutions(cube)))
+            expected = _brute_force(cube, optimal + 1)
+            self.assertEqual(list(iter_solutions(cube, extra=1)), expected)
+
+    def test_optimal_solutions_solve_and_are_sorted(self):
+        rng = random.Random(8)
+        for _ in range(10):
+            cube = scrambled(rng, 14)
+            solutions = list(iter_solutions(cube))
+            self.assertEqual(len({len(s) for s in solutions}), 1)
+            self.assertEqual(len(solutions), len({tuple(s) for s in solutions}))
+            keys = [[MOVE_INDEX[m] for m in s] for s in solutions]
+            self.assertEqual(keys, sorted(keys))
+            for solution in solutions:
+                self.assertTrue(apply_moves(cube, solution).is_solved())
+
+    def test_without_a_table_the_lower_bound_finds_the_same_solutions(self):
+        if get_distance_table() is None:
+            self.skipTest("distance table not generated")
+        rng = random.Random(9)
+        for _ in range(5):
+            cube = scrambled(rng, 10)
+            with_table = list(iter_solutions(cube, extra=1))
+            with mock.patch.object(solvers, "get_distance_table", return_value=None):
+                self.assertEqual(list(iter_solutions(cube, extra=1)), with_table)
+
+    def test_solved_cube_has_only_the_empty_solution(self):
+        self.assertEqual(list(iter_solutions(Cube(), extra=2)), [[]])
+
+    def test_batch_solve_lists_solutions(self):
+        cube = apply_moves(Cube(), ["R", "U", "F2", "R'", "U"])
+        record = (0, str(cube), None)
+        result = json.loads(batch_solve.solve_chunk([record], (2, 2))[0])
+        self.assertEqual(result["length"], 5)
+        self.assertEqual(len(result["solutions"]), 2)
+        self.assertTrue(result["truncated"])
+        for solution in result["solutions"]:
+            self.assertTrue(apply_moves(cube, solution).is_solved())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import unittest
+from unittest import mock
+
+from src.cube_core import (
+    Cube, HistogramSink, Metrics, PrometheusSink, SolutionCache, metrics_from_env, solve_cube, solvers,
+)
+
+
+class RecordingSink:
+    def __init__(self):
+        self.spans = []
+        self.counts = []
+
+    def record_span(self, name, seconds):
+        self.spans.append(name)
+
+    def record_count(self, name, amount):
+        self.counts.append((name, amount))
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_disabled_metrics_use_a_shared_null_span(self):
+        metrics = Metrics()
+        self.assertIs(metrics.span("a"), metrics.span("b"))
+        with metrics.span("a"):
+            metrics.count("solves")
+
+    def test_histogram_buckets_and_counters(self):
+        sink = HistogramSink(buckets=(0.001, 0.01))
+        for seconds in (0.0005, 0.005, 0.005, 1.0):
+            sink.record_span("c_solve", seconds)
+        sink.record_count("timeouts", 1)
+        sink.record_count("timeouts", 2)
+        snapshot = sink.snapshot()
+        self.assertEqual(snapshot["spans"]["c_solve"]["buckets"], [1, 2, 1])
+        self.assertEqual(snapshot["spans"]["c_solve"]["count"], 4)
+        self.assertAlmostEqual(snapshot["spans"]["c_solve"]["sum"], 1.0105)
+        self.assertEqual(snapshot["counters"], {"timeouts": 3})
+
+    def test_prometheus_text_is_cumulative(self):
+        sink = PrometheusSink(buckets=(0.001, 0.01))
+        sink.record_span("parse", 0.0005)
+        sink.record_span("parse", 0.005)
+        sink.record_count("solves", 2)
+        text = sink.render()
+        self.assertIn('cube_solver_span_seconds_bucket{span="parse",le="0.001"} 1', text)
+        self.assertIn('cube_solver_span_seconds_bucket{span="parse",le="0.01"} 2', text)
+        self.assertIn('cube_solver_span_seconds_bucket{span="parse",le="+Inf"} 2', text)
+        self.assertIn('cube_solver_span_seconds_count{span="parse"} 2', text)
+        self.assertIn("cube_solver_solves_total 2", text)
+
+    def test_sinks_from_environment(self):
+        with mock.patch.dict(os.environ, {"CUBE_METRICS": "histogram, prometheus,nonsense"}):
+            metrics = metrics_from_env()
+        self.assertEqual([type(s) for s in metrics.sinks], [HistogramSink, PrometheusSink])
+        with mock.patch.dict(os.environ, {"CUBE_METRICS": ""}):
+            self.assertEqual(metrics_from_env().sinks, ())
+
+
+class TestSolveCubeInstrumentation(unittest.TestCase):
+
+    def test_solve_cube_records_spans_and_cache_counters(self):
+        sink = RecordingSink()
+        cube = Cube().apply_move("R").apply_move("U")
+        cache = SolutionCache(capacity=4)
+        with mock.patch.object(solvers, "METRICS", Metrics([sink])):
+            solve_cube(cube, cache=cache)
+            solve_cube(cube, cache=cache)
+        self.assertEqual(sink.spans.count("solve_cube"), 2)
+        self.assertIn("validate", sink.spans)
+        self.assertIn(("cache_misses", 1), sink.counts)
+        self.assertIn(("cache_hits", 1), sink.counts)
+        self.assertEqual(sink.counts.count(("solves", 1)), 2)
+
+    def test_oneshot_solver_phases(self):
+        sink = RecordingSink()
+        cube = Cube().apply_move("F").apply_move("R'")
+        with mock.patch.object(solvers, "METRICS", Metrics([sink])):
+            moves = solvers._try_c_solver_oneshot(cube)
+        for m in moves:
+            cube = cube.apply_move(m)
+        self.assertTrue(cube.is_solved())
+        self.assertEqual(sink.spans, ["tempfile_write", "process_spawn", "c_solve", "parse"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import random
+import unittest
+from unittest import mock
+
+from src.cube_core import SOLVED_STATE_STR, Cube, normalize_cube, normalize_state, solve_cube, solvers
+from tests.helpers import scrambled
+
+
+# Whole-cube rotation about the U axis (clockwise seen from above): the U
+# layer turns like U, the D layer along with it, and every side face moves
+# F -> L -> B -> R.
+Y_ROTATION = [(0, 1, 3, 2), (20, 22, 23, 21),
+              (4, 16, 12, 8), (5, 17, 13, 9), (6, 18, 14, 10), (7, 19, 15, 11)]
+
+
+def _rotate_y(state_str):
+    stickers = list(state_str)
+    for cycle in Y_ROTATION:
+        for k, dest in enumerate(cycle):
+            stickers[dest] = state_str[cycle[k - 1]]
+    return "".join(stickers)
+
+
+def _is_uniform(cube):
+    s = str(cube)
+    return all(len(set(s[f * 4:f * 4 + 4])) == 1 for f in range(6))
+
+
+class TestNormalization(unittest.TestCase):
+
+    def test_standard_state_is_unchanged(self):
+        cube = scrambled(random.Random(1))
+        self.assertEqual(normalize_cube(cube), cube)
+
+    def test_recolored_and_rotated_solved_cubes_normalize_to_solved(self):
+        recolored = SOLVED_STATE_STR.translate(str.maketrans("WYRGBO", "RGYOWB"))
+        self.assertTrue(normalize_cube(Cube(recolored)).is_solved())
+        self.assertTrue(normalize_cube(Cube(_rotate_y(SOLVED_STATE_STR))).is_solved())
+
+    def test_same_moves_solve_the_cube_as_entered(self):
+        rng = random.Random(2)
+        for turns in range(1, 4):
+            state = _rotate_y(str(scrambled(rng)))
+            for _ in range(turns - 1):
+                state = _rotate_y(state)
+            state = state.translate(str.maketrans("WYRGBO", "BGOWYR"))
+            cube = Cube(state)
+            self.assertRaises(ValueError, cube.to_coords)
+            normalized, table = normalize_state(state)
+            self.assertEqual(normalized, state.translate(table))
+            solution = solvers._solve_cube_frontier(Cube(normalized))
+            for m in solution:
+                cube = cube.apply_move(m)
+            self.assertTrue(_is_uniform(cube))
+
+    def test_invalid_colors_are_rejected(self):
+        with self.assertRaises(ValueError):
+            normalize_state("W" * 24)
+        s = list(SOLVED_STATE_STR)
+        s[0], s[4] = s[4], s[0]  # two colors now touch their opposites
+        with self.assertRaises(ValueError):
+            normalize_state("".join(s))
+
+    def test_solve_cube_accepts_a_rotated_cube(self):
+        cube = Cube(_rotate_y(str(scrambled(random.Random(3), 8))))
+        with mock.patch.object(solvers, "get_distance_table", return_value=None), \
+                mock.patch.object(solvers, "_solver_binary_path", return_value="/nonexistent/solver"), \
+                mock.patch.object(solvers, "_solver_library_path", return_value="/nonexistent/libcubesolver.so"):
+            solution = solve_cube(cube, cache=solvers.SolutionCache(0))
+        for m in solution:
+            cube = cube.apply_move(m)
+        self.assertTrue(_is_uniform(cube))
@@ -0,0 +1,76 @@
+import random
+import threading
+import unittest
+from unittest import mock
+
+from src.cube_core import (
+    Cube, SolutionCache, canonical_state, conjugate_stickers_batch, solution_from_canonical, solution_to_canonical,
+    solve_cube, solvers, states_to_stickers, stickers_to_states,
+)
+from tests.helpers import apply_moves, scrambled
+
+
+class TestSolutionCache(unittest.TestCase):
+
+    def test_evicts_least_recently_used(self):
+        cache = SolutionCache(capacity=2)
+        cache.put(1, ["U"])
+        cache.put(2, ["R"])
+        self.assertEqual(cache.get(1), ("U",))  # 2 is now the oldest
+        cache.put(3, ["F"])
+        self.assertIsNone(cache.get(2))
+        self.assertEqual(cache.get(3), ("F",))
+        self.assertEqual(cache.stats(), {"hits": 2, "misses": 1, "evictions": 1, "size": 2, "capacity": 2})
+
+    def test_zero_capacity_stores_nothing(self):
+        cache = SolutionCache(capacity=0)
+        cache.put(1, [])
+        self.assertIsNone(cache.get(1))
+        self.assertEqual(len(cache), 0)
+
+    def test_concurrent_puts_respect_capacity(self):
+        cache = SolutionCache(capacity=50)
+
+        def worker(offset):
+            for i in range(500):
+                cache.put(offset + i, ["U"])
+                cache.get(offset + i // 2)
+
+        threads = [threading.Thread(target=worker, args=(k * 1000,)) for k in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        stats = cache.stats()
+        self.assertEqual(stats["size"], 50)
+        self.assertEqual(stats["evictions"], 2000 - 50)
+        self.assertEqual(stats["hits"] + stats["misses"], 2000)
+
+    def test_canonical_solution_round_trip(self):
+        rng = random.Random(4)
+        for _ in range(50):
+            cube = scrambled(rng, 12)
+            rep, transform = canonical_state(cube.state)
+            solution = solve_cube(cube, cache=SolutionCache(0))
+            rep_solution = solution_to_canonical(solution, transform)
+            self.assertTrue(apply_moves(Cube(packed_state=rep), rep_solution).is_solved())
+            self.assertEqual(solution_from_canonical(rep_solution, transform), solution)
+
+
+class TestSolveCubeCache(unittest.TestCase):
+
+    def test_symmetric_states_share_an_entry(self):
+        cache = SolutionCache(capacity=10)
+        cube = scrambled(random.Random(5), 10)
+        first = solve_cube(cube, cache=cache)
+        # A mirror image of the same scramble is in the same class
+        mirrored = Cube(packed_state=stickers_to_states(conjugate_stickers_batch(states_to_stickers([cube]), 1))[0])
+        with mock.patch.object(solvers, "_solve_normalized_cube", side_effect=AssertionError("not cached")):
+            self.assertEqual(solve_cube(cube, cache=cache), first)
+            self.assertTrue(apply_moves(mirrored, solve_cube(mirrored, cache=cache)).is_solved())
+        self.assertEqual(cache.stats()["hits"], 2)
+        self.assertEqual(cache.stats()["size"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
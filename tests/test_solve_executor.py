@@ -0,0 +1,154 @@
+import threading
+import unittest
+
+from src.cube_core import MOVES, Cube, SolutionCache, SolveCancelled, SolveExecutor, solve_cube
+
+
+class BlockingSolver:
+    """A solve_func that reports progress until released, counting its calls.
+    With `interruptible` off it waits without reporting, like a C solve."""
+
+    def __init__(self):
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.interruptible = True
+
+    def __call__(self, cube, updater_func=None, **kwargs):
+        self.calls += 1
+        self.started.set()
+        if not self.interruptible:
+            self.release.wait()
+        while not self.release.wait(0.01):
+            updater_func("working")
+        updater_func("done")
+        return ["R'"]
+
+
+class TestSolveExecutor(unittest.TestCase):
+
+    def setUp(self):
+        self.solver = BlockingSolver()
+        self.executor = SolveExecutor(max_workers=2, solve_func=self.solver)
+        self.cube = Cube().apply_move("R")
+
+    def tearDown(self):
+        self.solver.release.set()
+        self.executor.shutdown()
+
+    def test_identical_requests_share_one_solve(self):
+        first = self.executor.submit(self.cube)
+        second = self.executor.submit(self.cube)
+        self.assertTrue(self.solver.started.wait(5))
+        self.assertEqual(self.executor.in_flight(), 1)
+        self.solver.release.set()
+        self.assertEqual(first.result(5), ["R'"])
+        self.assertEqual(second.result(5), ["R'"])
+        self.assertEqual(self.solver.calls, 1)
+
+    def test_progress_is_visible_while_running(self):
+        ticket = self.executor.submit(self.cube)
+        self.assertTrue(self.solver.started.wait(5))
+        self.assertFalse(ticket.done())
+        self.assertIn(ticket.progress, ("Solving...", "working"))
+
+    def test_solve_continues_while_another_ticket_wants_it(self):
+        first = self.executor.submit(self.cube)
+        second = self.executor.submit(self.cube)
+        first.cancel()
+        self.assertTrue(first.done())
+        with self.assertRaises(SolveCancelled):
+            first.result()
+        self.solver.release.set()
+        self.assertEqual(second.result(5), ["R'"])
+
+    def test_cancelling_the_last_ticket_stops_the_solve(self):
+        ticket = self.executor.submit(self.cube)
+        self.assertTrue(self.solver.started.wait(5))
+        ticket.cancel()
+        with self.assertRaises(SolveCancelled):
+            ticket._flight.future.result(5)
+        self.assertEqual(self.executor.in_flight(), 0)
+        # A new request after cancellation starts a fresh solve
+        self.solver.release.set()
+        self.assertEqual(self.executor.submit(self.cube).result(5), ["R'"])
+        self.assertEqual(self.solver.calls, 2)
+
+    def test_prefetch_leaves_a_worker_for_real_requests(self):
+        neighbors = [self.cube.apply_move(m) for m in MOVES]
+        self.assertEqual(self.executor.prefetch([self.cube] + neighbors), 1)
+        self.assertTrue(self.solver.started.wait(5))
+        self.assertEqual(self.executor.in_flight(), 1)
+        # A real request for the state being prefetched joins that solve...
+        joined = self.executor.submit(self.cube)
+        self.assertEqual(self.executor.in_flight(), 1)
+        # ...and one for another state gets the free worker
+        other = self.executor.submit(Cube().apply_move("U"))
+        self.assertEqual(self.executor.in_flight(), 2)
+        self.solver.release.set()
+        self.assertEqual(joined.result(5), ["R'"])
+        self.assertEqual(other.result(5), ["R'"])
+
+    def _wait_for_calls(self, calls):
+        for _ in range(500):
+            if self.solver.calls >= calls:
+                break
+            threading.Event().wait(0.01)
+        self.assertEqual(self.solver.calls, calls)
+
+    def test_cancelled_running_solve_keeps_its_worker_from_prefetches(self):
+        self.solver.interruptible = False
+        ticket = self.executor.submit(self.cube)
+        self.assertTrue(self.solver.started.wait(5))
+        ticket.cancel()
+        self.assertEqual(self.executor.in_flight(), 0)
+        # The cancelled solve still holds a worker, so the other one is kept...
+        self.assertEqual(self.executor.prefetch([Cube().apply_move("U")]), 0)
+        # ...for the next real request
+        other = self.executor.submit(Cube().apply_move("F"))
+        self._wait_for_calls(2)
+        self.solver.release.set()
+        self.assertEqual(other.result(5), ["R'"])
+        # Once the cancelled solve returns, the queued prefetch runs
+        self._wait_for_calls(3)
+
+    def test_prefetch_queue_drains_on_idle_workers(self):
+        self.solver.release.set()
+        cubes = [self.cube.apply_move(m) for m in MOVES]
+        self.executor.prefetch(cubes)
+        for _ in range(500):
+            if self.executor.in_flight() == 0 and not self.executor._prefetch_queue:
+                break
+            threading.Event().wait(0.01)
+        self.assertEqual(self.solver.calls, len(cubes))
+
+    def test_prefetch_fills_the_solution_cache(self):
+        cache = SolutionCache()
+        executor = SolveExecutor(max_workers=2)
+        try:
+            cube = Cube().apply_move("F").apply_move("U'")
+            executor.prefetch([cube] + [cube.apply_move(m) for m in MOVES], cache=cache)
+            for _ in range(3000):
+                if executor.in_flight() == 0 and not executor._prefetch_queue:
+                    break
+                threading.Event().wait(0.01)
+            hits = cache.hits
+            solve_cube(cube.apply_move("R2"), cache=cache)
+            self.assertEqual(cache.hits, hits + 1)
+        finally:
+            executor.shutdown()
+
+    def test_real_solver(self):
+        executor = SolveExecutor(max_workers=1)
+        try:
+            cube = Cube().apply_move("F").apply_move("U'")
+            moves = executor.submit(cube, cache=SolutionCache(0)).result(30)
+            for m in moves:
+                cube = cube.apply_move(m)
+            self.assertTrue(cube.is_solved())
+        finally:
+            executor.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -9,12 +9,12 @@ import os
 
 def test_solver_binary_reproduced_state():
     # Reproduced state that previously caused timeouts: U, F, R, U, F
-    content = """GW
-WY
-GBGWOYGY
-OROWBBBR
-OR
-YR
+    content = """OW
+YB
+GRGWROGY
+OBYWRBWB
+RG
+YO
 """
 
     test_dir = os.path.dirname(os.path.abspath(__file__))
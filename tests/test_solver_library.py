@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Integration tests for the C solver library (bin/libcubesolver.so) and its
+ctypes wrapper, SolverLibrary, in src/cube_core/solvers.py.
+"""
+import concurrent.futures
+import contextlib
+import os
+import random
+
+import numpy as np
+
+from src.cube_core import MOVES, SOLVER_MAX_MOVES, Cube, SolverLibrary, get_distance_table, states_to_stickers
+from src.cube_core.batch import _solve_cube_table
+from tests.helpers import apply_moves, scrambled
+
+
+def _random_cubes(count, seed):
+    rng = random.Random(seed)
+    return [scrambled(rng, rng.randint(0, 14)) for _ in range(count)]
+
+
+def _library_path():
+    test_dir = os.path.dirname(os.path.abspath(__file__))
+    library_path = os.path.join(os.path.dirname(test_dir), "bin", "libcubesolver.so")
+    assert os.path.exists(library_path), f"solver library not found at {library_path} (run `make build`)"
+    return library_path
+
+
+def test_solve_returns_optimal_solutions():
+    library = SolverLibrary(_library_path())
+    table = get_distance_table()
+    assert library.solve(str(Cube())) == []
+    for cube in _random_cubes(50, seed=1):
+        solution = library.solve(str(cube))
+        assert apply_moves(cube, solution).is_solved()
+        if library.has_table and table is not None:
+            assert len(solution) == len(_solve_cube_table(cube, table))
+
+
+def test_solve_rejects_invalid_states():
+    library = SolverLibrary(_library_path())
+    for bad in ("not a cube", "X" * 24):
+        try:
+            library.solve(bad)
+        except RuntimeError as e:
+            assert "rejected" in str(e)
+        else:
+            raise AssertionError(f"{bad!r} was accepted")
+
+
+def test_solve_many_accepts_arrays_and_bytes():
+    library = SolverLibrary(_library_path())
+    cubes = _random_cubes(40, seed=2)
+    stickers = states_to_stickers(cubes)
+    moves, lengths = library.solve_many(stickers)
+    assert moves.shape == (40, SOLVER_MAX_MOVES)
+    for cube, row, n in zip(cubes, moves, lengths):
+        assert n >= 0
+        assert apply_moves(cube, [MOVES[m] for m in row[:n]]).is_solved()
+    moves_from_bytes, lengths_from_bytes = library.solve_many(stickers.tobytes())
+    assert np.array_equal(lengths, lengths_from_bytes)
+    assert np.array_equal(moves, moves_from_bytes)
+    invalid = np.full((1, 24), 9, dtype=np.uint8)
+    assert library.solve_many(invalid)[1][0] == -2
+
+
+def test_threads_share_one_library():
+    library = SolverLibrary(_library_path())
+    cubes = _random_cubes(64, seed=3)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as pool:
+        solutions = list(pool.map(lambda c: library.solve(str(c)), cubes))
+    for cube, solution in zip(cubes, solutions):
+        assert apply_moves(cube, solution).is_solved()
+
+
+@contextlib.contextmanager
+def _without_table():
+    """The library with no distance table mapped, so every solve goes through
+    the bidirectional BFS; the default table is mapped again afterwards."""
+    try:
+        yield SolverLibrary(_library_path(), load_table=False)
+    finally:
+        SolverLibrary(_library_path())
+
+
+def test_bfs_grows_with_the_frontier_and_reports_its_peak():
+    table = get_distance_table()
+    with _without_table() as library:
+        for cube in _random_cubes(20, seed=4):
+            solution = library.solve(str(cube))
+            assert apply_moves(cube, solution).is_solved()
+            if table is not None:
+                assert len(solution) == len(_solve_cube_table(cube, table))
+        stats = library.memory_stats()
+    assert 0 < stats["bytes"] <= stats["peak"]
+    # Frontiers of at most 11 moves fit in a few MB, not the old fixed 640 MB
+    assert stats["peak"] < 64 << 20
+
+
+def test_bfs_memory_budget_is_an_explicit_error():
+    cube = apply_moves(Cube(), ["R", "U", "F", "R'", "U2", "F", "R2", "U'", "F2", "R"])
+    with _without_table() as library:
+        previous = library.set_memory_budget(64 << 10)
+        try:
+            try:
+                library.solve(str(cube))
+            except RuntimeError as e:
+                assert "memory budget" in str(e)
+            else:
+                raise AssertionError("a 64 KiB budget was enough for a 10-move BFS")
+            assert library.solve_many(states_to_stickers([cube]))[1][0] == -3
+        finally:
+            library.set_memory_budget(previous)
+        assert apply_moves(cube, library.solve(str(cube))).is_solved()
+
+
+def test_lowering_the_budget_frees_larger_buffers():
+    cube = apply_moves(Cube(), ["R", "U", "F", "R'", "U2", "F", "R2", "U'", "F2", "R"])
+    with _without_table() as library:
+        previous = library.set_memory_budget(0)
+        try:
+            library.solve(str(cube))
+            grown = library.memory_stats()
+            assert grown["bytes"] > 64 << 10
+            library.set_memory_budget(64 << 10)
+            stats = library.memory_stats()
+            assert stats == {"bytes": 0, "peak": grown["peak"], "budget": 64 << 10}
+            # The next search is held to the new cap rather than reusing the old buffers
+            try:
+                library.solve(str(cube))
+            except RuntimeError as e:
+                assert "memory budget" in str(e)
+            else:
+                raise AssertionError("a 64 KiB budget was enough for a 10-move BFS")
+            assert library.memory_stats()["bytes"] <= 64 << 10
+        finally:
+            library.set_memory_budget(previous)
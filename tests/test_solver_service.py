@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Integration tests for the resident solver (`bin/solver --serve`) and the
+SolverPool client in src/cube_core/solvers.py.
+"""
+import os
+
+from src.cube_core import Cube, SolverPool, SolverProcess
+from tests.helpers import apply_moves
+
+
+def _solver_path():
+    test_dir = os.path.dirname(os.path.abspath(__file__))
+    solver_path = os.path.join(os.path.dirname(test_dir), "bin", "solver")
+    assert os.path.exists(solver_path) and os.access(solver_path, os.X_OK), f"solver binary not found or not executable at {solver_path}"
+    return solver_path
+
+
+def test_serve_protocol_handles_a_stream_of_requests():
+    worker = SolverProcess(_solver_path())
+    worker.start()
+    try:
+        assert worker.ping()
+        assert worker.request(str(Cube()), timeout=10) == "OK 0"
+        assert worker.request("not a cube", timeout=10).startswith("ERR ")
+        # The same process keeps answering after an error
+        response = worker.request(str(apply_moves(Cube(), ["R", "U"])), timeout=10)
+        assert response.startswith("OK 2 ")
+    finally:
+        worker.close()
+
+
+def test_serve_coordinate_conversions_match_python():
+    worker = SolverProcess(_solver_path())
+    worker.start()
+    try:
+        cube = apply_moves(Cube(), ["R", "U'", "F2", "R'", "U"])
+        perm_rank, ori_rank = cube.to_coords()
+        assert worker.request(f"COORD {cube}", timeout=10) == f"OK {perm_rank} {ori_rank}"
+        assert worker.request(f"STATE {perm_rank} {ori_rank}", timeout=10) == f"OK {cube}"
+        assert worker.request("STATE 5040 0", timeout=10).startswith("ERR ")
+    finally:
+        worker.close()
+
+
+def test_pool_solutions_solve_the_cube():
+    pool = SolverPool(_solver_path(), size=1)
+    try:
+        for moves in (["R"], ["U", "F"], ["R", "U", "F'"], ["F2", "U'", "R2", "U"]):
+            cube = apply_moves(Cube(), moves)
+            solved = cube
+            for m in pool.solve(str(cube)):
+                solved = solved.apply_move(m)
+            assert solved.is_solved(), f"pool solution does not solve {moves}"
+        assert pool.health_check() == 1
+    finally:
+        pool.close()
+
+
+def test_pool_restarts_a_crashed_process():
+    pool = SolverPool(_solver_path(), size=1)
+    try:
+        assert pool.solve(str(apply_moves(Cube(), ["U"]))) == ["U'"]
+        worker = pool._workers[0]
+        worker.proc.kill()
+        worker.proc.wait()
+        assert pool.solve(str(apply_moves(Cube(), ["R2"]))) == ["R2"]
+        assert worker.is_alive()
+    finally:
+        pool.close()
@@ -0,0 +1,128 @@
+import io
+import os
+import subprocess
+import tempfile
+import unittest
+
+import numpy as np
+
+import convert_states
+from src.cube_core import (
+    STATE_FILE_HEADER, Cube, SolverLibrary, StateFile, StateFileWriter, coords_to_stickers_batch,
+    is_state_file, sample_coord_indices, stickers_to_states,
+)
+from src.cube_core.solvers import _solve_cube_ida
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _sample(count, seed):
+    indices = sample_coord_indices(count, rng=seed)
+    return coords_to_stickers_batch(indices // 729, indices % 729)
+
+
+class TestStateFile(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_round_trip_both_encodings(self):
+        stickers = _sample(300, 1)
+        solutions = [_solve_cube_ida(Cube(packed_state=s)) for s in stickers_to_states(stickers[:100])]
+        for encoding, record_size in (("coord", 4 + 12), ("packed", 9 + 12)):
+            path = self._path(encoding + ".cube")
+            with StateFileWriter(path, encoding, max_moves=11) as writer:
+                writer.write_batch(stickers[:100], solutions)
+                writer.write_batch(stickers[100:])
+            self.assertEqual(os.path.getsize(path), STATE_FILE_HEADER.size + 300 * record_size)
+            self.assertTrue(is_state_file(path))
+            with StateFile(path) as states:
+                self.assertEqual(len(states), 300)
+                np.testing.assert_array_equal(states.stickers(), stickers)
+                self.assertEqual(states[-1], Cube(packed_state=stickers_to_states(stickers[-1:])[0]))
+                self.assertEqual(states.solution(7), solutions[7])
+                self.assertIsNone(states.solution(200))
+                chunks = list(states.iter_chunks(128))
+                self.assertEqual([start for start, _ in chunks], [0, 128, 256])
+                self.assertEqual(sum(1 for _ in states), 300)
+
+    def test_packed_encoding_holds_any_state_coord_does_not(self):
+        cube = Cube("GWWWRGGGRRRRBBBBOOOOYYYW")  # not a legal cube state
+        with StateFileWriter(self._path("packed.cube"), "packed") as writer:
+            writer.write(cube)
+        with StateFile(self._path("packed.cube")) as states:
+            self.assertEqual(states[0], cube)
+        with self.assertRaises(ValueError):
+            with StateFileWriter(self._path("coord.cube")) as writer:
+                writer.write(cube)
+        self.assertFalse(os.path.exists(self._path("coord.cube")))
+
+    def test_invalid_files_are_rejected(self):
+        path = self._path("states.cube")
+        with StateFileWriter(path) as writer:
+            writer.write_batch(_sample(10, 2))
+        with open(path, "rb") as f:
+            data = f.read()
+        for name, content, problem in (("short.cube", data[:-1], "truncated"),
+                                       ("magic.cube", b"X" + data[1:], "bad magic")):
+            with open(self._path(name), "wb") as f:
+                f.write(content)
+            with self.assertRaisesRegex(RuntimeError, problem):
+                StateFile(self._path(name))
+
+    def test_c_reader_matches_python(self):
+        stickers = _sample(200, 3)
+        path = self._path("states.cube")
+        with StateFileWriter(path, "packed", max_moves=11) as writer:
+            writer.write_batch(stickers[:1], [["R", "U'"]])
+            writer.write_batch(stickers[1:])
+        library = SolverLibrary(os.path.join(ROOT, "bin", "libcubesolver.so"))
+        read, moves, lengths = library.read_state_file(path)
+        np.testing.assert_array_equal(read, stickers)
+        self.assertEqual(lengths[0], 2)
+        self.assertEqual(moves[0, :2].tolist(), [3, 1])
+        self.assertTrue((lengths[1:] == -1).all())
+        with open(self._path("bad.cube"), "wb") as f:
+            f.write(b"not a state file")
+        with self.assertRaises(RuntimeError):
+            library.read_state_file(self._path("bad.cube"))
+
+    def test_solver_binary_solves_every_record(self):
+        cube = Cube().apply_move("R").apply_move("U")
+        path = self._path("states.cube")
+        with StateFileWriter(path) as writer:
+            writer.write_batch(np.stack([coords_to_stickers_batch([0], [0])[0], _sample(1, 4)[0]]))
+            writer.write(cube)
+        result = subprocess.run([os.path.join(ROOT, "bin", "solver"), "--states", path],
+                                capture_output=True, text=True, timeout=30)
+        lines = result.stdout.splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[0], "WWWWGGGGRRRRBBBBOOOOYYYY OK 0")
+        self.assertEqual(lines[2], f"{cube} OK 2 U' R'")
+
+    def test_text_conversion_round_trip(self):
+        states = [str(Cube(packed_state=s)) for s in stickers_to_states(_sample(20, 5))]
+        text = "\n".join(states[:10]) + "\nWWWWGGGGRRRRBBBBOOOOYYYX\n" + "\n".join(states[10:]) + "\n"
+        path = self._path("states.cube")
+        written, skipped = convert_states.text_to_state_file(io.StringIO(text), path, solutions=True)
+        self.assertEqual((written, skipped), (20, 1))
+        with StateFile(path) as states_file:
+            for cube, solution in states_file:
+                for move in solution:
+                    cube = cube.apply_move(move)
+                self.assertTrue(cube.is_solved())
+        out = io.StringIO()
+        convert_states.state_file_to_text(path, out)
+        self.assertEqual(out.getvalue().split(), states)
+        blocks = io.StringIO()
+        convert_states.state_file_to_text(path, blocks, blocks=True)
+        self.assertEqual(convert_states.text_to_state_file(io.StringIO(blocks.getvalue()), self._path("again.cube")),
+                         (20, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
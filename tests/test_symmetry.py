@@ -0,0 +1,53 @@
+import random
+import unittest
+
+import numpy as np
+
+from src.cube_core import (
+    MOVES, N_SYMMETRIES, SYMMETRY_MOVE_MAPS, Cube, canonical_state, conjugate_stickers_batch, reduce_indices,
+    solution_from_canonical, states_to_stickers, stickers_to_states,
+)
+from src.cube_core.solvers import _solve_cube_frontier
+from tests.helpers import apply_moves
+
+
+def _random_scrambles(n, seed):
+    rng = random.Random(seed)
+    return [[rng.choice(MOVES) for _ in range(rng.randint(0, 25))] for _ in range(n)]
+
+
+class TestSymmetries(unittest.TestCase):
+
+    def test_symmetries_commute_with_moves(self):
+        solved = states_to_stickers([Cube()])
+        for sym in range(N_SYMMETRIES):
+            np.testing.assert_array_equal(conjugate_stickers_batch(solved, sym), solved)
+            for scramble in _random_scrambles(10, seed=sym):
+                image = conjugate_stickers_batch(states_to_stickers([apply_moves(Cube(), scramble)]), sym)
+                mapped = [MOVES[SYMMETRY_MOVE_MAPS[sym][MOVES.index(m)]] for m in scramble]
+                self.assertEqual(stickers_to_states(image)[0], apply_moves(Cube(), mapped).state)
+
+    def test_canonical_state_and_solution_mapping(self):
+        for scramble in _random_scrambles(30, seed=1):
+            cube = apply_moves(Cube(), scramble)
+            rep, transform = canonical_state(cube.state)
+            solution = solution_from_canonical(_solve_cube_frontier(Cube(packed_state=rep)), transform)
+            self.assertTrue(apply_moves(cube, solution).is_solved())
+            self.assertEqual(len(solution), len(_solve_cube_frontier(cube)))
+
+            # The inverse state and every conjugate share the representative
+            inverse = apply_moves(Cube(), [m[0] + {"": "'", "'": "", "2": "2"}[m[1:]] for m in reversed(scramble)])
+            self.assertEqual(canonical_state(inverse.state)[0], rep)
+            sym = random.Random(len(scramble)).randrange(N_SYMMETRIES)
+            image = conjugate_stickers_batch(states_to_stickers([cube]), sym)
+            self.assertEqual(canonical_state(stickers_to_states(image)[0])[0], rep)
+
+    def test_reduced_index_is_shared_by_conjugates(self):
+        rng = np.random.default_rng(2)
+        indices = rng.integers(0, 3674160, 500)
+        reduced = reduce_indices(indices)
+        cubes = [Cube.from_coords(int(i) // 729, int(i) % 729) for i in indices[:50]]
+        for sym in range(N_SYMMETRIES):
+            images = [Cube(packed_state=s) for s in
+                      stickers_to_states(conjugate_stickers_batch(states_to_stickers(cubes), sym))]
+            self.assertEqual(reduce_indices([c.coord_index() for c in images]).tolist(), reduced[:50].tolist())
@@ -0,0 +1,101 @@
+import os
+import subprocess
+import time
+import unittest
+from unittest import mock
+
+from src.cube_core import (
+    CORNER_COLORS, CORNER_FACELETS, SOLVED_STATE_STR, Cube, InvalidCubeError, SolutionCache, SolverLibrary,
+    solve_cube, solvers, validate_state,
+)
+from src.cube_core.cube import _parse_file_content_to_state
+from src.cube_core.solvers import _solver_binary_path, _solver_library_path
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES, name)) as f:
+        return f.read()
+
+
+def _from_pieces(perm):
+    """Sticker string with corner piece perm[i] at position i, untwisted."""
+    stickers = [''] * 24
+    for facelets, cubie in zip(CORNER_FACELETS, perm):
+        for f, color in zip(facelets, CORNER_COLORS[cubie]):
+            stickers[f] = color
+    return "".join(stickers)
+
+
+def _twisted():
+    s = list(SOLVED_STATE_STR)
+    s[3], s[8], s[5] = s[5], s[3], s[8]
+    return "".join(s)
+
+
+class TestValidateState(unittest.TestCase):
+
+    def test_solvable_states_pass(self):
+        for name in ("state0.txt", "state1.txt", "state_scramble.txt"):
+            validate_state("".join(_parse_file_content_to_state(_fixture(name))))
+        cube = Cube()
+        for m in ["R", "U'", "F2", "R", "U"]:
+            cube = cube.apply_move(m)
+        # Any color scheme: the same cube with two colors swapped is still solvable
+        self.assertEqual(validate_state(str(cube).translate(str.maketrans("RO", "OR"))),
+                         str(cube))
+
+    def test_fixtures_are_rejected_with_a_diagnostic(self):
+        for name, corner in (("state2.txt", "DFR"), ("state3.txt", "UFR"), ("state4.txt", "UFR")):
+            with self.assertRaisesRegex(InvalidCubeError, f"Corner {corner}"):
+                _parse_file_content_to_state(_fixture(name))
+
+    def test_each_problem_is_named(self):
+        s = list(SOLVED_STATE_STR)
+        s[3], s[5] = s[5], s[3]
+        mirrored = "".join(s)
+        cases = [
+            ("W" * 23, "24 stickers"),
+            ("X" + SOLVED_STATE_STR[1:], "Invalid color character 'X'"),
+            ("Y" + SOLVED_STATE_STR[1:], "exactly 4 'W'"),
+            (_twisted(), "twists add up to 1 mod 3"),
+            (mirrored, "mirror image"),
+            (_from_pieces([0, 0, 2, 3, 4, 5, 7, 7]), "Corners UFR and UFL are the same piece"),
+        ]
+        for state, message in cases:
+            with self.assertRaisesRegex(InvalidCubeError, message):
+                validate_state(state)
+
+    def test_validation_is_fast(self):
+        state = _twisted()
+        start = time.perf_counter()
+        for _ in range(1000):
+            with self.assertRaises(InvalidCubeError):
+                validate_state(state)
+        self.assertLess((time.perf_counter() - start) / 1000, 0.001)
+
+    def test_solve_cube_rejects_before_any_solver_runs(self):
+        with mock.patch.object(solvers, "_solve_normalized_cube") as solver:
+            with self.assertRaisesRegex(InvalidCubeError, "twists"):
+                solve_cube(Cube(_twisted()), cache=SolutionCache(0))
+            solver.assert_not_called()
+
+    def test_c_solver_rejects_in_constant_time(self):
+        if not os.path.exists(_solver_library_path()):
+            self.skipTest("solver library not built")
+        library = SolverLibrary(load_table=False)
+        try:
+            start = time.perf_counter()
+            with self.assertRaisesRegex(RuntimeError, "twists add up to"):
+                library.solve(_twisted())
+            self.assertLess(time.perf_counter() - start, 0.1)
+        finally:
+            SolverLibrary()
+        proc = subprocess.run([_solver_binary_path(), "--serve"], input=_twisted() + "\nQUIT\n",
+                              capture_output=True, text=True, timeout=10)
+        self.assertEqual(proc.stdout.strip(), "ERR unsolvable state")
+
+
+if __name__ == '__main__':
+    unittest.main()